@@ -0,0 +1,348 @@
+"""Built-in benchmark suite: ``python -m app.bench``.
+
+Every case is timed at each requested size (rows) and the best of
+``--repeat`` runs is reported as JSON, one record per (case, rows) with
+seconds, nanoseconds per row and rows per second. A case is a setup
+function ``setup(rows, workdir) -> run``; only ``run()`` is timed, so each
+repeat starts from fresh state.
+
+``--baseline old.json`` compares the run with an earlier report: a case
+whose time grew by more than ``--threshold`` (a fraction, default 0.2) is a
+regression and the command exits with status 1.
+
+Cases needing pandas (``to_dataframe``) are skipped, and listed under
+``skipped``, when it is not installed; CSV save/load then measure the
+stdlib ``csv`` path.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from itertools import cycle, islice
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from app.calculation import CalculationFactory, History
+
+Run = Callable[[], object]
+Setup = Callable[[int, str], Run]
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.2
+SYMBOLS = ("+", "-", "*", "/", "^", "root")
+REPORT_VERSION = 1
+
+_CASES: Dict[str, Setup] = {}
+_PANDAS_CASES = set()
+
+
+def case(name: str, needs_pandas: bool = False) -> Callable[[Setup], Setup]:
+    """Register ``setup`` as benchmark ``name``."""
+
+    def register(setup: Setup) -> Setup:
+        _CASES[name] = setup
+        if needs_pandas:
+            _PANDAS_CASES.add(name)
+        return setup
+
+    return register
+
+
+def cases() -> List[str]:
+    """Names of the registered cases, in registration order."""
+    return list(_CASES)
+
+
+def _operands(rows: int):
+    """Deterministic operands that are valid for every operation."""
+    return [(float(i % 97 + 1), float(i % 3 + 1)) for i in range(rows)]
+
+
+def _filled(rows: int) -> History:
+    hist = History()
+    calc = CalculationFactory.from_symbol("+", 1.0, 2.0)
+    for _ in range(rows):
+        hist.add(calc, 3.0)
+    return hist
+
+
+# --- cases ---
+@case("factory.from_symbol")
+def _factory(rows: int, _workdir: str) -> Run:
+    symbols = list(islice(cycle(SYMBOLS), rows))
+    from_symbol = CalculationFactory.from_symbol
+
+    def run() -> None:
+        for symbol in symbols:
+            from_symbol(symbol, 8.0, 2.0)
+
+    return run
+
+
+def _apply_case(symbol: str) -> Setup:
+    def setup(rows: int, _workdir: str) -> Run:
+        apply = CalculationFactory.operation(symbol).apply
+        operands = _operands(rows)
+
+        def run() -> None:
+            for a, b in operands:
+                apply(a, b)
+
+        return run
+
+    return setup
+
+
+for _symbol in SYMBOLS:
+    case(f"operation.apply[{_symbol}]")(_apply_case(_symbol))
+
+
+def _add_case(observers: int) -> Setup:
+    def setup(rows: int, _workdir: str) -> Run:
+        hist = History()
+        for _ in range(observers):
+            hist.register_observer(lambda calc, result: None)
+        calcs = [CalculationFactory.from_symbol("+", a, b) for a, b in _operands(rows)]
+
+        def run() -> None:
+            for calc in calcs:
+                hist.add(calc)
+
+        return run
+
+    return setup
+
+
+case("history.add")(_add_case(0))
+case("history.add+observers")(_add_case(2))
+
+
+@case("caretaker.record")
+def _record(rows: int, _workdir: str) -> Run:
+    hist = History()
+    caretaker = History.Caretaker()
+    caretaker.record(hist)
+    calc = CalculationFactory.from_symbol("+", 1.0, 2.0)
+
+    def run() -> None:
+        for _ in range(rows):
+            hist.add(calc, 3.0)
+            caretaker.record(hist)
+
+    return run
+
+
+@case("caretaker.undo_redo")
+def _undo_redo(rows: int, _workdir: str) -> Run:
+    hist = History()
+    caretaker = History.Caretaker()
+    caretaker.record(hist)
+    calc = CalculationFactory.from_symbol("+", 1.0, 2.0)
+    for _ in range(rows):
+        hist.add(calc, 3.0)
+        caretaker.record(hist)
+
+    def run() -> None:
+        for _ in range(rows):
+            caretaker.undo(hist)
+        for _ in range(rows):
+            caretaker.redo(hist)
+
+    return run
+
+
+@case("history.filter_after_add")
+def _add_filter(rows: int, _workdir: str) -> Run:
+    hist = History()
+    operands = _operands(rows)
+    for a, b in operands:
+        hist.add(CalculationFactory.from_symbol("*", a, b))
+    hist.filter(result_range=(50.5, 51.5))  # build the indexes
+    calcs = [CalculationFactory.from_symbol("*", a, b) for a, b in operands[:10]]
+
+    def run() -> None:
+        for calc in calcs:  # each query merges one new row into the indexes
+            hist.add(calc)
+            hist.filter(result_range=(50.5, 51.5))
+
+    return run
+
+
+@case("history.to_strings")
+def _to_strings(rows: int, _workdir: str) -> Run:
+    return _filled(rows).to_strings
+
+
+@case("history.to_dataframe", needs_pandas=True)
+def _to_dataframe(rows: int, _workdir: str) -> Run:
+    return _filled(rows).to_dataframe
+
+
+@case("history.save_csv")
+def _save_csv(rows: int, workdir: str) -> Run:
+    hist = _filled(rows)
+    path = os.path.join(workdir, "save.csv")
+    return lambda: hist.save_csv(path)
+
+
+@case("history.load_csv")
+def _load_csv(rows: int, workdir: str) -> Run:
+    path = os.path.join(workdir, "load.csv")
+    _filled(rows).save_csv(path)
+    return lambda: History.load_csv(path)
+
+
+@case("history.save_archive")
+def _save_archive(rows: int, workdir: str) -> Run:
+    hist = _filled(rows)
+    path = os.path.join(workdir, "save.calz")
+    return lambda: hist.save_archive(path)
+
+
+@case("history.load_archive")
+def _load_archive(rows: int, workdir: str) -> Run:
+    path = os.path.join(workdir, "load.calz")
+    _filled(rows).save_archive(path)
+    return lambda: History.load_archive(path)
+
+
+# --- running and comparing ---
+def _has_pandas() -> bool:
+    return importlib.util.find_spec("pandas") is not None
+
+
+def measure(setup: Setup, rows: int, repeat: int, workdir: str) -> float:
+    """Best wall time of ``repeat`` runs, each after a fresh ``setup``."""
+    best = float("inf")
+    for _ in range(repeat):
+        run = setup(rows, workdir)
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_suite(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    repeat: int = DEFAULT_REPEAT,
+    only: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """Run the cases whose name contains one of ``only`` (all by default)."""
+    if repeat < 1 or not sizes or min(sizes) < 1:
+        raise ValueError("repeat and every size must be >= 1")
+    selected = [name for name in _CASES if not only or any(part in name for part in only)]
+    if not selected:
+        raise ValueError(f"No benchmark matches: {', '.join(only or ())}")
+    skipped = [] if _has_pandas() else [name for name in selected if name in _PANDAS_CASES]
+    results = []
+    with tempfile.TemporaryDirectory(prefix="app-bench-") as workdir:
+        for name in selected:
+            if name in skipped:
+                continue
+            for rows in sizes:
+                seconds = measure(_CASES[name], rows, repeat, workdir)
+                results.append(
+                    {
+                        "case": name,
+                        "rows": rows,
+                        "seconds": seconds,
+                        "ns_per_row": seconds / rows * 1e9,
+                        "rows_per_s": rows / max(seconds, 1e-9),
+                    }
+                )
+    return {
+        "version": REPORT_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def compare(
+    report: Dict[str, Any], baseline: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD
+) -> List[Dict[str, Any]]:
+    """Compare (case, rows) pairs present in both reports.
+
+    ``ratio`` is current / baseline time; above ``1 + threshold`` the status
+    is ``regression``, below ``1 / (1 + threshold)`` it is ``improvement``.
+    """
+    before = {(r["case"], r["rows"]): r["seconds"] for r in baseline.get("results", [])}
+    rows = []
+    for result in report["results"]:
+        old = before.get((result["case"], result["rows"]))
+        if old is None:
+            continue
+        ratio = result["seconds"] / old if old else float("inf")
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append(
+            {
+                "case": result["case"],
+                "rows": result["rows"],
+                "baseline_s": old,
+                "current_s": result["seconds"],
+                "ratio": ratio,
+                "status": status,
+            }
+        )
+    return rows
+
+
+def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.bench", description="Benchmark the calculator core"
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument(
+        "-k", "--cases", nargs="+", metavar="NAME", help="only cases containing NAME"
+    )
+    parser.add_argument("--output", metavar="FILE", help="write the JSON report to FILE")
+    parser.add_argument("--baseline", metavar="FILE", help="compare with an earlier report")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    return parser.parse_args(list(argv))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the suite and print (or write) the report; 1 if a case regressed."""
+    args = _parse_args(argv or [])
+    if args.list:
+        print("\n".join(cases()))
+        return 0
+    report = run_suite(args.sizes, args.repeat, args.cases)
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            comparison = compare(report, json.load(fh), args.threshold)
+        report["comparison"] = comparison
+        regressions = [row for row in comparison if row["status"] == "regression"]
+        for row in regressions:
+            print(
+                f"regression: {row['case']} rows={row['rows']} "
+                f"{row['baseline_s']:.4f}s -> {row['current_s']:.4f}s ({row['ratio']:.2f}x)",
+                file=sys.stderr,
+            )
+        status = 1 if regressions else 0
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))  # pragma: no cover
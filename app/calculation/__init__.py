@@ -1,5 +1,23 @@
+from .batch import BatchResult
+from .cache import CacheStats, ResultCache
 from .calculation import Calculation
+from .concurrent import ConcurrentHistory
 from .factory import CalculationFactory
 from .history import History
+from .journal import HistoryJournal
+from .observers import BackgroundObserver
+from .parallel import ParallelResult, evaluate_parallel
 
-__all__ = ["Calculation", "CalculationFactory", "History"]
+__all__ = [
+    "BackgroundObserver",
+    "BatchResult",
+    "CacheStats",
+    "Calculation",
+    "CalculationFactory",
+    "ConcurrentHistory",
+    "History",
+    "HistoryJournal",
+    "ParallelResult",
+    "ResultCache",
+    "evaluate_parallel",
+]
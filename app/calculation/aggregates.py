@@ -0,0 +1,273 @@
+"""Streaming summary statistics over History results.
+
+``RunningStats`` is updated in O(1) per row. It tracks count and error
+counters (also per op) and sum/min/max. Mean and variance use Welford's
+algorithm. Result percentiles come from a log-bucketed quantile sketch.
+Failed calculations (NaN results) only count towards the error counters.
+
+Like the query indexes, aggregates belong to an append-only store.
+``StoreAggregates`` keeps the running stats for all rows of a store plus an
+immutable checkpoint every ``CHECKPOINT_EVERY`` rows, so the stats of any
+prefix (a memento after undo/redo) are one checkpoint plus fewer than
+``CHECKPOINT_EVERY`` replayed rows, without copying stats into every memento.
+A ``Checkpoint`` packs the sketch buckets into flat arrays (16 bytes per
+bucket), so checkpoints stay small next to the rows they summarize.
+The aggregates of a ``BranchStore`` are only created when first asked for:
+they start from the parent's stats at the branch point and defer to the
+parent for shorter prefixes.
+"""
+
+import math
+import weakref
+from array import array
+from itertools import chain
+from typing import Any, Dict, List, Optional, Tuple
+from app.numeric import to_float
+from .factory import CalculationFactory
+from .storage import BranchStore
+
+QUANTILES = (0.5, 0.9, 0.99)
+CHECKPOINT_EVERY = 4096
+
+_AGGREGATES: "weakref.WeakKeyDictionary[Any, StoreAggregates]" = weakref.WeakKeyDictionary()
+
+
+class QuantileSketch:
+    """Log-bucketed histogram (DDSketch-style) for result percentiles.
+
+    A value ``x > 0`` lands in bucket ``ceil(log(x) / log(gamma))``, so every
+    quantile estimate is within ``relative_accuracy`` of a true sample.
+    Negative values use a mirrored set of buckets. Adding a value costs one
+    ``log`` and one dict update. Past ``max_buckets`` per sign, the buckets
+    closest to zero are merged.
+    """
+
+    __slots__ = ("_log_gamma", "_gamma", "max_buckets", "zeros", "_pos", "_neg")
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048) -> None:
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.max_buckets = max_buckets
+        self.zeros = 0
+        self._pos: Dict[int, int] = {}
+        self._neg: Dict[int, int] = {}
+
+    def add(self, x: float) -> None:
+        if x > 0:
+            buckets = self._pos
+        elif x < 0:
+            buckets, x = self._neg, -x
+        else:
+            self.zeros += 1
+            return
+        if x == math.inf:
+            key = 1 << 30
+        else:
+            key = math.ceil(math.log(x) / self._log_gamma)
+        buckets[key] = buckets.get(key, 0) + 1
+        if len(buckets) > self.max_buckets:
+            _collapse(buckets)
+
+    @property
+    def count(self) -> int:
+        return self.zeros + sum(self._pos.values()) + sum(self._neg.values())
+
+    def _value(self, key: int) -> float:
+        if key == 1 << 30:
+            return math.inf
+        return 2 * self._gamma**key / (self._gamma + 1)
+
+    def quantile(self, q: float) -> float:
+        """Estimate the ``q`` quantile (0 <= q <= 1); NaN when empty."""
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile must be between 0 and 1, got {q}")
+        count = self.count
+        if not count:
+            return math.nan
+        rank = q * (count - 1)
+        seen = 0
+        for key in sorted(self._neg, reverse=True):
+            seen += self._neg[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self._pos):
+            seen += self._pos[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self._pos))  # pragma: no cover - unreachable for q <= 1
+
+    def copy(self) -> "QuantileSketch":
+        other = QuantileSketch.__new__(QuantileSketch)
+        other._gamma, other._log_gamma = self._gamma, self._log_gamma  # pylint: disable=protected-access
+        other.max_buckets, other.zeros = self.max_buckets, self.zeros
+        other._pos, other._neg = dict(self._pos), dict(self._neg)  # pylint: disable=protected-access
+        return other
+
+
+def _collapse(buckets: Dict[int, int]) -> None:
+    """Merge the two buckets closest to zero (lowest keys)."""
+    low, second = sorted(buckets)[:2]
+    buckets[second] += buckets.pop(low)
+
+
+class RunningStats:  # pylint: disable=too-many-instance-attributes
+    """O(1)-per-row aggregates over (op symbol, result) pairs."""
+
+    __slots__ = (
+        "count", "errors", "total", "minimum", "maximum", "mean", "_m2", "per_op", "sketch"
+    )
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.per_op: Dict[str, List[int]] = {}  # symbol -> [count, errors]
+        self.sketch = QuantileSketch()
+
+    def add(self, symbol: str, result: float) -> None:
+        result = to_float(result)  # summaries are float even for Decimal/Fraction results
+        self.count += 1
+        counters = self.per_op.get(symbol)
+        if counters is None:
+            counters = self.per_op[symbol] = [0, 0]
+        counters[0] += 1
+        if math.isnan(result):  # a failed calculation
+            self.errors += 1
+            counters[1] += 1
+            return
+        self.total += result
+        self.minimum = min(self.minimum, result)
+        self.maximum = max(self.maximum, result)
+        delta = result - self.mean
+        self.mean += delta / (self.count - self.errors)
+        self._m2 += delta * (result - self.mean)
+        self.sketch.add(result)
+
+    @property
+    def ok(self) -> int:
+        """Rows with a numeric result."""
+        return self.count - self.errors
+
+    @property
+    def variance(self) -> float:
+        """Sample variance of the results (0.0 for fewer than two)."""
+        return self._m2 / (self.ok - 1) if self.ok > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.count if self.count else 0.0
+
+    def quantiles(self, qs: Tuple[float, ...] = QUANTILES) -> Dict[float, float]:
+        """Estimated result percentiles (within the sketch's relative accuracy)."""
+        return {q: self.sketch.quantile(q) for q in qs}
+
+    def copy(self, sketch: bool = True) -> "RunningStats":
+        """A copy; with ``sketch=False`` its sketch is empty."""
+        other = RunningStats()
+        for name in ("count", "errors", "total", "minimum", "maximum", "mean", "_m2"):
+            setattr(other, name, getattr(self, name))
+        other.per_op = {symbol: list(counters) for symbol, counters in self.per_op.items()}
+        if sketch:
+            other.sketch = self.sketch.copy()
+        return other
+
+
+class Checkpoint:
+    """``RunningStats`` frozen compactly: sketch buckets as flat key/count arrays."""
+
+    __slots__ = ("_stats", "_zeros", "_pos", "_neg")
+
+    def __init__(self, stats: RunningStats) -> None:
+        sketch = stats.sketch
+        self._stats = stats.copy(sketch=False)
+        self._zeros = sketch.zeros
+        self._pos = _pack(sketch._pos)  # pylint: disable=protected-access
+        self._neg = _pack(sketch._neg)  # pylint: disable=protected-access
+
+    @property
+    def count(self) -> int:
+        return self._stats.count
+
+    def stats(self) -> RunningStats:
+        """A new ``RunningStats`` equal to the one checkpointed."""
+        stats = self._stats.copy(sketch=False)
+        sketch = stats.sketch
+        sketch.zeros = self._zeros
+        sketch._pos = _unpack(self._pos)  # pylint: disable=protected-access
+        sketch._neg = _unpack(self._neg)  # pylint: disable=protected-access
+        return stats
+
+
+def _pack(buckets: Dict[int, int]) -> array:
+    return array("q", chain.from_iterable(buckets.items()))
+
+
+def _unpack(packed: array) -> Dict[int, int]:
+    return dict(zip(packed[::2], packed[1::2]))
+
+
+class StoreAggregates:
+    """Running stats of one store, with checkpoints for cheap prefix stats.
+
+    ``start`` is the stats of rows the store shares with its parent (a
+    ``BranchStore``); they are the first checkpoint.
+    """
+
+    def __init__(self, start: Optional[RunningStats] = None) -> None:
+        self.current = start if start is not None else RunningStats()
+        self.start = self.current.count
+        # stats after ``start`` rows, then after each multiple of N rows
+        self.checkpoints: List[Checkpoint] = [Checkpoint(self.current)]
+
+    @property
+    def counted(self) -> int:
+        return self.current.count
+
+    def add(self, symbol: str, result: float) -> None:
+        self.current.add(symbol, result)
+        if self.current.count % CHECKPOINT_EVERY == 0:
+            self.checkpoints.append(Checkpoint(self.current))
+
+    def catch_up(self, store: Any) -> None:
+        """Count rows appended to ``store`` without going through ``add``."""
+        symbol_for = CalculationFactory.symbol_for
+        for entry in store.iter_entries(self.counted, len(store)):
+            self.add(symbol_for(entry.calc.op), entry.result)
+
+    def at(self, store: Any, size: int) -> RunningStats:
+        """Stats of the first ``size`` rows of ``store`` (a copy)."""
+        if size < self.start:  # rows shared with the parent of a branch
+            return aggregates_for(store.parent).at(store.parent, size)  # type: ignore[union-attr]
+        if size > self.counted:
+            self.catch_up(store)
+        if size == self.counted:
+            return self.current.copy()
+        at = max(0, size // CHECKPOINT_EVERY - self.start // CHECKPOINT_EVERY)
+        stats = self.checkpoints[at].stats()
+        symbol_for = CalculationFactory.symbol_for
+        for entry in store.iter_entries(stats.count, size):
+            stats.add(symbol_for(entry.calc.op), entry.result)
+        return stats
+
+
+def aggregates_for(store: Any, create: bool = True) -> Optional[StoreAggregates]:
+    """Return the aggregates tracked for ``store`` (creating them if asked)."""
+    aggregates = _AGGREGATES.get(store)
+    if aggregates is None and create:
+        start = None
+        if isinstance(store, BranchStore):
+            parent = aggregates_for(store.parent)
+            start = parent.at(store.parent, store.base)  # type: ignore[union-attr]
+        aggregates = _AGGREGATES[store] = StoreAggregates(start)
+    return aggregates
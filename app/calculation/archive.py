@@ -0,0 +1,213 @@
+"""Compressed columnar history archive (``.calz`` files).
+
+Rows are written and read in blocks of up to ``block_rows``, so encoding
+and decoding stream with memory bounded by the block size. Each block
+stores its op, a, b and result columns as separate sections. Every section
+uses the smaller of two encodings, chosen per block, and is then deflated
+with ``zlib``:
+
+- op: dictionary codes (one byte per row), or run-length encoded
+  ``(code, length)`` pairs when ops come in runs
+- a, b, result: a dictionary of the distinct float64 values plus one- or
+  two-byte codes, which suits operands drawn from narrow ranges; otherwise
+  Gorilla-style XOR, where each value is XORed with the previous one and
+  only the bytes between the leading and trailing zero bytes are kept,
+  behind one control byte per value (a repeated value costs the control byte)
+
+Layout (little-endian): magic ``b"CALCARCZ"``, uint16 version, then blocks
+of a uint32 row count followed by four sections (uint8 encoding, uint32
+length, deflated body). A zero row count ends the file.
+
+Values are stored as float64 like the binary format, so exact
+Decimal/Fraction values are rounded. NumPy does the column transforms and
+is imported on first use.
+"""
+
+import importlib
+import os
+import struct
+import zlib
+from array import array
+from typing import Any, BinaryIO, Iterator, List, Sequence, Tuple
+from .csvio import Chunk, check_symbols, chunk_columns
+
+MAGIC = b"CALCARCZ"
+VERSION = 1
+HEADER = struct.Struct("<8sH")
+COUNT = struct.Struct("<I")
+SECTION = struct.Struct("<BI")
+EXTENSIONS = (".calz",)
+BLOCK_ROWS = 65_536
+ZLIB_LEVEL = 1  # higher levels cost several times more for a few percent
+MAX_DICT = 1 << 16  # distinct values per block for the dictionary encoding
+
+OP_CODES, OP_RUNS, FLOAT_XOR, FLOAT_DICT = range(4)
+
+Section = Tuple[int, bytes]
+
+
+def is_archive_path(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in EXTENSIONS
+
+
+def _numpy() -> Any:
+    return importlib.import_module("numpy")
+
+
+# --- op column: dictionary codes or runs ---
+def _encode_ops(np: Any, symbols: Sequence[str]) -> Section:
+    names = list(dict.fromkeys(symbols))
+    if len(names) > 255:
+        raise ValueError("History archives support at most 255 operation types")
+    code_of = {symbol: code for code, symbol in enumerate(names)}
+    codes = np.fromiter((code_of[symbol] for symbol in symbols), np.uint8, len(symbols))
+    table = bytes([len(names)]) + b"".join(
+        bytes([len(raw)]) + raw for raw in (name.encode("utf-8") for name in names)
+    )
+    starts = np.flatnonzero(np.concatenate(([True], codes[1:] != codes[:-1])))
+    if len(starts) * 5 < len(codes):  # one code byte plus a uint32 length per run
+        lengths = np.diff(np.append(starts, len(codes))).astype("<u4")
+        runs = COUNT.pack(len(starts)) + codes[starts].tobytes() + lengths.tobytes()
+        return OP_RUNS, table + runs
+    return OP_CODES, table + codes.tobytes()
+
+
+def _decode_ops(np: Any, kind: int, body: bytes, rows: int) -> Tuple[List[str], Any]:
+    names, offset = [], 1
+    for _ in range(body[0]):
+        length = body[offset]
+        names.append(body[offset + 1: offset + 1 + length].decode("utf-8"))
+        offset += 1 + length
+    if kind == OP_CODES:
+        return names, np.frombuffer(body, np.uint8, rows, offset)
+    if kind == OP_RUNS:
+        (runs,) = COUNT.unpack_from(body, offset)
+        codes = np.frombuffer(body, np.uint8, runs, offset + COUNT.size)
+        lengths = np.frombuffer(body, "<u4", runs, offset + COUNT.size + runs)
+        return names, np.repeat(codes, lengths)
+    raise ValueError(f"unknown op encoding {kind}")
+
+
+# --- float columns: dictionary or XOR ---
+def _encode_xor(np: Any, bits: Any) -> bytes:
+    xored = bits.copy()
+    xored[1:] ^= bits[:-1]
+    matrix = xored.view(np.uint8).reshape(-1, 8)  # least significant byte first
+    nonzero = matrix != 0
+    used = nonzero.any(axis=1)
+    low = np.where(used, nonzero.argmax(axis=1), 0)  # trailing zero bytes
+    high = np.where(used, 8 - nonzero[:, ::-1].argmax(axis=1), 0)  # end of the used bytes
+    control = (low << 4 | (high - low)).astype(np.uint8)
+    position = np.arange(8)
+    keep = (position >= low[:, None]) & (position < high[:, None])
+    return control.tobytes() + matrix[keep].tobytes()
+
+
+def _decode_xor(np: Any, body: bytes, rows: int) -> Any:
+    control = np.frombuffer(body, np.uint8, rows)
+    low = (control >> 4).astype(np.intp)
+    high = low + (control & 15)
+    position = np.arange(8)
+    keep = (position >= low[:, None]) & (position < high[:, None])
+    matrix = np.zeros((rows, 8), np.uint8)
+    matrix[keep] = np.frombuffer(body, np.uint8, offset=rows)
+    return np.bitwise_xor.accumulate(matrix.view("<u8").ravel())
+
+
+def _code_type(distinct: int) -> str:
+    return "u1" if distinct <= 256 else "<u2"
+
+
+def _encode_floats(np: Any, values: Sequence[Any]) -> Section:
+    bits = np.asarray(values, dtype="<f8").view("<u8")
+    xor = _encode_xor(np, bits)
+    distinct, codes = np.unique(bits, return_inverse=True)
+    if len(distinct) > MAX_DICT:
+        return FLOAT_XOR, xor
+    table = COUNT.pack(len(distinct)) + distinct.tobytes()
+    dictionary = table + codes.astype(_code_type(len(distinct))).tobytes()
+    return (FLOAT_DICT, dictionary) if len(dictionary) < len(xor) else (FLOAT_XOR, xor)
+
+
+def _decode_floats(np: Any, kind: int, body: bytes, rows: int) -> Any:
+    if kind == FLOAT_XOR:
+        bits = _decode_xor(np, body, rows)
+    elif kind == FLOAT_DICT:
+        (count,) = COUNT.unpack_from(body)
+        distinct = np.frombuffer(body, "<u8", count, COUNT.size)
+        codes = np.frombuffer(body, _code_type(count), rows, COUNT.size + 8 * count)
+        bits = distinct[codes]
+    else:
+        raise ValueError(f"unknown float encoding {kind}")
+    return array("d", bits.view("<f8").tobytes())
+
+
+# --- writing ---
+def _write_block(fh: BinaryIO, np: Any, columns: Tuple[list, list, list, list]) -> None:
+    a, symbols, b, results = columns
+    fh.write(COUNT.pack(len(a)))
+    sections = [_encode_ops(np, symbols)] + [_encode_floats(np, c) for c in (a, b, results)]
+    for kind, body in sections:
+        packed = zlib.compress(body, ZLIB_LEVEL)
+        fh.write(SECTION.pack(kind, len(packed)) + packed)
+
+
+def write_archive(path: str, store: Any, size: int, block_rows: int = BLOCK_ROWS) -> None:
+    """Write the first ``size`` rows of ``store`` to ``path`` in blocks of ``block_rows``.
+
+    Like ``write_binary`` the file is written to a temp path and renamed.
+    """
+    if block_rows < 1:
+        raise ValueError("block_rows must be >= 1")
+    np = _numpy()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(HEADER.pack(MAGIC, VERSION))
+        for start in range(0, size, block_rows):
+            _write_block(fh, np, chunk_columns(store, start, min(start + block_rows, size)))
+        fh.write(COUNT.pack(0))
+    os.replace(tmp_path, path)
+
+
+# --- reading ---
+def _read(fh: BinaryIO, size: int, path: str) -> bytes:
+    data = fh.read(size)
+    if len(data) < size:
+        raise ValueError(f"Truncated history archive: {path}")
+    return data
+
+
+def _read_section(fh: BinaryIO, path: str) -> Section:
+    kind, length = SECTION.unpack(_read(fh, SECTION.size, path))
+    return kind, _read(fh, length, path)
+
+
+def _decode_block(np: Any, sections: List[Section], rows: int) -> Tuple[List[str], Any, list]:
+    (op_kind, op_body), *values = [(kind, zlib.decompress(body)) for kind, body in sections]
+    names, codes = _decode_ops(np, op_kind, op_body, rows)
+    if len(codes) != rows or int(codes.max()) >= len(names):
+        raise ValueError("op codes do not match the block")
+    return names, codes, [_decode_floats(np, kind, body, rows) for kind, body in values]
+
+
+def read_archive(path: str) -> Iterator[Chunk]:
+    """Yield ``History.add_many`` arguments block by block.
+
+    Raises ValueError for a file that is not a (complete, intact) archive or
+    names unknown operations.
+    """
+    np = _numpy()
+    with open(path, "rb") as fh:
+        magic, version = HEADER.unpack(_read(fh, HEADER.size, path))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a history archive: {path}")
+        while True:
+            (rows,) = COUNT.unpack(_read(fh, COUNT.size, path))
+            if not rows:
+                return
+            sections = [_read_section(fh, path) for _ in range(4)]
+            try:
+                names, codes, columns = _decode_block(np, sections, rows)
+            except (ValueError, IndexError, struct.error, zlib.error) as exc:
+                raise ValueError(f"Corrupt history archive: {path} ({exc})") from exc
+            yield (check_symbols(path, names), codes.tolist(), *columns)
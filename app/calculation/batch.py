@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+from typing import Any
+from app.operation.batch import numpy
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """Result of a vectorized evaluation.
+
+    - values: float64 array, NaN where a row failed
+    - errors: object array with the error message per failed row, else None
+    """
+
+    values: Any
+    errors: Any
+
+    @property
+    def ok(self) -> Any:
+        """Boolean mask of rows that evaluated successfully."""
+        return numpy().equal(self.errors, None)
+
+    @property
+    def error_count(self) -> int:
+        return int((~self.ok).sum())
@@ -0,0 +1,120 @@
+"""Fixed-width binary history format with memory-mapped reads.
+
+Layout (little-endian):
+- header: magic ``b"CALCHIST"``, uint16 version, uint16 op count, uint64 row count
+- op table: per op, uint8 length + UTF-8 symbol
+- records: ``float64 a, float64 b, uint8 op, float64 result`` (25 bytes each)
+
+``MappedStore`` reads records straight from an ``mmap`` of the file, so
+opening is O(1) and only the pages a listing or tail read touches are loaded.
+"""
+
+import mmap
+import os
+import struct
+from typing import Iterator, List, Sequence
+from app.operation import Operation
+from .calculation import Calculation
+from .factory import CalculationFactory
+from .storage import Entry, ListStore
+
+MAGIC = b"CALCHIST"
+VERSION = 1
+HEADER = struct.Struct("<8sHHQ")
+RECORD = struct.Struct("<ddBd")
+EXTENSIONS = (".bin",)
+_CHUNK_ROWS = 65536
+
+
+def is_binary_path(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in EXTENSIONS
+
+
+def write_binary(
+    path: str,
+    a: Sequence[float],
+    ops: Sequence[str],
+    b: Sequence[float],
+    results: Sequence[float],
+) -> None:
+    """Write columns to ``path`` atomically (temp file + rename).
+
+    Renaming keeps any existing mapping of the old file valid.
+    """
+    symbols = list(dict.fromkeys(ops))
+    if len(symbols) > 255:
+        raise ValueError("Binary history supports at most 255 operation types")
+    code_of = {symbol: code for code, symbol in enumerate(symbols)}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(HEADER.pack(MAGIC, VERSION, len(symbols), len(a)))
+        for symbol in symbols:
+            raw = symbol.encode("utf-8")
+            fh.write(struct.pack("<B", len(raw)) + raw)
+        chunk: List[bytes] = []
+        for x, y, symbol, r in zip(a, b, ops, results):
+            chunk.append(RECORD.pack(x, y, code_of[symbol], r))
+            if len(chunk) >= _CHUNK_ROWS:
+                fh.write(b"".join(chunk))
+                chunk.clear()
+        fh.write(b"".join(chunk))
+    os.replace(tmp_path, path)
+
+
+class MappedStore:
+    """Read-only mapped records plus an in-memory tail for rows added later."""
+
+    name = "mapped"
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < HEADER.size:
+            raise ValueError(f"Not a binary history file: {path}")
+        magic, version, n_ops, count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a binary history file: {path}")
+        offset = HEADER.size
+        self._ops: List[Operation] = []
+        for _ in range(n_ops):
+            length = self._mm[offset]
+            symbol = self._mm[offset + 1: offset + 1 + length].decode("utf-8")
+            self._ops.append(CalculationFactory.operation(symbol))
+            offset += 1 + length
+        if len(self._mm) < offset + count * RECORD.size:
+            raise ValueError(f"Truncated binary history file: {path}")
+        self._offset = offset
+        self._count = count
+        self._tail = ListStore()
+
+    def __len__(self) -> int:
+        return self._count + len(self._tail)
+
+    def append(self, calc: Calculation, result: float) -> None:
+        self._tail.append(calc, result)
+
+    def extend(self, ops, codes, a, b, results) -> None:  # pylint: disable=too-many-arguments
+        self._tail.extend(ops, codes, a, b, results)
+
+    def entry(self, index: int) -> Entry:
+        if index >= self._count:
+            return self._tail.entry(index - self._count)
+        a, b, code, result = RECORD.unpack_from(self._mm, self._offset + index * RECORD.size)
+        return Entry(Calculation(self._ops[code], a, b), result)
+
+    def iter_entries(self, start: int, stop: int) -> Iterator[Entry]:
+        return (self.entry(i) for i in range(start, stop))
+
+    def empty(self) -> ListStore:
+        return ListStore()
+
+    def column(self, name: str, size: int) -> Sequence:
+        mapped = min(self._count, size)
+        raw = memoryview(self._mm)[self._offset: self._offset + mapped * RECORD.size]
+        field = {"a": 0, "b": 1, "op": 2, "result": 3}[name]
+        values = [row[field] for row in RECORD.iter_unpack(raw)]
+        raw.release()
+        if name == "op":
+            symbols = [CalculationFactory.symbol_for(op) for op in self._ops]
+            values = [symbols[code] for code in values]
+        return values + list(self._tail.column(name, size - mapped))
@@ -0,0 +1,66 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Hashable, Tuple, Union
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ResultCache:
+    """Bounded LRU cache of calculation outcomes keyed on (symbol, a, b).
+
+    Errors are cached too: a key whose computation raised ValueError or
+    ZeroDivisionError re-raises the same error type and message on a hit
+    without re-running the operation's validation.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Tuple[bool, Union[float, Tuple[type, tuple]]]]"
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], float]) -> float:
+        try:
+            ok, value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            try:
+                ok, value = True, compute()
+            except (ValueError, ZeroDivisionError) as exc:
+                ok, value = False, (type(exc), exc.args)
+            self._data[key] = (ok, value)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        else:
+            self.hits += 1
+            self._data.move_to_end(key)
+        if ok:
+            return value  # type: ignore[return-value]
+        exc_type, args = value  # type: ignore[misc]
+        raise exc_type(*args)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> CacheStats:
+        return CacheStats(len(self._data), self.maxsize, self.hits, self.misses, self.evictions)
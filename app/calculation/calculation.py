@@ -1,12 +1,25 @@
 from dataclasses import dataclass
+from decimal import DecimalException
+from app.numeric import Number, decimal_error
 from app.operation import Operation
 
 
 @dataclass(frozen=True)
 class Calculation:
+    # Slotted: no per-instance __dict__, history entries stay small
+    __slots__ = ("op", "a", "b")
+
     op: Operation
-    a: float
-    b: float
+    a: Number
+    b: Number
+
+    def execute(self) -> Number:
+        """Apply the operation; Decimal signals are raised as ValueError."""
+        try:
+            return self.op.apply(self.a, self.b)
+        except DecimalException as exc:
+            raise decimal_error(exc) from exc
 
-    def execute(self) -> float:
-        return self.op.apply(self.a, self.b)
+    def __reduce__(self):
+        # frozen + __slots__ cannot use the default slot-state pickling
+        return (type(self), (self.op, self.a, self.b))
@@ -0,0 +1,152 @@
+"""Thread-safe History for concurrent producers and readers.
+
+``ConcurrentHistory`` serializes every state change (append, bulk append,
+fork, clear, memento restore) on one re-entrant ``lock`` that is held only
+for the O(1) append itself: ``add`` executes the calculation and notifies
+observers outside the lock, so producers contend on the append alone.
+Observers of different producers may therefore run in a different order
+than the rows were stored.
+
+Readers hold the lock just long enough to copy the ``(store, size)``
+version pointer. Stores are append-only, so the first ``size`` rows of a
+captured store never change and are read without the lock: ``all``,
+``to_strings``, ``to_dataframe``, ``save`` and the other readers each see
+one consistent snapshot while rows are appended or undone. ``stats`` and
+``filter`` catch up shared aggregates/indexes and run under the lock.
+
+``ConcurrentHistory.Caretaker`` makes ``record``/``undo``/``redo`` atomic by
+holding the history's lock and then its own, so an undo never interleaves
+with another thread's append. Take ``hist.lock`` to group several calls,
+e.g. an ``add`` followed by ``caretaker.record``.
+"""
+
+import threading
+from contextlib import nullcontext
+from typing import Any, Iterator, List, Optional, Sequence
+from app.operation import Operation
+from .aggregates import RunningStats
+from .archive import BLOCK_ROWS
+from .calculation import Calculation
+from .csvio import CHUNK_ROWS
+from .history import History
+from .query import Range
+from .storage import Entry
+
+
+def _lock_of(hist: History) -> Any:
+    lock = getattr(hist, "lock", None)
+    return lock if lock is not None else nullcontext()
+
+
+class ConcurrentHistory(History):  # pylint: disable=too-many-public-methods
+    """History that is safe to share between producer and reader threads."""
+
+    def __init__(self, backend: str = "list") -> None:
+        self.lock = threading.RLock()
+        super().__init__(backend)
+
+    def snapshot(self) -> History:
+        """A plain History over the current rows, in O(1).
+
+        It shares the append-only store, so it stays valid (and unchanged)
+        while other threads write; treat it as read-only.
+        """
+        view = History()
+        view.restore_memento(self.create_memento())
+        return view
+
+    # --- writers: one short critical section each ---
+    def _append(self, calc: Calculation, result: float) -> None:
+        with self.lock:
+            super()._append(calc, result)
+
+    def add_many(  # pylint: disable=too-many-arguments
+        self,
+        ops: Sequence[Operation],
+        codes: Sequence[int],
+        a: Sequence[float],
+        b: Sequence[float],
+        results: Sequence[float],
+    ) -> None:
+        with self.lock:
+            super().add_many(ops, codes, a, b, results)
+
+    def clear(self) -> None:
+        with self.lock:
+            super().clear()
+
+    def create_memento(self) -> History.Memento:
+        with self.lock:
+            return super().create_memento()
+
+    def restore_memento(self, memento: History.Memento) -> None:
+        with self.lock:
+            super().restore_memento(memento)
+
+    # --- readers: pin a snapshot, then read without the lock ---
+    def column(self, name: str) -> Sequence:
+        return self.snapshot().column(name)
+
+    def all(self) -> List[Calculation]:
+        return self.snapshot().all()
+
+    def entries(self) -> List[Entry]:
+        return self.snapshot().entries()
+
+    def last(self) -> Optional[Calculation]:
+        return self.snapshot().last()
+
+    def to_strings(self) -> List[str]:
+        return self.snapshot().to_strings()
+
+    def iter_strings(self, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        return self.snapshot().iter_strings(start, stop)
+
+    def to_dataframe(self):  # type: ignore[override]
+        return self.snapshot().to_dataframe()
+
+    def save_csv(self, path: str, chunk_size: int = CHUNK_ROWS) -> None:
+        self.snapshot().save_csv(path, chunk_size)
+
+    def save_binary(self, path: str) -> None:
+        self.snapshot().save_binary(path)
+
+    def save_archive(self, path: str, block_rows: int = BLOCK_ROWS) -> None:
+        self.snapshot().save_archive(path, block_rows)
+
+    # --- readers that update shared aggregates/indexes ---
+    def stats(self) -> RunningStats:
+        with self.lock:
+            return super().stats()
+
+    def filter(
+        self,
+        op: Optional[str] = None,
+        result_range: Optional[Range] = None,
+        a_range: Optional[Range] = None,
+        b_range: Optional[Range] = None,
+    ) -> List[Entry]:
+        with self.lock:
+            return super().filter(op, result_range, a_range, b_range)
+
+    class Caretaker(History.Caretaker):
+        """Caretaker whose ``record``/``undo``/``redo`` are atomic across threads.
+
+        Also works with a plain History, guarding only the undo/redo stacks.
+        """
+
+        def __init__(self, max_depth: Optional[int] = None) -> None:
+            super().__init__(max_depth)
+            self._lock = threading.Lock()
+
+        def record(self, hist: History) -> None:
+            with _lock_of(hist), self._lock:
+                super().record(hist)
+
+        def undo(self, hist: History) -> bool:
+            with _lock_of(hist), self._lock:
+                return super().undo(hist)
+
+        def redo(self, hist: History) -> bool:
+            with _lock_of(hist), self._lock:
+                return super().redo(hist)
@@ -0,0 +1,207 @@
+"""Chunked CSV persistence for History (``a,op,b,result`` columns).
+
+``write_csv`` and ``read_csv`` never hold more than ``chunk_size`` rows of
+text or DataFrame in memory, so peak memory beyond the History itself is
+bounded by the chunk size, not the row count. With pandas each chunk is a
+small DataFrame (``to_csv`` appends, ``read_csv(chunksize=...)``); without
+pandas the stdlib ``csv`` module reads and writes the same format. Failed
+calculations (NaN) are written as an empty field, like pandas does.
+
+Under the Decimal/Fraction backends values are written with ``str`` and
+parsed back with ``numeric.parse_stored``, so exact digits survive.
+"""
+
+import csv
+import importlib
+from array import array
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from app import numeric
+from app.operation import Operation
+from .factory import CalculationFactory
+from .storage import COLUMNS
+
+CHUNK_ROWS = 65_536
+VALUES = ("a", "b", "result")  # the numeric columns, in Chunk order
+
+# (ops, per-row codes into ops, a, b, results): the arguments of History.add_many
+Chunk = Tuple[List[Operation], Sequence[int], Sequence[Any], Sequence[Any], Sequence[Any]]
+
+
+def _pandas(use_pandas: Optional[bool]) -> Any:
+    """pandas if wanted and installed; ``use_pandas=True`` requires it."""
+    if use_pandas is False:
+        return None
+    try:
+        return importlib.import_module("pandas")
+    except ModuleNotFoundError:
+        if use_pandas:
+            raise
+        return None
+
+
+def _verify_results(path: str, symbols: Any, columns: Sequence[Any], offset: int) -> None:
+    """Recompute results in bulk and raise ValueError if any stored one differs.
+
+    ``columns`` holds the a, b and result columns as floats; ``offset`` is the
+    file row of the chunk's first row.
+    """
+    np = importlib.import_module("numpy")
+    a, b, results = columns
+    expected = CalculationFactory.evaluate_many(symbols, a, b).values
+    bad = ~np.isclose(expected, results, equal_nan=True)
+    if bad.any():
+        row = int(np.argmax(bad))
+        raise ValueError(
+            f"{int(bad.sum())} row(s) in {path} do not match their stored result "
+            f"(first at row {offset + row}: expected {expected[row]}, got {results[row]})"
+        )
+
+
+def check_symbols(path: str, symbols: Sequence[str]) -> List[Operation]:
+    """Operations for ``symbols``; ValueError naming any unknown ones."""
+    unknown = sorted(set(symbols) - set(CalculationFactory.supported()))
+    if unknown:
+        raise ValueError(f"Unknown operation(s) in {path}: {', '.join(unknown)}")
+    return [CalculationFactory.operation(symbol) for symbol in symbols]
+
+
+# --- writing ---
+def chunk_columns(store: Any, start: int, stop: int) -> Tuple[list, list, list, list]:
+    """The a, op symbol, b and result columns of rows ``start:stop`` of ``store``."""
+    symbol_for = CalculationFactory.symbol_for
+    a: list = []
+    ops: list = []
+    b: list = []
+    results: list = []
+    for entry in store.iter_entries(start, stop):
+        calc = entry.calc
+        a.append(calc.a)
+        ops.append(symbol_for(calc.op))
+        b.append(calc.b)
+        results.append(entry.result)
+    return a, ops, b, results
+
+
+def _cell(value: Any) -> Any:
+    return "" if value != value else value  # pylint: disable=comparison-with-itself
+
+
+def write_csv(
+    path: str,
+    store: Any,
+    size: int,
+    chunk_size: int = CHUNK_ROWS,
+    use_pandas: Optional[bool] = None,
+) -> None:
+    """Write the first ``size`` rows of ``store`` to ``path``, ``chunk_size`` at a time."""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+    pd = _pandas(use_pandas)
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        fh.write(",".join(COLUMNS) + "\n")
+        writer = csv.writer(fh, lineterminator="\n")
+        for start in range(0, size, chunk_size):
+            columns = chunk_columns(store, start, min(start + chunk_size, size))
+            if pd is not None:
+                frame = pd.DataFrame(dict(zip(COLUMNS, columns)), columns=list(COLUMNS))
+                frame.to_csv(fh, header=False, index=False, lineterminator="\n")
+            else:
+                writer.writerows(zip(*(map(_cell, column) for column in columns)))
+
+
+# --- reading ---
+def _as_floats(columns: Sequence[Any]) -> List[Any]:
+    return [col if isinstance(col, array) else [float(v) for v in col] for col in columns]
+
+
+def _decode_frame(frame: Any, exact: bool) -> List[Any]:
+    """a, b and result columns of a pandas chunk (typed arrays unless exact)."""
+    if exact:
+        return [list(map(numeric.parse_stored, frame[name])) for name in VALUES]
+    return [array("d", frame[name].to_numpy(dtype=float).tobytes()) for name in VALUES]
+
+
+def _pandas_chunks(pd: Any, path: str, chunk_size: int, verify: bool) -> Iterator[Chunk]:
+    exact = numeric.current_backend() != "float"
+    options = {"dtype": str, "keep_default_na": False} if exact else {}
+    offset = 0
+    with pd.read_csv(path, chunksize=chunk_size, **options) as reader:
+        for frame in reader:
+            if frame.empty:  # a header-only file still yields one empty chunk
+                continue
+            codes, symbols = pd.factorize(frame["op"].astype(str))
+            ops = check_symbols(path, list(symbols))
+            columns = _decode_frame(frame, exact)
+            if verify:
+                _verify_results(path, symbols[codes], _as_floats(columns), offset)
+            offset += len(codes)
+            yield (ops, codes.tolist(), *columns)
+
+
+def _decode_rows(rows: List[List[str]], indexes: Sequence[int], exact: bool) -> List[Any]:
+    """a, b and result columns of a stdlib chunk (typed arrays unless exact)."""
+    columns = [[numeric.parse_stored(row[i]) for row in rows] for i in indexes]
+    return columns if exact else [array("d", column) for column in columns]
+
+
+def _positions(path: str, header: List[str]) -> Tuple[int, List[int]]:
+    """Positions of the op column and of the ``VALUES`` columns in ``header``."""
+    missing = [name for name in COLUMNS if name not in header]
+    if missing:
+        raise ValueError(f"Missing column(s) in {path}: {', '.join(missing)}")
+    return header.index("op"), [header.index(name) for name in VALUES]
+
+
+def _checked_rows(path: str, reader: Any, width: int) -> Iterator[List[str]]:
+    """Rows of ``reader`` without blank lines; ValueError on a wrong field count."""
+    for row in reader:
+        if not row:
+            continue
+        if len(row) != width:
+            raise ValueError(
+                f"Line {reader.line_num} of {path} has {len(row)} field(s), expected {width}"
+            )
+        yield row
+
+
+def _stdlib_chunks(path: str, chunk_size: int, verify: bool) -> Iterator[Chunk]:
+    exact = numeric.current_backend() != "float"
+    offset = 0
+    with open(path, newline="", encoding="utf-8") as fh:
+        reader = csv.reader(fh)
+        header = next(reader, [])
+        iop, indexes = _positions(path, header)
+        reader = _checked_rows(path, reader, len(header))
+        while True:
+            rows = list(islice(reader, chunk_size))
+            if not rows:
+                return
+            code_of: Dict[str, int] = {}
+            codes = [code_of.setdefault(row[iop], len(code_of)) for row in rows]
+            ops = check_symbols(path, list(code_of))
+            columns = _decode_rows(rows, indexes, exact)
+            if verify:
+                _verify_results(path, [row[iop] for row in rows], _as_floats(columns), offset)
+            offset += len(rows)
+            yield (ops, codes, *columns)
+
+
+def read_csv(
+    path: str,
+    chunk_size: int = CHUNK_ROWS,
+    verify: bool = False,
+    use_pandas: Optional[bool] = None,
+) -> Iterator[Chunk]:
+    """Yield ``History.add_many`` arguments for each block of ``chunk_size`` rows.
+
+    Op symbols are validated per chunk (ValueError on unknown ones). The
+    stored ``result`` column is trusted unless ``verify`` is set, in which
+    case results are recomputed with NumPy and a mismatch raises ValueError.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+    pd = _pandas(use_pandas)
+    if pd is not None:
+        return _pandas_chunks(pd, path, chunk_size, verify)
+    return _stdlib_chunks(path, chunk_size, verify)
@@ -1,4 +1,4 @@
-from typing import Dict, Type
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Type
 from app.operation import (
     Operation,
     AddOperation,
@@ -8,6 +8,9 @@ from app.operation import (
     PowerOperation,
     RootOperation,
 )
+from app.operation.batch import as_arrays, numpy
+from .batch import BatchResult
+from .cache import ResultCache
 from .calculation import Calculation
 
 
@@ -20,23 +23,140 @@ class CalculationFactory:
         "^": PowerOperation,
         "root": RootOperation,
     }
+    # Reverse index (operation type -> symbol), kept in sync by register()
+    _symbols: Dict[type, str] = {op_cls: symbol for symbol, op_cls in _ops.items()}
+    # Shared (flyweight) instances; operations are stateless
+    _instances: Dict[str, Operation] = {}
+    # Optional LRU result cache used by execute(); see configure_cache()
+    _cache: Optional[ResultCache] = None
+    _cached_symbols: FrozenSet[str] = frozenset()
 
     @classmethod
     def supported(cls):
         return list(cls._ops.keys())
 
+    @classmethod
+    def register(cls, symbol: str, op_cls: Type[Operation]) -> None:
+        """Register (or replace) the operation class used for ``symbol``."""
+        previous = cls._ops.get(symbol)
+        if previous is not None and cls._symbols.get(previous) == symbol:
+            del cls._symbols[previous]
+        cls._ops[symbol] = op_cls
+        cls._symbols[op_cls] = symbol
+        cls._instances.pop(symbol, None)
+        cls._invalidate_cache()
+
+    @classmethod
+    def unregister(cls, symbol: str) -> None:
+        """Remove ``symbol`` if registered; unknown symbols are ignored."""
+        op_cls = cls._ops.pop(symbol, None)
+        if op_cls is not None and cls._symbols.get(op_cls) == symbol:
+            del cls._symbols[op_cls]
+        cls._instances.pop(symbol, None)
+        cls._invalidate_cache()
+
+    @classmethod
+    def _invalidate_cache(cls) -> None:
+        if cls._cache is not None:
+            cls._cache.clear()
+
+    @classmethod
+    def operation(cls, symbol: str) -> Operation:
+        """Return the shared operation instance for ``symbol``."""
+        op = cls._instances.get(symbol)
+        if op is None:
+            op_cls = cls._ops.get(symbol)
+            if op_cls is None:
+                raise ValueError(f"Unknown operation: {symbol}")
+            op = cls._instances[symbol] = op_cls()  # type: ignore[call-arg]
+        return op
+
     @classmethod
     def from_symbol(cls, symbol: str, a: float, b: float) -> Calculation:
-        op_cls = cls._ops.get(symbol)
-        if op_cls is None:
-            raise ValueError(f"Unknown operation: {symbol}")
-        op_instance: Operation = op_cls()  # type: ignore[call-arg]
-        return Calculation(op=op_instance, a=a, b=b)
+        return Calculation(op=cls.operation(symbol), a=a, b=b)
+
+    @classmethod
+    def configure_cache(cls, maxsize: int, symbols: Iterable[str] = ("^", "root")) -> None:
+        """Enable an LRU result cache of ``maxsize`` entries (0 disables it).
+
+        Only calculations whose symbol is in ``symbols`` (the expensive
+        operations by default) go through the cache.
+        """
+        cls._cache = ResultCache(maxsize) if maxsize > 0 else None
+        cls._cached_symbols = frozenset(symbols)
+
+    @classmethod
+    def cache(cls) -> Optional[ResultCache]:
+        return cls._cache
+
+    @classmethod
+    def execute(cls, calc: Calculation) -> float:
+        """Execute ``calc``, consulting the result cache when enabled."""
+        cache = cls._cache
+        if cache is None:
+            return calc.execute()
+        symbol = cls.symbol_for(calc.op)
+        if symbol not in cls._cached_symbols:
+            return calc.execute()
+        return cache.get_or_compute((symbol, calc.a, calc.b), calc.execute)
 
     @classmethod
     def symbol_for(cls, op: Operation) -> str:
-        """Return the symbol for a given Operation instance, or '?' if unknown."""
-        for symbol, op_cls in cls._ops.items():
-            if isinstance(op, op_cls):
+        """Return the symbol for a given Operation instance, or '?' if unknown.
+
+        Exact types resolve with one dict lookup; subclasses of registered
+        operations fall back to a walk over their MRO.
+        """
+        symbol = cls._symbols.get(type(op))
+        if symbol is not None:
+            return symbol
+        for klass in type(op).__mro__[1:]:
+            symbol = cls._symbols.get(klass)
+            if symbol is not None:
                 return symbol
         return "?"
+
+    @classmethod
+    def evaluate_many(cls, symbols: Any, a: Any, b: Any) -> BatchResult:
+        """Evaluate many operand pairs with NumPy.
+
+        ``symbols`` is a single operator symbol or an array of symbols matching
+        (or broadcastable to) ``a`` and ``b``. Errors are reported per element
+        in ``BatchResult.errors`` instead of raising; an unknown single symbol
+        raises ValueError like ``from_symbol``.
+        """
+        np = numpy()
+        a_arr, b_arr = as_arrays(a, b)
+        if isinstance(symbols, str):
+            values, errors = cls._apply_many(cls.operation(symbols), a_arr, b_arr)
+            return BatchResult(values, errors)
+
+        sym_arr = np.asarray(symbols, dtype=object)
+        sym_arr, a_arr, b_arr = np.broadcast_arrays(sym_arr, a_arr, b_arr)
+        values = np.full(a_arr.shape, np.nan)
+        errors = np.full(a_arr.shape, None, dtype=object)
+        for symbol in set(sym_arr.ravel().tolist()):
+            mask = sym_arr == symbol
+            try:
+                op = cls.operation(symbol)
+            except ValueError as exc:
+                errors[mask] = str(exc)
+                continue
+            values[mask], errors[mask] = cls._apply_many(op, a_arr[mask], b_arr[mask])
+        return BatchResult(values, errors)
+
+    @staticmethod
+    def _apply_many(op: Operation, a: Any, b: Any):
+        apply_many = getattr(op, "apply_many", None)
+        if apply_many is not None:
+            return apply_many(a, b)
+        # Scalar fallback for operations without an array implementation
+        np = numpy()
+        values = np.full(a.shape, np.nan)
+        errors = np.full(a.shape, None, dtype=object)
+        for idx, (x, y) in enumerate(zip(a.ravel().tolist(), b.ravel().tolist())):
+            try:
+                values.flat[idx] = op.apply(x, y)
+            except (ValueError, ZeroDivisionError) as exc:
+                errors.flat[idx] = str(exc)
+        return values, errors
@@ -1,42 +1,171 @@
+import math
+from collections import deque
 from dataclasses import dataclass
-from typing import Callable, List, Optional
+from typing import Any, Callable, Deque, Iterator, List, Optional, Sequence
+from app.operation import Operation
 from .calculation import Calculation
+from .aggregates import RunningStats, aggregates_for
+from .archive import BLOCK_ROWS, is_archive_path, read_archive, write_archive
+from .csvio import CHUNK_ROWS, read_csv, write_csv
 from .factory import CalculationFactory
+from .observers import BLOCK, BackgroundObserver, BatchCallback
+from .query import Range, matching_rows
+from .storage import COLUMNS, Entry, branch, new_store
 
 
-class History:
-    """Stores calculations and supports observers, persistence, and mementos."""
+def format_entry(e: Entry) -> str:
+    """Format a row as ``"a op b = result"``."""
+    return f"{e.calc.a} {CalculationFactory.symbol_for(e.calc.op)} {e.calc.b} = {e.result}"
 
-    def __init__(self) -> None:
-        self._items: List[Calculation] = []
+
+class History:  # pylint: disable=too-many-public-methods
+    """Stores calculations and supports observers, persistence, and mementos.
+
+    Entries live in an append-only store (see ``app.calculation.storage``)
+    that may be shared with mementos; only the first ``_size`` rows belong to
+    the current state. Appending after an undo branches off the shared prefix
+    in O(1) (``storage.branch``) so older snapshots stay valid.
+
+    ``backend`` selects the store: ``"list"`` (default) or ``"columnar"``.
+    """
+
+    Entry = Entry
+
+    def __init__(self, backend: str = "list") -> None:
+        self._store: Any = new_store(backend)
+        self._size = 0
+        aggregates_for(self._store)  # maintained from the first add
         self._observers: List[Callable[[Calculation, float], None]] = []
+        self._bulk_observers: List[Callable[["History", int], None]] = []
+        self._background: List[BackgroundObserver] = []
 
-    def add(self, calc: Calculation) -> None:
-        self._items.append(calc)
-        # Notify observers after successful append
-        try:
-            result = calc.execute()
-        except (ValueError, ZeroDivisionError):  # pragma: no cover - notify only on success
-            # In case of execution error, still notify with exception info if observers expect it
-            # but keep it simple: don't notify on failed execute
-            return
+    def add(self, calc: Calculation, result: Optional[float] = None) -> None:
+        """Append a calculation, executing it only if no result is supplied.
+
+        A calculation that fails to execute is still stored (with a NaN result)
+        but observers are only notified on success.
+        """
+        if result is None:
+            try:
+                result = calc.execute()
+            except (ValueError, ZeroDivisionError):
+                self._append(calc, math.nan)
+                return
+        self._append(calc, result)
+        if self._observers:
+            self._notify(calc, result)
+
+    def _notify(self, calc: Calculation, result: float) -> None:
         for obs in list(self._observers):
             obs(calc, result)
 
+    def _append(self, calc: Calculation, result: float) -> None:
+        if len(self._store) != self._size:
+            # Diverging from a restored state: branch so mementos keep their rows
+            self._store = branch(self._store, self._size)
+        self._store.append(calc, result)
+        aggregates = aggregates_for(self._store, create=False)
+        if aggregates is not None and aggregates.counted == self._size:
+            aggregates.add(CalculationFactory.symbol_for(calc.op), result)
+        self._size += 1
+
+    def add_many(  # pylint: disable=too-many-arguments
+        self,
+        ops: Sequence[Operation],
+        codes: Sequence[int],
+        a: Sequence[float],
+        b: Sequence[float],
+        results: Sequence[float],
+    ) -> None:
+        """Bulk-append rows given as columns; row ``i`` uses ``ops[codes[i]]``.
+
+        Per-row observers are not called; bulk observers get a single
+        ``(history, count)`` notification instead.
+        """
+        count = len(codes)
+        if len(self._store) != self._size:
+            self._store = branch(self._store, self._size)
+        self._store.extend(ops, codes, a, b, results)
+        self._size += count
+        if count:
+            for obs in list(self._bulk_observers):
+                obs(self, count)
+
+    def _view(self) -> Iterator[Entry]:
+        return self._store.iter_entries(0, self._size)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def backend(self) -> str:
+        return self._store.name
+
+    def column(self, name: str) -> Sequence:
+        """Return a column (``a``, ``op``, ``b`` or ``result``) of the current state.
+
+        With the columnar backend numeric columns are ``array('d')`` copies,
+        ready for C-speed aggregates such as ``sum`` or ``numpy.frombuffer``.
+        """
+        if name not in COLUMNS:
+            raise ValueError(f"Unknown column: {name}")
+        return self._store.column(name, self._size)
+
     def all(self) -> List[Calculation]:
-        return list(self._items)
+        return [e.calc for e in self._view()]
+
+    def entries(self) -> List[Entry]:
+        """Return the stored (calculation, result) records."""
+        return list(self._view())
 
     def last(self) -> Optional[Calculation]:
-        return self._items[-1] if self._items else None
+        return self._store.entry(self._size - 1).calc if self._size else None
 
     def clear(self) -> None:
-        self._items.clear()
+        # Start a fresh store; the old one may still back a memento
+        self._store = self._store.empty()
+        self._size = 0
+        aggregates_for(self._store)
 
     def to_strings(self) -> List[str]:
-        return [
-            f"{c.a} {CalculationFactory.symbol_for(c.op)} {c.b} = {c.execute()}"
-            for c in self._items
-        ]
+        return list(self.iter_strings())
+
+    def iter_strings(self, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        """Lazily format rows ``start:stop`` (slice semantics, negatives allowed).
+
+        Only the selected rows are read and formatted.
+        """
+        first, last, _ = slice(start, stop).indices(self._size)
+        return map(format_entry, self._store.iter_entries(first, max(first, last)))
+
+    def stats(self) -> RunningStats:
+        """Summary statistics of the current rows (see ``aggregates``).
+
+        Maintained on every ``add``; rows added in bulk (``add_many``, loads)
+        are counted on the next call. After undo/redo the stats are rebuilt
+        from the nearest checkpoint of the shared store.
+        """
+        return aggregates_for(self._store).at(self._store, self._size)
+
+    def filter(
+        self,
+        op: Optional[str] = None,
+        result_range: Optional[Range] = None,
+        a_range: Optional[Range] = None,
+        b_range: Optional[Range] = None,
+    ) -> List[Entry]:
+        """Return entries matching every given criterion, in insertion order.
+
+        ``op`` is an operation symbol; ranges are inclusive ``(lo, hi)`` pairs
+        where either bound may be None. Failed (NaN) results never match a
+        range. Backed by per-store indexes that are built on the first query
+        and afterwards only index newly appended rows (see ``query``).
+        """
+        rows = matching_rows(
+            self._store, self._size, op, result=result_range, a=a_range, b=b_range
+        )
+        entry = self._store.entry
+        return [entry(row) for row in rows]
 
     # --- Observer management ---
     def register_observer(self, callback: Callable[[Calculation, float], None]) -> None:
@@ -49,6 +178,38 @@ class History:
             self._observers.remove(callback)
         except ValueError:  # pragma: no cover - defensive
             pass
+        if callback in self._background:
+            self._background.remove(callback)  # type: ignore[arg-type]
+            callback.close()  # type: ignore[attr-defined]
+
+    def register_async_observer(
+        self,
+        callback: BatchCallback,
+        maxsize: int = 10_000,
+        batch_size: int = 256,
+        policy: str = BLOCK,
+    ) -> BackgroundObserver:
+        """Deliver (calculation, result) events to ``callback`` from a worker thread.
+
+        ``callback`` receives a list of up to ``batch_size`` events per call.
+        ``policy`` is ``"block"`` or ``"drop_oldest"`` when ``maxsize`` events
+        are queued. Returns the observer (pass it to ``unregister_observer``).
+        """
+        observer = BackgroundObserver(callback, maxsize, batch_size, policy)
+        self._observers.append(observer)
+        self._background.append(observer)
+        return observer
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for background observers to drain their queues; False on timeout."""
+        drained = True
+        for obs in self._background:
+            drained = obs.flush(timeout) and drained
+        return drained
+
+    def register_bulk_observer(self, callback: Callable[["History", int], None]) -> None:
+        """Register a callback receiving (history, row count) after ``add_many``."""
+        self._bulk_observers.append(callback)
 
     # --- pandas persistence helpers ---
     def to_dataframe(self):  # type: ignore[override]
@@ -60,55 +221,119 @@ class History:
         import importlib  # pylint: disable=import-outside-toplevel
 
         pd = importlib.import_module("pandas")  # raises ImportError if missing
-        data = [
-            {
-                "a": c.a,
-                "op": CalculationFactory.symbol_for(c.op),
-                "b": c.b,
-                "result": c.execute(),
-            }
-            for c in self._items
-        ]
-        return pd.DataFrame(data, columns=["a", "op", "b", "result"])  # type: ignore[no-any-return]
-
-    def save_csv(self, path: str) -> None:
-        """Save history to CSV using pandas."""
-        df = self.to_dataframe()
-        df.to_csv(path, index=False)
+        data = {name: self._store.column(name, self._size) for name in COLUMNS}
+        return pd.DataFrame(data, columns=list(COLUMNS))  # type: ignore[no-any-return]
+
+    def save_csv(self, path: str, chunk_size: int = CHUNK_ROWS) -> None:
+        """Save history to CSV, ``chunk_size`` rows at a time (see ``app.calculation.csvio``).
+
+        Uses pandas when installed and the stdlib ``csv`` module otherwise;
+        no full DataFrame is built, so memory stays bounded by the chunk.
+        """
+        write_csv(path, self._store, self._size, chunk_size)
 
     @classmethod
-    def load_csv(cls, path: str) -> "History":
-        """Load history from CSV using pandas and rebuild Calculation objects."""
-        import importlib  # pylint: disable=import-outside-toplevel
-        from .factory import CalculationFactory as _Factory  # pylint: disable=import-outside-toplevel
+    def load_csv(
+        cls, path: str, backend: str = "list", verify: bool = False, chunk_size: int = CHUNK_ROWS
+    ) -> "History":
+        """Load history from CSV in chunks, bulk-inserting each one.
+
+        Op symbols are validated per chunk and the stored ``result`` column
+        is trusted; with ``verify=True`` results are recomputed in bulk
+        (``CalculationFactory.evaluate_many``) and a mismatch raises ValueError.
+        """
+        hist = cls(backend)
+        for ops, codes, a, b, results in read_csv(path, chunk_size, verify):
+            hist.add_many(ops, codes, a, b, results)
+        return hist
+
+    # --- binary persistence (memory-mapped) ---
+    def save_binary(self, path: str) -> None:
+        """Save history in the fixed-width binary format (see ``app.calculation.binary``)."""
+        from .binary import write_binary  # pylint: disable=import-outside-toplevel
+
+        write_binary(path, *(self._store.column(name, self._size) for name in COLUMNS))
+
+    @classmethod
+    def load_binary(cls, path: str) -> "History":
+        """Open a binary history via ``mmap``; rows are read lazily on access."""
+        from .binary import MappedStore  # pylint: disable=import-outside-toplevel
 
-        pd = importlib.import_module("pandas")  # raises ImportError if missing
-        df = pd.read_csv(path)
         hist = cls()
-        for _, row in df.iterrows():
-            calc = _Factory.from_symbol(str(row["op"]), float(row["a"]), float(row["b"]))
-            hist.add(calc)
+        hist._store = MappedStore(path)
+        hist._size = len(hist._store)
+        return hist
+
+    # --- compressed archive ---
+    def save_archive(self, path: str, block_rows: int = BLOCK_ROWS) -> None:
+        """Save history as a compressed columnar archive (see ``app.calculation.archive``)."""
+        write_archive(path, self._store, self._size, block_rows)
+
+    @classmethod
+    def load_archive(cls, path: str, backend: str = "list") -> "History":
+        """Load an archive block by block, bulk-inserting each one."""
+        hist = cls(backend)
+        for ops, codes, a, b, results in read_archive(path):
+            hist.add_many(ops, codes, a, b, results)
         return hist
 
+    # --- format dispatch by file extension ---
+    def save(self, path: str) -> None:
+        """Save as binary for ``.bin`` paths, an archive for ``.calz``, CSV otherwise."""
+        from .binary import is_binary_path  # pylint: disable=import-outside-toplevel
+
+        if is_binary_path(path):
+            self.save_binary(path)
+        elif is_archive_path(path):
+            self.save_archive(path)
+        else:
+            self.save_csv(path)
+
+    @classmethod
+    def load(cls, path: str, backend: str = "list", verify: bool = False) -> "History":
+        """Load a ``.bin`` history via mmap, or a ``.calz``/CSV history into ``backend``.
+
+        ``backend`` does not apply to ``.bin`` files: they are always mapped
+        (``History.backend == "mapped"``), which is what keeps loading them O(1).
+        """
+        from .binary import is_binary_path  # pylint: disable=import-outside-toplevel
+
+        if is_binary_path(path):
+            return cls.load_binary(path)
+        if is_archive_path(path):
+            return cls.load_archive(path, backend=backend)
+        return cls.load_csv(path, backend=backend, verify=verify)
+
     # --- Memento pattern ---
     @dataclass(frozen=True)
     class Memento:
-        items: List[Calculation]
+        """Version pointer: the first ``size`` rows of a shared append-only store."""
+
+        store: Any
+        size: int
 
     def create_memento(self) -> "History.Memento":
-        """Create a snapshot of current history state."""
-        return History.Memento(list(self._items))
+        """Create a snapshot of current history state in O(1)."""
+        return History.Memento(self._store, self._size)
 
     def restore_memento(self, memento: "History.Memento") -> None:
-        """Restore state from a memento snapshot."""
-        self._items = list(memento.items)
+        """Restore state from a memento snapshot in O(1)."""
+        self._store = memento.store
+        self._size = memento.size
 
     class Caretaker:  # pylint: disable=too-few-public-methods
-        """Caretaker to manage undo/redo stacks for a History instance."""
+        """Caretaker to manage undo/redo stacks for a History instance.
+
+        ``max_depth`` bounds how many steps can be undone; older states are
+        discarded. ``None`` keeps every recorded state.
+        """
 
-        def __init__(self) -> None:
-            self._undo: List[History.Memento] = []
-            self._redo: List[History.Memento] = []
+        def __init__(self, max_depth: Optional[int] = None) -> None:
+            if max_depth is not None and max_depth < 0:
+                raise ValueError("max_depth must be non-negative")
+            maxlen = None if max_depth is None else max_depth + 1
+            self._undo: Deque[History.Memento] = deque(maxlen=maxlen)
+            self._redo: Deque[History.Memento] = deque(maxlen=maxlen)
 
         def record(self, hist: "History") -> None:
             self._undo.append(hist.create_memento())
@@ -0,0 +1,233 @@
+import csv
+import os
+import time
+from typing import IO, Iterator, List, Optional
+from app.numeric import parse_number, parse_stored
+from .calculation import Calculation
+from .factory import CalculationFactory
+from .history import History
+from .storage import Entry
+
+
+class HistoryJournal:  # pylint: disable=too-many-instance-attributes
+    """Append-only CSV journal used by the ``journal`` AUTO_SAVE mode.
+
+    Each calculation appends one ``a,op,b,result`` row to ``journal_path``
+    instead of rewriting the whole snapshot. The first line records how many
+    rows the snapshot held when the journal was started, so a journal left
+    behind by an interrupted compaction is ignored on replay.
+
+    - ``fsync_every``: fsync after this many appended rows (0 = only on close)
+    - ``compact_every``: fold the journal into the snapshot after this many rows
+    - ``backend``: History storage backend used by ``load``
+
+    Replay skips a torn final line (no trailing newline) and counts other
+    unparsable rows in ``skipped``. If ``load`` cannot read the snapshot it
+    records why in ``snapshot_error`` and ``compact`` refuses to overwrite it;
+    new rows are still appended to the journal. ``follow`` polls the file for
+    rows that other sessions sharing it append.
+    """
+
+    HEADER_PREFIX = "#base,"
+    FOLLOW_INTERVAL = 0.5
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        snapshot_path: str,
+        journal_path: Optional[str] = None,
+        fsync_every: int = 1,
+        compact_every: int = 1000,
+        backend: str = "list",
+    ) -> None:
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or f"{snapshot_path}.journal"
+        self.fsync_every = fsync_every
+        self.compact_every = compact_every
+        self.backend = backend
+        self._fh: Optional[IO[str]] = None
+        self._writer = None
+        self._unsynced = 0
+        self._since_compact = 0
+        self.skipped = 0
+        self.snapshot_error: Optional[str] = None
+
+    # --- writing ---
+    def append(self, calc: Calculation, result: float) -> None:
+        """Append a single row; observer-compatible (calculation, result) signature."""
+        if self._writer is None:
+            self._open(base=None)
+        self._writer.writerow(  # type: ignore[union-attr]
+            [calc.a, CalculationFactory.symbol_for(calc.op), calc.b, result]
+        )
+        self._unsynced += 1
+        self._since_compact += 1
+        if self.fsync_every and self._unsynced >= self.fsync_every:
+            self.flush()
+
+    def record(self, hist: History, calc: Calculation, result: float) -> None:
+        """Append a row and compact into ``hist``'s snapshot when due."""
+        self.append(calc, result)
+        if self.compact_every and self._since_compact >= self.compact_every:
+            self.compact(hist)
+
+    def flush(self) -> None:
+        """Flush buffered rows and fsync them to disk."""
+        if self._fh is not None:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+        self._unsynced = 0
+
+    def compact(self, hist: History) -> None:
+        """Write the full snapshot for ``hist`` and restart an empty journal."""
+        if self.snapshot_error is not None:
+            raise ValueError(
+                f"Not overwriting unreadable snapshot {self.snapshot_path}: {self.snapshot_error}"
+            )
+        root, ext = os.path.splitext(self.snapshot_path)
+        tmp_path = f"{root}.tmp{ext}"  # keep the extension: it selects the format
+        hist.save(tmp_path)
+        os.replace(tmp_path, self.snapshot_path)
+        self.close()
+        self._open(base=len(hist))
+        self.flush()
+        self._since_compact = 0
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self.flush()
+            self._fh.close()
+        self._fh = None
+        self._writer = None
+
+    def _open(self, base: Optional[int]) -> None:
+        # pylint: disable=consider-using-with  # handle stays open across appends
+        if base is None:
+            self._fh = open(self.journal_path, "a", newline="", encoding="utf-8")
+        else:
+            self._fh = open(self.journal_path, "w", newline="", encoding="utf-8")
+            self._fh.write(f"{self.HEADER_PREFIX}{base}\n")
+        self._writer = csv.writer(self._fh)
+
+    # --- reading ---
+    def replay(self, hist: History) -> int:
+        """Append journal rows onto ``hist`` (already holding the snapshot).
+
+        Returns the number of replayed rows; a journal whose base does not
+        match ``len(hist)`` is stale and skipped.
+        """
+        self.skipped = 0
+        if not os.path.exists(self.journal_path):
+            return 0
+        count = 0
+        with open(self.journal_path, newline="", encoding="utf-8") as fh:
+            first = fh.readline()
+            if first.startswith(self.HEADER_PREFIX):
+                base = first[len(self.HEADER_PREFIX):].strip()
+                if not first.endswith("\n") or not base.isdigit() or int(base) != len(hist):
+                    return 0
+            else:
+                fh.seek(0)
+            for line in fh:
+                if not line.endswith("\n"):
+                    break  # a torn final line: the process died mid-write
+                entry = self._parse(line)
+                if entry is None:
+                    self.skipped += 1
+                    continue
+                hist.add(entry.calc, entry.result)
+                count += 1
+        return count
+
+    @staticmethod
+    def _parse(line: str) -> Optional[Entry]:
+        """The row on one journal line, or None if it cannot be parsed."""
+        try:
+            a, op, b, result = next(csv.reader([line]))
+            calc = CalculationFactory.from_symbol(op, parse_number(a), parse_number(b))
+            return Entry(calc, parse_stored(result))
+        except ValueError:  # wrong field count, bad number or unknown op
+            return None
+
+    def load(self) -> History:
+        """Load snapshot plus journal, then compact so the journal starts empty.
+
+        Raises OSError/ValueError if the snapshot exists but cannot be read;
+        the snapshot is then never compacted over.
+        """
+        self.snapshot_error = None
+        if os.path.exists(self.snapshot_path):
+            try:
+                hist = History.load(self.snapshot_path, backend=self.backend)
+            except (OSError, ValueError) as exc:
+                self.snapshot_error = str(exc)
+                raise
+        else:
+            hist = History(self.backend)
+        self.replay(hist)
+        self.compact(hist)
+        return hist
+
+    def follow(self, interval: float = FOLLOW_INTERVAL) -> Iterator[Entry]:
+        """Yield rows appended to the journal from now on, polling every ``interval`` s.
+
+        Never ends on its own (the REPL stops on Ctrl+C). A row is read once
+        its line is complete; unparsable rows are skipped. When a compaction
+        restarts the journal, rows folded into the snapshot before they were
+        read are taken from the snapshot, then reading resumes at the top of
+        the new journal.
+        """
+        self.flush()
+        tail = _Tail(self)
+        tail.read()  # skip the rows already there
+        while True:
+            time.sleep(interval)
+            yield from tail.read()
+
+
+class _Tail:  # pylint: disable=too-few-public-methods
+    """Reading position in a journal that other sessions append to and compact."""
+
+    def __init__(self, journal: HistoryJournal) -> None:
+        self.journal = journal
+        self.header: Optional[bytes] = None  # first line if it is a base header, else b""
+        self.offset = 0
+        self.lines = 0  # complete lines read after the header
+
+    def read(self) -> List[Entry]:
+        """Rows completed since the last call."""
+        rows: List[Entry] = []
+        try:
+            fh = open(self.journal.journal_path, "rb")  # pylint: disable=consider-using-with
+        except FileNotFoundError:
+            self.header, self.offset, self.lines = b"", 0, 0
+            return rows
+        with fh:
+            first = fh.readline()
+            header = first if first.startswith(HistoryJournal.HEADER_PREFIX.encode()) else b""
+            if header != self.header or os.fstat(fh.fileno()).st_size < self.offset:
+                if self.header is not None:  # restarted by a compaction
+                    rows.extend(self._compacted(header))
+                self.header, self.offset, self.lines = header, len(header), 0
+            fh.seek(self.offset)
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    break  # still being written
+                self.offset += len(line)
+                self.lines += 1
+                entry = HistoryJournal._parse(line.decode("utf-8"))  # pylint: disable=protected-access
+                if entry is not None:
+                    rows.append(entry)
+        return rows
+
+    def _compacted(self, header: bytes) -> List[Entry]:
+        """Snapshot rows that were compacted before they were read from the old journal."""
+        old, new = _base(self.header or b""), _base(header)
+        if old is None or new is None or new <= old + self.lines:
+            return []
+        snapshot = History.load(self.journal.snapshot_path, backend=self.journal.backend)
+        return snapshot.entries()[old + self.lines:new]
+
+
+def _base(header: bytes) -> Optional[int]:
+    base = header[len(HistoryJournal.HEADER_PREFIX):].strip()
+    return int(base) if header and base.isdigit() else None
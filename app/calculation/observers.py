@@ -0,0 +1,106 @@
+"""Background (asynchronous) observer dispatch for History.
+
+``BackgroundObserver`` is a regular History observer whose ``__call__`` only
+enqueues the ``(calculation, result)`` event; a worker thread drains the
+bounded queue and hands the wrapped callback a list of up to ``batch_size``
+events per call. When the queue is full the producer either blocks until
+there is room (``"block"``) or discards the oldest queued event
+(``"drop_oldest"``).
+"""
+
+import threading
+from collections import deque
+from typing import Callable, Deque, List, Optional, Tuple
+from .calculation import Calculation
+
+Event = Tuple[Calculation, float]
+BatchCallback = Callable[[List[Event]], None]
+
+BLOCK = "block"
+DROP_OLDEST = "drop_oldest"
+POLICIES = (BLOCK, DROP_OLDEST)
+
+
+class BackgroundObserver:  # pylint: disable=too-many-instance-attributes
+    """Queue events and deliver them in batches from a worker thread.
+
+    Exceptions raised by the callback are counted in ``failures`` and do not
+    stop the worker. ``dropped`` counts events discarded by ``drop_oldest``.
+    """
+
+    def __init__(
+        self,
+        callback: BatchCallback,
+        maxsize: int = 10_000,
+        batch_size: int = 256,
+        policy: str = BLOCK,
+    ) -> None:
+        if policy not in POLICIES:
+            raise ValueError(
+                f"Unknown observer policy: {policy} (expected one of {', '.join(POLICIES)})"
+            )
+        if maxsize < 1 or batch_size < 1:
+            raise ValueError("maxsize and batch_size must be >= 1")
+        self.callback = callback
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.policy = policy
+        self.delivered = 0
+        self.dropped = 0
+        self.failures = 0
+        self._events: Deque[Event] = deque()
+        self._pending = 0  # queued plus in-flight events
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="history-observer", daemon=True)
+        self._thread.start()
+
+    def __call__(self, calc: Calculation, result: float) -> None:
+        with self._cond:
+            if self._closed:
+                raise ValueError("Background observer is closed")
+            while len(self._events) >= self.maxsize:
+                if self.policy == DROP_OLDEST:
+                    self._events.popleft()
+                    self._pending -= 1
+                    self.dropped += 1
+                else:
+                    self._cond.wait()
+            self._events.append((calc, result))
+            self._pending += 1
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._events or self._closed)
+                if not self._events:
+                    return
+                size = min(self.batch_size, len(self._events))
+                batch = [self._events.popleft() for _ in range(size)]
+                self._cond.notify_all()  # wake producers blocked on a full queue
+            try:
+                self.callback(batch)
+                self.delivered += len(batch)
+            except Exception:  # pylint: disable=broad-exception-caught
+                self.failures += 1
+            with self._cond:
+                self._pending -= len(batch)
+                self._cond.notify_all()
+
+    @property
+    def pending(self) -> int:
+        """Events queued or being delivered."""
+        return self._pending
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued event was delivered; False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Deliver what is queued, then stop the worker thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
@@ -0,0 +1,131 @@
+"""Shard large calculation batches across a process pool.
+
+Rows are cut into chunks of ``chunk_size`` and dispatched with
+``ProcessPoolExecutor.map``, so results come back in input order. Each
+worker evaluates its chunk with ``Calculation.execute`` and returns a typed
+``array('d')`` (cheap to pickle) plus the offsets of failed rows. Operations
+are shipped as symbols and resolved in the worker through
+``CalculationFactory``; operations registered at runtime are only visible
+to workers started with the ``fork`` start method.
+"""
+
+import os
+from array import array
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, Tuple
+from .calculation import Calculation
+from .factory import CalculationFactory
+from .history import History
+
+DEFAULT_CHUNK_SIZE = 50_000
+_NAN = float("nan")
+
+_defaults = {"workers": 0, "chunk_size": DEFAULT_CHUNK_SIZE}
+
+Chunk = Tuple[Tuple[str, ...], array, array, array]
+ChunkResult = Tuple[array, List[Tuple[int, str]]]
+
+
+@dataclass(frozen=True)
+class ParallelResult:
+    """Result of a parallel evaluation.
+
+    - values: ``array('d')`` in input order, NaN where a row failed
+    - errors: ``(row, message)`` pairs for failed rows, in input order
+    """
+
+    values: array
+    errors: List[Tuple[int, str]]
+
+    @property
+    def error_count(self) -> int:
+        return len(self.errors)
+
+
+def configure(workers: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """Set process-wide defaults; ``workers=0`` uses every available CPU."""
+    if workers < 0 or chunk_size < 1:
+        raise ValueError("workers must be >= 0 and chunk_size >= 1")
+    _defaults["workers"] = workers
+    _defaults["chunk_size"] = chunk_size
+
+
+def _cpu_count() -> int:
+    return os.cpu_count() or 1
+
+
+def _evaluate_chunk(chunk: Chunk) -> ChunkResult:
+    """Evaluate one chunk; runs in a worker process (or inline for one worker)."""
+    symbols, codes, a, b = chunk
+    ops = [CalculationFactory.operation(symbol) for symbol in symbols]
+    values = array("d", bytes(8 * len(codes)))
+    errors: List[Tuple[int, str]] = []
+    for i, (code, x, y) in enumerate(zip(codes, a, b)):
+        try:
+            values[i] = Calculation(ops[code], x, y).execute()
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            # A failing row must not abort the chunk (or the pool's whole map)
+            values[i] = _NAN
+            errors.append((i, str(exc) or type(exc).__name__))
+    return values, errors
+
+
+def _factorize(symbols: Sequence[str]) -> Tuple[Tuple[str, ...], array]:
+    """Return (distinct symbols, per-row code); unknown symbols raise ValueError."""
+    code_of = {}
+    for symbol in dict.fromkeys(symbols):
+        CalculationFactory.operation(symbol)  # validate once per distinct symbol
+        code_of[symbol] = len(code_of)
+    return tuple(code_of), array("H", map(code_of.__getitem__, symbols))
+
+
+def _chunks(symbols, codes, a, b, chunk_size: int) -> Iterator[Chunk]:
+    for start in range(0, len(codes), chunk_size):
+        stop = start + chunk_size
+        yield symbols, codes[start:stop], a[start:stop], b[start:stop]
+
+
+def evaluate_parallel(  # pylint: disable=too-many-arguments,too-many-locals
+    symbols: Sequence[str],
+    a: Sequence[float],
+    b: Sequence[float],
+    *,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    history: Optional[History] = None,
+) -> ParallelResult:
+    """Evaluate ``symbols[i](a[i], b[i])`` for every row across processes.
+
+    ``workers`` and ``chunk_size`` default to the values set by ``configure``
+    (``workers=0`` means one per CPU). With a single worker, or input that
+    fits one chunk, rows are evaluated inline without starting a pool. When
+    ``history`` is given all rows (failed ones with a NaN result, like
+    ``History.add``) are appended with one ``History.add_many`` call.
+    """
+    workers = _defaults["workers"] if workers is None else workers
+    chunk_size = _defaults["chunk_size"] if chunk_size is None else chunk_size
+    if len(symbols) != len(a) or len(a) != len(b):
+        raise ValueError("symbols, a and b must have the same length")
+    distinct, codes = _factorize(symbols)
+    a_arr, b_arr = array("d", a), array("d", b)
+    chunks = _chunks(distinct, codes, a_arr, b_arr, chunk_size)
+    workers = min(workers or _cpu_count(), -(-len(codes) // chunk_size))
+    if workers <= 1:
+        parts: List[ChunkResult] = [_evaluate_chunk(chunk) for chunk in chunks]
+    else:
+        # Imported on use: multiprocessing would add tens of ms to REPL startup
+        from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_evaluate_chunk, chunks))
+
+    values = array("d")
+    errors: List[Tuple[int, str]] = []
+    for index, (chunk_values, chunk_errors) in enumerate(parts):
+        offset = index * chunk_size
+        values.extend(chunk_values)
+        errors.extend((offset + i, message) for i, message in chunk_errors)
+    if history is not None:
+        ops = [CalculationFactory.operation(symbol) for symbol in distinct]
+        history.add_many(ops, codes, a_arr, b_arr, values)
+    return ParallelResult(values, errors)
@@ -0,0 +1,139 @@
+"""Incrementally maintained indexes for querying History.
+
+Indexes belong to a store (see ``app.calculation.storage``), not to a
+History: stores are append-only and shared by mementos, so an index only
+has to catch up on rows appended since the last query, and restoring a
+memento reuses whatever was already indexed for its store. A branched store
+is queried run by run through the indexes of the stores it is made of
+(``matching_rows``), so branching never copies an index.
+
+- per-op posting lists: ascending row numbers for each symbol
+- sorted value indexes for ``a``, ``b`` and ``result``: sorted ``(value, row)``
+  pairs plus an unsorted tail of new rows that is merged on the next range
+  query. Only the tail is sorted: up to ``INSORT_MAX`` new rows are inserted
+  in place, larger tails are spliced in between slices of the sorted run.
+  NaN values (failed calculations) are never indexed.
+"""
+
+import math
+import weakref
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+from app.numeric import to_float
+from .factory import CalculationFactory
+from .storage import segments
+
+Range = Tuple[Optional[float], Optional[float]]
+VALUE_COLUMNS = ("a", "b", "result")
+INSORT_MAX = 64  # pending rows inserted one by one rather than spliced
+
+_INDEXES: "weakref.WeakKeyDictionary[Any, StoreIndex]" = weakref.WeakKeyDictionary()
+
+
+class SortedColumn:
+    """``(value, row)`` pairs kept sorted, with lazily merged appends."""
+
+    def __init__(self) -> None:
+        self._keys: List[float] = []
+        self._rows: List[int] = []
+        self._pending: List[Tuple[float, int]] = []
+        self._end = 0  # one past the highest row added
+
+    def add(self, value: float, row: int) -> None:
+        self._end = row + 1
+        if not math.isnan(to_float(value)):
+            self._pending.append((value, row))
+
+    def _merge(self) -> None:
+        """Merge the pending rows; they come after every sorted row."""
+        pending = self._pending
+        if not pending:
+            return
+        pending.sort()
+        keys, rows = self._keys, self._rows
+        if len(pending) <= INSORT_MAX:
+            for value, row in pending:
+                at = bisect_right(keys, value)  # after equal values of earlier rows
+                keys.insert(at, value)
+                rows.insert(at, row)
+        else:
+            new_keys: List[float] = []
+            new_rows: List[int] = []
+            last = 0
+            for value, row in pending:
+                at = bisect_right(keys, value, last)
+                new_keys += keys[last:at]
+                new_rows += rows[last:at]
+                new_keys.append(value)
+                new_rows.append(row)
+                last = at
+            new_keys += keys[last:]
+            new_rows += rows[last:]
+            self._keys, self._rows = new_keys, new_rows
+        self._pending = []
+
+    def rows(self, lo: Optional[float], hi: Optional[float], size: int) -> List[int]:
+        """Rows below ``size`` whose value lies in ``[lo, hi]`` (None = open)."""
+        self._merge()
+        start = 0 if lo is None else bisect_left(self._keys, lo)
+        stop = len(self._keys) if hi is None else bisect_right(self._keys, hi)
+        if size >= self._end:  # every indexed row is visible
+            return self._rows[start:stop]
+        return [row for row in self._rows[start:stop] if row < size]
+
+
+class StoreIndex:
+    """Posting lists and sorted value indexes over the rows of one store."""
+
+    def __init__(self) -> None:
+        self.indexed = 0
+        self.postings: Dict[str, List[int]] = {}
+        self.columns = {name: SortedColumn() for name in VALUE_COLUMNS}
+
+    def catch_up(self, store: Any) -> None:
+        """Index rows appended to ``store`` since the last call."""
+        total = len(store)
+        symbol_for = CalculationFactory.symbol_for
+        columns = self.columns
+        for row, entry in enumerate(store.iter_entries(self.indexed, total), self.indexed):
+            calc = entry.calc
+            self.postings.setdefault(symbol_for(calc.op), []).append(row)
+            columns["a"].add(calc.a, row)
+            columns["b"].add(calc.b, row)
+            columns["result"].add(entry.result, row)
+        self.indexed = total
+
+    def rows(self, size: int, op: Optional[str] = None, **ranges: Range) -> List[int]:
+        """Ascending rows below ``size`` matching every given criterion."""
+        candidates: List[List[int]] = []
+        if op is not None:
+            posting = self.postings.get(op, [])
+            candidates.append(posting[: bisect_left(posting, size)])
+        for name, bounds in ranges.items():
+            if bounds is not None:
+                candidates.append(self.columns[name].rows(bounds[0], bounds[1], size))
+        if not candidates:
+            return list(range(size))
+        candidates.sort(key=len)
+        matched = set(candidates[0])
+        for other in candidates[1:]:
+            matched.intersection_update(other)
+        return sorted(matched)
+
+
+def index_for(store: Any) -> StoreIndex:
+    """Return the up-to-date index of a leaf ``store``, building it on first use."""
+    index = _INDEXES.get(store)
+    if index is None:
+        index = _INDEXES[store] = StoreIndex()
+    index.catch_up(store)
+    return index
+
+
+def matching_rows(store: Any, size: int, op: Optional[str] = None, **ranges: Range) -> List[int]:
+    """Ascending rows below ``size`` of ``store`` matching every given criterion."""
+    rows: List[int] = []
+    for leaf, first, end in segments(store, size):
+        found = index_for(leaf).rows(end - first, op, **ranges)
+        rows.extend([row + first for row in found] if first else found)
+    return rows
@@ -0,0 +1,268 @@
+"""Append-only storage backends behind History.
+
+A store only ever grows; History owns a ``size`` and uses the first ``size``
+rows, which lets mementos share a store (see ``History.Memento``). When
+History appends after an undo, ``branch`` returns a ``BranchStore`` that
+points at the shared prefix instead of copying it, so branching is O(1).
+
+- ``ListStore``: Python list of ``Entry`` records (default)
+- ``ColumnarStore``: parallel typed arrays ``a``/``b``/``result`` (``array('d')``)
+  plus a one-byte op code per row
+"""
+
+from array import array
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from app.numeric import to_float
+from app.operation import Operation
+from .calculation import Calculation
+from .factory import CalculationFactory
+
+COLUMNS = ("a", "op", "b", "result")
+
+
+@dataclass(frozen=True)
+class Entry:
+    """A recorded calculation together with its result, computed once."""
+
+    __slots__ = ("calc", "result")
+
+    calc: Calculation
+    result: float
+
+    def __reduce__(self):
+        return (type(self), (self.calc, self.result))
+
+
+class ListStore:
+    """Entries kept as a list of ``Entry`` objects."""
+
+    name = "list"
+
+    def __init__(self, entries: Optional[List[Entry]] = None) -> None:
+        self._entries: List[Entry] = entries if entries is not None else []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def append(self, calc: Calculation, result: float) -> None:
+        self._entries.append(Entry(calc, result))
+
+    def extend(  # pylint: disable=too-many-arguments
+        self,
+        ops: Sequence[Operation],
+        codes: Sequence[int],
+        a: Sequence[float],
+        b: Sequence[float],
+        results: Sequence[float],
+    ) -> None:
+        """Bulk-append rows; row ``i`` uses ``ops[codes[i]]``."""
+        self._entries.extend(
+            Entry(Calculation(ops[code], x, y), r) for code, x, y, r in zip(codes, a, b, results)
+        )
+
+    def entry(self, index: int) -> Entry:
+        return self._entries[index]
+
+    def iter_entries(self, start: int, stop: int) -> Iterator[Entry]:
+        # Index directly: islice would walk the first ``start`` entries
+        return map(self._entries.__getitem__, range(start, stop))
+
+    def empty(self) -> "ListStore":
+        return ListStore()
+
+    def column(self, name: str, size: int) -> Sequence:
+        """Return one of ``COLUMNS`` for the first ``size`` rows."""
+        rows = self.iter_entries(0, size)
+        if name == "op":
+            return [CalculationFactory.symbol_for(e.calc.op) for e in rows]
+        if name == "result":
+            return [e.result for e in rows]
+        return [getattr(e.calc, name) for e in rows]
+
+
+class ColumnarStore:
+    """Entries kept in parallel typed arrays.
+
+    Operations are stored as a one-byte code into a per-store table holding
+    one (stateless) instance per operation type, so materialized entries get
+    an equivalent, not necessarily identical, operation object.
+    """
+
+    name = "columnar"
+    MAX_OPS = 256
+
+    def __init__(self) -> None:
+        self._a = array("d")
+        self._b = array("d")
+        self._result = array("d")
+        self._codes = array("B")
+        self._ops: List[Operation] = []
+        self._code_of: Dict[type, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def _code(self, op: Operation) -> int:
+        code = self._code_of.get(type(op))
+        if code is None:
+            if len(self._ops) >= self.MAX_OPS:
+                raise ValueError(
+                    f"Columnar history supports at most {self.MAX_OPS} operation types"
+                )
+            code = self._code_of[type(op)] = len(self._ops)
+            self._ops.append(op)
+        return code
+
+    def append(self, calc: Calculation, result: float) -> None:
+        code = self._code(calc.op)
+        a, b, result = to_float(calc.a), to_float(calc.b), to_float(result)
+        self._a.append(a)
+        self._b.append(b)
+        self._result.append(result)
+        self._codes.append(code)
+
+    def extend(  # pylint: disable=too-many-arguments
+        self,
+        ops: Sequence[Operation],
+        codes: Sequence[int],
+        a: Sequence[float],
+        b: Sequence[float],
+        results: Sequence[float],
+    ) -> None:
+        """Bulk-append rows; row ``i`` uses ``ops[codes[i]]``.
+
+        ``array('d')`` operand/result columns are appended with a memcpy.
+        """
+        mapping = [self._code(op) for op in ops]
+        codes = array("B", map(mapping.__getitem__, codes))
+        a, b, results = _as_doubles(a), _as_doubles(b), _as_doubles(results)
+        self._codes.extend(codes)
+        self._a.extend(a)
+        self._b.extend(b)
+        self._result.extend(results)
+
+    def entry(self, index: int) -> Entry:
+        calc = Calculation(self._ops[self._codes[index]], self._a[index], self._b[index])
+        return Entry(calc, self._result[index])
+
+    def iter_entries(self, start: int, stop: int) -> Iterator[Entry]:
+        return (self.entry(i) for i in range(start, stop))
+
+    def empty(self) -> "ColumnarStore":
+        return ColumnarStore()
+
+    def column(self, name: str, size: int) -> Sequence:
+        """Return one of ``COLUMNS`` for the first ``size`` rows.
+
+        Numeric columns are ``array('d')`` copies (a single memcpy each);
+        the op column maps codes to symbols without building per-row records.
+        """
+        if name == "op":
+            symbols = [CalculationFactory.symbol_for(op) for op in self._ops]
+            return list(map(symbols.__getitem__, self._codes[:size]))
+        return {"a": self._a, "b": self._b, "result": self._result}[name][:size]
+
+
+class BranchStore:
+    """The first ``base`` rows of ``parent`` followed by the rows of its own ``tail``.
+
+    Reads walk the chain of parents (see ``segments``); appends only touch
+    ``tail``, a store of the parent's kind.
+    """
+
+    def __init__(self, parent: Any, base: int) -> None:
+        self.parent = parent
+        self.base = base
+        self.tail = parent.empty()
+
+    @property
+    def name(self) -> str:
+        return str(self.parent.name)
+
+    def __len__(self) -> int:
+        return self.base + len(self.tail)
+
+    def append(self, calc: Calculation, result: float) -> None:
+        self.tail.append(calc, result)
+
+    def extend(self, ops, codes, a, b, results) -> None:  # pylint: disable=too-many-arguments
+        self.tail.extend(ops, codes, a, b, results)
+
+    def entry(self, index: int) -> Entry:
+        store: Any = self
+        while isinstance(store, BranchStore):
+            if index >= store.base:
+                return store.tail.entry(index - store.base)  # type: ignore[no-any-return]
+            store = store.parent
+        return store.entry(index)  # type: ignore[no-any-return]
+
+    def iter_entries(self, start: int, stop: int) -> Iterator[Entry]:
+        return chain.from_iterable(
+            leaf.iter_entries(max(start, first) - first, end - first)
+            for leaf, first, end in segments(self, stop)
+            if end > start
+        )
+
+    def empty(self) -> Any:
+        return self.tail.empty()
+
+    def column(self, name: str, size: int) -> Sequence:
+        values = self.tail.column(name, 0)
+        for leaf, first, end in segments(self, size):
+            values += leaf.column(name, end - first)
+        return values
+
+
+def branch(store: Any, size: int) -> Any:
+    """A store for appending to the first ``size`` rows of ``store``, in O(1).
+
+    Rows past ``size`` may still back mementos, so unless ``store`` ends at
+    ``size`` the result is a ``BranchStore`` over the shared prefix. A branch
+    is taken from the oldest store that holds the prefix, so undo/add cycles
+    do not make the chain of parents any deeper.
+    """
+    while isinstance(store, BranchStore) and size <= store.base:
+        store = store.parent
+    return store if len(store) == size else BranchStore(store, size)
+
+
+def segments(store: Any, size: int) -> List[Tuple[Any, int, int]]:
+    """The first ``size`` rows of ``store`` as ``(leaf store, first, end)`` runs.
+
+    Runs are in row order and cover rows ``first:end``; row ``r`` of a run is
+    row ``r - first`` of its leaf (a store that is not a ``BranchStore``).
+    """
+    runs = []
+    while isinstance(store, BranchStore):
+        if size > store.base:
+            runs.append((store.tail, store.base, size))
+            size = store.base
+        store = store.parent
+    if size:
+        runs.append((store, 0, size))
+    runs.reverse()
+    return runs
+
+
+def _as_doubles(values: Sequence[float]) -> array:
+    if isinstance(values, array) and values.typecode == "d":
+        return values
+    try:
+        return array("d", values)
+    except OverflowError:  # exact values beyond the float range
+        return array("d", map(to_float, values))
+
+
+BACKENDS = {ListStore.name: ListStore, ColumnarStore.name: ColumnarStore}
+
+
+def new_store(backend: str = "list"):
+    """Create an empty store for the named backend."""
+    try:
+        return BACKENDS[backend]()
+    except KeyError as exc:
+        raise ValueError(
+            f"Unknown history backend: {backend} (expected one of {', '.join(BACKENDS)})"
+        ) from exc
@@ -2,18 +2,38 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Tuple
+
+
+def _find_dotenv() -> Optional[str]:
+    """Nearest ``.env`` in this package's directory or above (python-dotenv's search)."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        candidate = os.path.join(directory, ".env")
+        if os.path.isfile(candidate):
+            return candidate  # pragma: no cover - depends on the checkout
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
 
 
 def _maybe_load_dotenv() -> None:
-    """Optionally load .env if python-dotenv is available."""
-    try:
+    """Optionally load .env if python-dotenv is available.
+
+    python-dotenv is only imported when a ``.env`` file exists; its import
+    costs more than the rest of REPL startup.
+    """
+    path = _find_dotenv()
+    if path is None:
+        return
+    try:  # pragma: no cover - depends on the checkout
         import importlib  # pylint: disable=import-outside-toplevel
 
         dotenv = importlib.import_module("dotenv")  # pragma: no cover
         load_dotenv = getattr(dotenv, "load_dotenv", None)  # pragma: no cover
         if callable(load_dotenv):  # pragma: no cover
-            load_dotenv()  # pragma: no cover
+            load_dotenv(path)  # pragma: no cover
     except ModuleNotFoundError:  # pragma: no cover - optional dependency
         pass
 
@@ -24,10 +44,42 @@ def _to_bool(value: Optional[str], default: bool = False) -> bool:
     return value.strip().lower() in {"1", "true", "yes", "on"}
 
 
+def _to_int(value: Optional[str], default: int) -> int:
+    if value is None or not value.strip():
+        return default
+    return int(value)
+
+
+def _to_optional_int(value: Optional[str]) -> Optional[int]:
+    if value is None or not value.strip():
+        return None
+    return int(value)
+
+
+def _to_list(value: Optional[str], default: Tuple[str, ...]) -> Tuple[str, ...]:
+    if value is None or not value.strip():
+        return default
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
 @dataclass(frozen=True)
-class Settings:
+class Settings:  # pylint: disable=too-many-instance-attributes
     auto_save: bool = False
     csv_path: Optional[str] = None
+    undo_max_depth: Optional[int] = None
+    auto_save_mode: str = "snapshot"
+    journal_fsync_every: int = 1
+    journal_compact_every: int = 1000
+    history_backend: str = "list"
+    verify_on_load: bool = False
+    result_cache_size: int = 0
+    result_cache_ops: Tuple[str, ...] = ("^", "root")
+    parallel_workers: int = 0
+    parallel_chunk_size: int = 50_000
+    numeric_backend: str = "float"
+    decimal_precision: int = 28
+    instrumentation: bool = False
+    profile_path: Optional[str] = None
 
 
 def load_settings() -> Settings:
@@ -36,9 +88,38 @@ def load_settings() -> Settings:
     Recognized variables:
     - AUTO_SAVE: bool-like (1/true/yes/on)
     - HISTORY_CSV_PATH: filesystem path for CSV persistence
+    - UNDO_MAX_DEPTH: maximum number of undoable steps (unset = unlimited)
+    - AUTO_SAVE_MODE: "snapshot" (rewrite CSV) or "journal" (append-only journal)
+    - JOURNAL_FSYNC_EVERY: fsync the journal every N rows (0 = only on exit)
+    - JOURNAL_COMPACT_EVERY: fold the journal into the CSV every N rows
+    - HISTORY_BACKEND: "list" (default) or "columnar" (typed-array storage)
+    - HISTORY_VERIFY_ON_LOAD: bool-like; recompute stored results when loading CSV
+    - RESULT_CACHE_SIZE: LRU result cache entries (0 = disabled)
+    - RESULT_CACHE_OPS: comma-separated symbols to cache (default: ^,root)
+    - PARALLEL_WORKERS: processes for evaluate_parallel (0 = one per CPU)
+    - PARALLEL_CHUNK_SIZE: rows per chunk sent to a worker (default: 50000)
+    - NUMERIC_BACKEND: "float" (default), "decimal" or "fraction"
+    - DECIMAL_PRECISION: significant digits for Decimal, decimal places for
+      irrational Fraction roots (default: 28)
+    - INSTRUMENTATION: bool-like; time hot paths for the ``metrics`` command
+    - PROFILE_PATH: cProfile the REPL session and write pstats to this path
     """
     _maybe_load_dotenv()
     return Settings(
         auto_save=_to_bool(os.getenv("AUTO_SAVE"), default=False),
         csv_path=os.getenv("HISTORY_CSV_PATH"),
+        undo_max_depth=_to_optional_int(os.getenv("UNDO_MAX_DEPTH")),
+        auto_save_mode=(os.getenv("AUTO_SAVE_MODE") or "snapshot").strip().lower(),
+        journal_fsync_every=_to_int(os.getenv("JOURNAL_FSYNC_EVERY"), 1),
+        journal_compact_every=_to_int(os.getenv("JOURNAL_COMPACT_EVERY"), 1000),
+        history_backend=(os.getenv("HISTORY_BACKEND") or "list").strip().lower(),
+        verify_on_load=_to_bool(os.getenv("HISTORY_VERIFY_ON_LOAD"), default=False),
+        result_cache_size=_to_int(os.getenv("RESULT_CACHE_SIZE"), 0),
+        result_cache_ops=_to_list(os.getenv("RESULT_CACHE_OPS"), default=("^", "root")),
+        parallel_workers=_to_int(os.getenv("PARALLEL_WORKERS"), 0),
+        parallel_chunk_size=_to_int(os.getenv("PARALLEL_CHUNK_SIZE"), 50_000),
+        numeric_backend=(os.getenv("NUMERIC_BACKEND") or "float").strip().lower(),
+        decimal_precision=_to_int(os.getenv("DECIMAL_PRECISION"), 28),
+        instrumentation=_to_bool(os.getenv("INSTRUMENTATION"), default=False),
+        profile_path=os.getenv("PROFILE_PATH") or None,
     )
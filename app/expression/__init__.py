@@ -0,0 +1,12 @@
+from .compiler import CompiledExpression, compile_expression
+from .parser import BinaryOp, Negate, Number, Variable, parse
+
+__all__ = [
+    "BinaryOp",
+    "CompiledExpression",
+    "Negate",
+    "Number",
+    "Variable",
+    "compile_expression",
+    "parse",
+]
@@ -0,0 +1,143 @@
+"""Compile expression ASTs into closure trees.
+
+Operations are resolved once, at compile time, to the factory's shared
+instances; evaluation then only calls ``op.apply`` through nested closures.
+Constant subtrees are folded in the fast evaluator. A second, recording
+evaluator (built on first use) appends every binary subexpression to a
+History as a regular Calculation.
+"""
+
+from decimal import DecimalException
+from typing import Callable, Iterable, Iterator, Mapping, Optional, Tuple
+from app.calculation import Calculation, CalculationFactory, History
+from app.numeric import decimal_error
+from .parser import BinaryOp, Negate, Node, Number, Variable, parse
+
+Env = Mapping[str, float]
+Evaluator = Callable[[Env], float]
+Recorder = Callable[[Env, History], float]
+
+
+def _lookup(env: Env, name: str) -> float:
+    try:
+        return env[name]
+    except KeyError:
+        raise ValueError(f"Undefined variable: {name}") from None
+
+
+def _compile_fast(node: Node) -> Tuple[Evaluator, Optional[float]]:
+    """Return (evaluator, constant value or None if it depends on variables)."""
+    if isinstance(node, Number):
+        value = node.value
+        return (lambda env: value), value
+    if isinstance(node, Variable):
+        name = node.name
+        return (lambda env: _lookup(env, name)), None
+    if isinstance(node, Negate):
+        inner, const = _compile_fast(node.operand)
+        if const is not None:
+            return _constant(-const)
+        return (lambda env: -inner(env)), None
+    apply = CalculationFactory.operation(node.symbol).apply
+    left, lconst = _compile_fast(node.left)
+    right, rconst = _compile_fast(node.right)
+    if lconst is not None and rconst is not None:
+        try:
+            return _constant(apply(lconst, rconst))
+        except (ValueError, ZeroDivisionError, OverflowError, DecimalException):
+            pass  # keep the error for evaluation time
+    return (lambda env: apply(left(env), right(env))), None
+
+
+def _reporting_decimal_errors(fast: Evaluator) -> Evaluator:
+    """Wrap a whole evaluator (not each step) so Decimal signals become ValueError."""
+
+    def evaluate(env: Env) -> float:
+        try:
+            return fast(env)
+        except DecimalException as exc:
+            raise decimal_error(exc) from exc
+
+    return evaluate
+
+
+def _constant(value: float) -> Tuple[Evaluator, float]:
+    return (lambda env: value), value
+
+
+def _compile_recording(node: Node) -> Recorder:
+    if isinstance(node, Number):
+        value = node.value
+        return lambda env, hist: value
+    if isinstance(node, Variable):
+        name = node.name
+        return lambda env, hist: _lookup(env, name)
+    if isinstance(node, Negate):
+        inner = _compile_recording(node.operand)
+        return lambda env, hist: -inner(env, hist)
+    op = CalculationFactory.operation(node.symbol)
+    left = _compile_recording(node.left)
+    right = _compile_recording(node.right)
+
+    def record(env: Env, hist: History) -> float:
+        calc = Calculation(op, left(env, hist), right(env, hist))
+        result = calc.execute()
+        hist.add(calc, result)
+        return result
+
+    return record
+
+
+def _variables(node: Node) -> Iterator[str]:
+    if isinstance(node, Variable):
+        yield node.name
+    elif isinstance(node, Negate):
+        yield from _variables(node.operand)
+    elif isinstance(node, BinaryOp):
+        yield from _variables(node.left)
+        yield from _variables(node.right)
+
+
+class CompiledExpression:
+    """A formula compiled once and evaluated many times.
+
+    >>> f = compile_expression("x ^ 2 + y")
+    >>> f(x=3, y=1)
+    10.0
+    """
+
+    def __init__(self, source: str, tree: Node) -> None:
+        self.source = source
+        self.tree = tree
+        self.variables = tuple(dict.fromkeys(_variables(tree)))
+        self._fast = _reporting_decimal_errors(_compile_fast(tree)[0])
+        self._recording: Optional[Recorder] = None
+
+    def evaluate(self, env: Optional[Env] = None, history: Optional[History] = None) -> float:
+        """Evaluate with variable bindings ``env``.
+
+        With ``history`` every binary subexpression is added to it (innermost
+        first) as a Calculation together with its result.
+        """
+        env = env if env is not None else {}
+        if history is None:
+            return self._fast(env)
+        if self._recording is None:
+            self._recording = _compile_recording(self.tree)
+        return self._recording(env, history)
+
+    def __call__(self, **variables: float) -> float:
+        return self._fast(variables)
+
+    def evaluate_many(self, envs: Iterable[Env]) -> Iterator[float]:
+        """Lazily evaluate the formula for each set of bindings."""
+        fast = self._fast
+        return (fast(env) for env in envs)
+
+    def __repr__(self) -> str:
+        return f"CompiledExpression({self.source!r})"
+
+
+def compile_expression(source: str) -> CompiledExpression:
+    """Parse and compile ``source``."""
+    return CompiledExpression(source, parse(source))
@@ -0,0 +1,177 @@
+"""Tokenizer and precedence-climbing parser for infix formulas.
+
+Binary operators are the symbols registered on ``CalculationFactory`` (both
+punctuation like ``+`` and words like ``root``). Precedence, low to high:
+``+ -``, then ``* /`` (and any custom operation), then ``^ root`` (right
+associative). Unary minus binds looser than ``^``: ``-2 ^ 2 == -4``.
+
+Compiling and evaluating recurse over the tree, so formulas nested deeper
+than ``MAX_DEPTH`` (parentheses, operator chains, ...) are rejected with a
+ValueError instead of reaching Python's recursion limit.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Tuple, Union
+from app.calculation import CalculationFactory
+from app.numeric import parse_number
+
+PRECEDENCE: Dict[str, int] = {"+": 1, "-": 1, "*": 2, "/": 2, "^": 3, "root": 3}
+DEFAULT_PRECEDENCE = 2
+POWER_PRECEDENCE = 3
+RIGHT_ASSOCIATIVE = frozenset({POWER_PRECEDENCE})
+MAX_DEPTH = 256
+
+_TOKEN = re.compile(
+    r"\s*(?:(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)"
+    r"|(?P<name>[A-Za-z_]\w*)"
+    r"|(?P<paren>[()])"
+    r"|(?P<symbol>(?:[^\s\w().]|\.(?!\d))+))"  # a "." before a digit starts a number
+)
+
+
+@dataclass(frozen=True)
+class Number:
+    value: float
+
+
+@dataclass(frozen=True)
+class Variable:
+    name: str
+
+
+@dataclass(frozen=True)
+class Negate:
+    operand: "Node"
+
+
+@dataclass(frozen=True)
+class BinaryOp:
+    symbol: str
+    left: "Node"
+    right: "Node"
+
+
+Node = Union[Number, Variable, Negate, BinaryOp]
+Token = Tuple[str, str]  # (kind, text); kind is number, name, op, paren or end
+
+
+def tokenize(text: str) -> List[Token]:
+    """Split ``text`` into tokens; registered word symbols become operators."""
+    symbols = set(CalculationFactory.supported())
+    tokens: List[Token] = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if match is None:  # e.g. "é" or "²": word characters outside the grammar
+            pos = len(text) - len(text[pos:].lstrip())
+            raise ValueError(f"Unexpected character {text[pos]!r} at position {pos}")
+        kind = match.lastgroup or ""
+        value = match.group(kind)
+        if kind == "symbol":
+            tokens.extend(_split_symbols(value, symbols))
+        elif kind == "name" and value in symbols:
+            tokens.append(("op", value))
+        else:
+            tokens.append((kind, value))
+        pos = match.end()
+    tokens.append(("end", ""))
+    return tokens
+
+
+def _split_symbols(run: str, symbols: set) -> List[Token]:
+    """Split a run of punctuation (e.g. ``*-``) into registered symbols, longest first."""
+    tokens: List[Token] = []
+    while run:
+        for size in range(len(run), 0, -1):
+            if run[:size] in symbols:
+                tokens.append(("op", run[:size]))
+                run = run[size:]
+                break
+        else:
+            raise ValueError(f"Unknown operator: {run}")
+    return tokens
+
+
+class _Parser:  # pylint: disable=too-few-public-methods
+    def __init__(self, tokens: List[Token]) -> None:
+        self._tokens = tokens
+        self._pos = 0
+        self._nesting = 0
+
+    def _peek(self) -> Token:
+        return self._tokens[self._pos]
+
+    def _next(self) -> Token:
+        token = self._tokens[self._pos]
+        self._pos += 1
+        return token
+
+    def parse(self) -> Node:
+        node = self._binary(1)
+        kind, value = self._peek()
+        if kind != "end":
+            raise ValueError(f"Unexpected token: {value}")
+        return node
+
+    def _binary(self, min_prec: int) -> Node:
+        self._nesting += 1  # parentheses, unary minus and right-associative chains
+        if self._nesting > MAX_DEPTH:
+            raise _too_deep()
+        left = self._prefix()
+        while True:
+            kind, symbol = self._peek()
+            prec = PRECEDENCE.get(symbol, DEFAULT_PRECEDENCE)
+            if kind != "op" or prec < min_prec:
+                self._nesting -= 1
+                return left
+            self._next()
+            right = self._binary(prec if prec in RIGHT_ASSOCIATIVE else prec + 1)
+            left = BinaryOp(symbol, left, right)
+
+    def _prefix(self) -> Node:
+        if self._peek() == ("op", "-"):
+            self._next()
+            # Unary minus binds tighter than * but looser than ^
+            return Negate(self._binary(POWER_PRECEDENCE))
+        return self._atom()
+
+    def _atom(self) -> Node:
+        kind, value = self._next()
+        if kind == "number":
+            return Number(parse_number(value))
+        if kind == "name":
+            return Variable(value)
+        if (kind, value) == ("paren", "("):
+            node = self._binary(1)
+            if self._next() != ("paren", ")"):
+                raise ValueError("Expected ')'")
+            return node
+        raise ValueError(f"Unexpected token: {value or 'end of input'}")
+
+
+def _too_deep() -> ValueError:
+    return ValueError(f"Expression too deep (more than {MAX_DEPTH} nested operations)")
+
+
+def _depth(node: Node) -> int:
+    """Height of the tree under ``node``, computed without recursion."""
+    deepest = 0
+    stack = [(node, 1)]
+    while stack:
+        node, level = stack.pop()
+        deepest = max(deepest, level)
+        if isinstance(node, Negate):
+            stack.append((node.operand, level + 1))
+        elif isinstance(node, BinaryOp):
+            stack.extend(((node.left, level + 1), (node.right, level + 1)))
+    return deepest
+
+
+def parse(text: str) -> Node:
+    """Parse an infix formula into an AST; ValueError if deeper than ``MAX_DEPTH``."""
+    tree = _Parser(tokenize(text)).parse()
+    if _depth(tree) > MAX_DEPTH:  # e.g. a long chain of "+" nests to the left
+        raise _too_deep()
+    return tree
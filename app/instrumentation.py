@@ -0,0 +1,230 @@
+"""Opt-in hot-path instrumentation and session profiling.
+
+``enable()`` swaps timed wrappers into the classes on the hot path and
+``disable()`` puts the original functions back, so a disabled process runs
+the unmodified methods with no extra call or flag check. Instrumented:
+
+- ``Calculation.execute``: latency per operation symbol (``execute[+]``, ...)
+- ``History._notify``: observer dispatch time in ``History.add``
+- ``History.Caretaker.record``/``undo``/``redo``: undo snapshot cost
+- ``History.save``/``History.load``: duration plus file size in bytes
+
+Each timer keeps count, total and max, and a log-bucketed latency sketch for
+percentiles. ``start_profile``/``stop_profile`` wrap a session in
+``cProfile`` and write a pstats file (both modules load only when used).
+"""
+
+import io
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.calculation import Calculation, CalculationFactory, History
+from app.calculation.aggregates import QuantileSketch
+
+PERCENTILES = (0.5, 0.9, 0.99)
+
+
+class Timer:
+    """Latency histogram of one instrumented call site (seconds)."""
+
+    __slots__ = ("count", "total", "maximum", "sketch")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.sketch = QuantileSketch()
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+        self.sketch.add(seconds)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentiles(self) -> Dict[float, float]:
+        return {q: self.sketch.quantile(q) for q in PERCENTILES}
+
+
+timers: Dict[str, Timer] = {}
+counters: Dict[str, int] = {}
+_by_op_type: Dict[type, Timer] = {}  # execute timers, skipping the symbol lookup
+_originals: Dict[Tuple[Any, str], Any] = {}
+_profile: Dict[str, Any] = {"profiler": None, "path": None}
+
+
+def _timer(name: str) -> Timer:
+    timer = timers.get(name)
+    if timer is None:
+        timer = timers[name] = Timer()
+    return timer
+
+
+def _count(name: str, amount: int) -> None:
+    counters[name] = counters.get(name, 0) + amount
+
+
+# --- timed replacements ---
+def timer_name(op: Any) -> str:
+    return f"execute[{CalculationFactory.symbol_for(op)}]"
+
+
+def _timed_execute(original: Callable) -> Callable:
+    clock = time.perf_counter
+
+    def execute(self):
+        start = clock()
+        try:
+            return original(self)
+        finally:
+            elapsed = clock() - start
+            timer = _by_op_type.get(type(self.op))
+            if timer is None:
+                timer = _by_op_type[type(self.op)] = _timer(timer_name(self.op))
+            timer.add(elapsed)
+
+    return execute
+
+
+def _timed(name: str, original: Callable) -> Callable:
+    clock = time.perf_counter
+
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            _timer(name).add(clock() - start)
+
+    return wrapper
+
+
+def _timed_save(original: Callable) -> Callable:
+    timed = _timed("history.save", original)
+
+    def save(self, path: str) -> None:
+        timed(self, path)
+        _count("history.save.bytes", os.path.getsize(path))
+
+    return save
+
+
+def _timed_load(original: classmethod) -> classmethod:
+    timed = _timed("history.load", original.__func__)
+
+    def load(cls, path: str, *args, **kwargs):
+        hist = timed(cls, path, *args, **kwargs)
+        _count("history.load.bytes", os.path.getsize(path))
+        return hist
+
+    return classmethod(load)
+
+
+def _patches() -> List[Tuple[Any, str, Any]]:
+    caretaker = History.Caretaker
+    return [
+        (Calculation, "execute", _timed_execute(Calculation.execute)),
+        (History, "_notify", _timed("history.observers", History._notify)),  # pylint: disable=protected-access
+        (caretaker, "record", _timed("caretaker.record", caretaker.record)),
+        (caretaker, "undo", _timed("caretaker.undo", caretaker.undo)),
+        (caretaker, "redo", _timed("caretaker.redo", caretaker.redo)),
+        (History, "save", _timed_save(History.save)),
+        (History, "load", _timed_load(History.__dict__["load"])),
+    ]
+
+
+def is_enabled() -> bool:
+    return bool(_originals)
+
+
+def enable() -> None:
+    """Install the timed wrappers (idempotent)."""
+    if is_enabled():
+        return
+    for owner, name, wrapper in _patches():
+        _originals[(owner, name)] = owner.__dict__[name]
+        setattr(owner, name, wrapper)
+
+
+def disable() -> None:
+    """Restore the original methods; collected metrics are kept."""
+    for (owner, name), original in _originals.items():
+        setattr(owner, name, original)
+    _originals.clear()
+
+
+def reset() -> None:
+    timers.clear()
+    counters.clear()
+    _by_op_type.clear()
+
+
+def configure(enabled: bool = False) -> None:
+    """Enable or disable instrumentation process-wide."""
+    if enabled:
+        enable()
+    else:
+        disable()
+
+
+def report() -> List[str]:
+    """Formatted lines for the ``metrics`` command (times in microseconds)."""
+    lines = []
+    for name in sorted(timers):
+        timer = timers[name]
+        pcts = " ".join(f"p{q * 100:g}={v * 1e6:.1f}" for q, v in timer.percentiles().items())
+        lines.append(
+            f"{name}: n={timer.count} total={timer.total * 1e3:.3f}ms "
+            f"mean={timer.mean * 1e6:.1f}us {pcts} max={timer.maximum * 1e6:.1f}us"
+        )
+    lines.extend(f"{name}: {value} bytes" for name, value in sorted(counters.items()))
+    return lines
+
+
+# --- cProfile ---
+def start_profile(path: str) -> None:
+    """Profile the rest of the session; ``stop_profile`` writes pstats to ``path``."""
+    import cProfile  # pylint: disable=import-outside-toplevel
+
+    stop_profile()
+    profiler = cProfile.Profile()
+    _profile["profiler"], _profile["path"] = profiler, path
+    profiler.enable()
+
+
+def profiling() -> bool:
+    return _profile["profiler"] is not None
+
+
+def dump_profile(path: Optional[str] = None, limit: int = 15) -> str:
+    """Write the stats gathered so far (profiling continues); return a summary."""
+    profiler = _profile["profiler"]
+    if profiler is None:
+        raise ValueError("Profiling is not active (set PROFILE_PATH to enable it)")
+    import pstats  # pylint: disable=import-outside-toplevel
+
+    target = path or _profile["path"]
+    profiler.disable()
+    try:
+        profiler.dump_stats(target)
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(limit)
+    finally:
+        profiler.enable()
+    return f"Profile written to {target}\n{out.getvalue()}"
+
+
+def stop_profile() -> Optional[str]:
+    """Stop profiling and write the pstats file; returns its path (None if inactive)."""
+    profiler = _profile["profiler"]
+    if profiler is None:
+        return None
+    profiler.disable()
+    path = _profile["path"]
+    profiler.dump_stats(path)
+    _profile["profiler"] = _profile["path"] = None
+    return str(path)
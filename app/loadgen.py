@@ -0,0 +1,127 @@
+"""Load generator for ``app.server``: ``python -m app.loadgen``.
+
+Opens ``--connections`` TCP connections and sends ``--requests`` requests in
+total, keeping up to ``--pipeline`` unanswered requests in flight on each
+connection. Requests cycle through every operation with operands that are
+valid for all of them. Latency is measured per request, from write to
+response, and the JSON report gives requests per second plus p50/p90/p99
+latency in milliseconds.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+from app.server import DEFAULT_HOST, DEFAULT_PORT
+
+SYMBOLS = ("+", "-", "*", "/", "^", "root")
+PERCENTILES = (0.5, 0.9, 0.99)
+
+
+def request_line(i: int) -> bytes:
+    """The ``i``-th request of the load mix."""
+    message = {"id": i, "op": SYMBOLS[i % len(SYMBOLS)], "a": i % 97 + 1, "b": i % 3 + 1}
+    return json.dumps(message).encode() + b"\n"
+
+
+def percentile(ordered: Sequence[float], q: float) -> float:
+    """Nearest-rank ``q`` quantile of an ascending sequence (NaN if empty)."""
+    if not ordered:
+        return float("nan")
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def _connection(
+    host: str, port: int, ids: range, pipeline: int, latencies: List[float]
+) -> int:
+    """Send ``ids`` over one connection; returns the number of error responses."""
+    reader, writer = await asyncio.open_connection(host, port)
+    window = asyncio.Semaphore(pipeline)
+    sent: Deque[float] = deque()  # send times, answered in order
+    clock = time.perf_counter
+
+    async def send() -> None:
+        for i in ids:
+            await window.acquire()
+            sent.append(clock())
+            writer.write(request_line(i))
+            await writer.drain()
+
+    sender = asyncio.create_task(send())
+    errors = 0
+    try:
+        for _ in ids:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("server closed the connection")
+            latencies.append(clock() - sent.popleft())
+            window.release()
+            errors += "error" in json.loads(line)
+        await sender
+    finally:
+        sender.cancel()
+        writer.close()
+    return errors
+
+
+async def run_load(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    requests: int = 10_000,
+    connections: int = 4,
+    pipeline: int = 32,
+) -> Dict[str, Any]:
+    """Drive the server and return the throughput/latency report."""
+    if min(requests, connections, pipeline) < 1:
+        raise ValueError("requests, connections and pipeline must be >= 1")
+    latencies: List[float] = []
+    start = time.perf_counter()
+    errors = await asyncio.gather(
+        *(
+            _connection(host, port, range(c, requests, connections), pipeline, latencies)
+            for c in range(connections)
+        )
+    )
+    seconds = time.perf_counter() - start
+    latencies.sort()
+    report: Dict[str, Any] = {
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "connections": connections,
+        "pipeline": pipeline,
+        "seconds": seconds,
+        "requests_per_s": len(latencies) / max(seconds, 1e-9),
+    }
+    for q in PERCENTILES:
+        report[f"p{q * 100:g}_ms"] = percentile(latencies, q) * 1e3
+    return report
+
+
+def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.loadgen", description="Load generator for app.server"
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument(
+        "--pipeline", type=int, default=32, help="unanswered requests per connection"
+    )
+    return parser.parse_args(list(argv))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = _parse_args(argv or [])
+    report = asyncio.run(
+        run_load(args.host, args.port, args.requests, args.connections, args.pipeline)
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])  # pragma: no cover
@@ -9,24 +9,55 @@ Provides a command-line interface backed by:
 Commands:
 - one of +, -, *, /, ^, root  -> perform calculation
 - help               -> show help and supported operations
-- history            -> list previous calculations
+- history [N|a:b]    -> list previous calculations (all, last N, or a range)
+- history tail [-f] -> show the last rows, then follow the journal (Ctrl+C stops)
+- find <terms>       -> query history (op=/ result>1e6 a<=10 ...)
+- stats              -> running summary statistics of the results
+- eval <expr>        -> evaluate a multi-operation formula
+- metrics [reset | profile [path]] -> instrumentation timings / cProfile dump
 - exit | quit | q    -> leave the program
+
+Batch mode (``python -m app.main --batch FILE``, ``-`` for stdin) streams
+lines such as ``+ 3 4`` or ``root 2 9`` and writes one result per line.
+REPL commands in the stream (``save``, ``history``, ...) print to stderr;
+any other line is reported as an error for that line.
+
+The REPL shows its first prompt before the saved history is read: the
+CSV/journal load (and the pandas import) runs on a worker thread and the
+first command that needs history waits for it. ``--startup-profile``
+prints per-phase startup times to stderr.
 """
 
-from typing import Optional, Tuple
-from app.calculation import CalculationFactory, History
+import argparse
+import contextlib
+import math
+import re
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+from app.calculation import CalculationFactory, History, HistoryJournal, parallel
+from app.calculation.history import format_entry
 from app.config import load_settings
+from app.expression import compile_expression
+from app import IMPORT_STARTED, instrumentation, numeric
+from app.numeric import parse_number
+
 
+def get_number(prompt: str) -> Optional[numeric.Number]:
+    """Prompt until a valid number is entered, or return None on user interrupt.
 
-def get_number(prompt: str) -> Optional[float]:
-    """Prompt until a valid float is entered, or return None on user interrupt."""
+    Parsed with the configured numeric backend (float, Decimal or Fraction).
+    """
     while True:
         try:
             raw = input(prompt).strip()
         except (KeyboardInterrupt, EOFError):
             return None
         try:
-            return float(raw)
+            return parse_number(raw)
         except ValueError:
             print("❌ Invalid number. Please enter a valid numeric value.")
 
@@ -37,10 +68,18 @@ def print_help() -> None:
     print("  +, -, *, /, ^, root   -> perform calculation")
     print("  help         -> show this help")
     print("  history      -> list previous calculations")
+    print("  history N    -> last N rows; history a:b -> rows a..b-1")
+    print("  history tail [-f] -> last 10 rows; -f follows new journal rows (Ctrl+C)")
     print("  clear        -> clear history")
     print("  undo/redo    -> undo or redo history state")
-    print("  save [path]  -> save history to CSV")
-    print("  load [path]  -> load history from CSV")
+    print("  cache        -> show result cache statistics")
+    print("  find <terms> -> query history, e.g. find op=/ result>1e6 a<=10")
+    print("  stats        -> count, error rate, mean/stdev/min/max, percentiles")
+    print("  eval <expr>  -> evaluate a formula, e.g. eval 2 ^ 10 / (3 root 27) - 4")
+    print("  metrics      -> hot-path timings (INSTRUMENTATION=1); metrics reset")
+    print("  metrics profile [path] -> write the session cProfile (PROFILE_PATH)")
+    print("  save [path]  -> save history (CSV, binary for .bin, archive for .calz)")
+    print("  load [path]  -> load history (CSV, .calz archive, or memory-mapped .bin)")
     print("  exit/quit/q  -> leave the program")
     print(f"Supported operations: {ops}")
 
@@ -50,46 +89,234 @@ def _goodbye() -> None:
     print("\n👋 Goodbye!")
 
 
-def _cmd_history(hist: History) -> None:
-    items = hist.to_strings()
-    if not items:
+HISTORY_USAGE = "❌ Usage: history [N | start:stop | tail [-f]]"
+TAIL_LINES = 10
+FOLLOW_NEEDS_JOURNAL = (
+    "❌ history tail -f follows the journal: set AUTO_SAVE=1, AUTO_SAVE_MODE=journal "
+    "and HISTORY_CSV_PATH"
+)
+
+
+def _history_range(arg: str, size: int) -> Tuple[int, Optional[int]]:
+    """Map ``N`` (last N rows) or ``start:stop`` (slice syntax) to slice bounds."""
+    if ":" in arg:
+        start, stop = (int(part) if part.strip() else None for part in arg.split(":", 1))
+        return start or 0, stop
+    count = int(arg)
+    if count < 0:
+        raise ValueError(f"Invalid row count: {arg}")
+    return max(size - count, 0), None
+
+
+FIND_USAGE = "❌ Usage: find [op=<symbol>] [a|b|result<op><number> ...], e.g. find op=/ result>1e6"
+_FIND_TERM = re.compile(r"^(op|a|b|result)(>=|<=|=|>|<)(\S+)$")
+
+
+def _next_float(value: float, up: bool) -> float:
+    """The adjacent float towards +inf (``up``) or -inf, like ``math.nextafter`` (3.9+)."""
+    if math.isnan(value) or value == (math.inf if up else -math.inf):
+        return value
+    if value == 0.0:
+        return 5e-324 if up else -5e-324
+    (bits,) = struct.unpack("<q", struct.pack("<d", value))
+    bits += 1 if (value > 0) == up else -1  # the bit patterns of same-sign floats are ordered
+    return struct.unpack("<d", struct.pack("<q", bits))[0]
+
+
+def _find_criteria(args: Sequence[str]) -> dict:
+    """Translate terms like ``result>1e6`` into ``History.filter`` keyword arguments."""
+    criteria: dict = {}
+    for term in args:
+        match = _FIND_TERM.match(term)
+        if match is None:
+            raise ValueError(term)
+        name, cmp, raw = match.groups()
+        if name == "op":
+            if cmp != "=":
+                raise ValueError(term)
+            criteria["op"] = raw
+            continue
+        value = float(raw)
+        lo, hi = criteria.get(f"{name}_range", (None, None))
+        if cmp in (">", ">="):
+            lo = _next_float(value, True) if cmp == ">" else value
+        if cmp in ("<", "<="):
+            hi = _next_float(value, False) if cmp == "<" else value
+        if cmp == "=":
+            lo = hi = value
+        criteria[f"{name}_range"] = (lo, hi)
+    return criteria
+
+
+def _cmd_find(hist: History, arg: str) -> None:
+    """List rows matching all terms, using the History query indexes."""
+    try:
+        criteria = _find_criteria(arg.split())
+    except ValueError:
+        print(FIND_USAGE)
+        return
+    matches = hist.filter(**criteria)
+    for entry in matches:
+        print(format_entry(entry))  # pragma: no cover - UI only
+    print(f"{len(matches)} match(es)")
+
+
+def _cmd_stats(hist: History) -> None:
+    st = hist.stats()
+    if not st.count:
+        print("(no history yet)")
+        return
+    print(f"Calculations: {st.count} ({st.errors} failed, error rate {st.error_rate:.1%})")
+    if st.ok:
+        pcts = ", ".join(f"p{q * 100:g}={v:.6g}" for q, v in st.quantiles().items())
+        print(
+            f"Results: sum={st.total:.6g} mean={st.mean:.6g} stdev={st.stdev:.6g} "
+            f"min={st.minimum:.6g} max={st.maximum:.6g}"
+        )
+        print(f"Percentiles: {pcts}")
+    ops = ", ".join(f"{sym}: {count}" for sym, (count, _) in sorted(st.per_op.items()))
+    print(f"Per operation: {ops}")
+
+
+def _follow_journal(journal: HistoryJournal) -> None:
+    """Print rows other sessions append to the journal until Ctrl+C."""
+    print("Following the journal (Ctrl+C to stop)")
+    try:
+        for entry in journal.follow():
+            print(format_entry(entry))
+    except KeyboardInterrupt:
+        pass
+    except (OSError, ValueError) as exc:  # pragma: no cover - snapshot unreadable mid-follow
+        print(f"Error following the journal: {exc}")
+
+
+def _cmd_history(hist: History, arg: str = "", journal: Optional[HistoryJournal] = None) -> None:
+    """List history lazily: everything, the last N rows, a range, or a tail.
+
+    ``tail -f`` then follows the journal, where other sessions sharing it
+    append their rows.
+    """
+    parts = arg.split()
+    tail = parts[:1] == ["tail"]
+    follow = parts[1:] == ["-f"]
+    if tail and parts[1:] and not follow:
+        print(HISTORY_USAGE)
+        return
+    if follow and journal is None:
+        print(FOLLOW_NEEDS_JOURNAL)
+        return
+    try:
+        start, stop = _history_range(str(TAIL_LINES) if tail else arg or "0:", len(hist))
+    except ValueError:
+        print(HISTORY_USAGE)
+        return
+    if len(hist) == 0:
         print("(no history yet)")  # pragma: no cover - UI only
-    else:
-        for line in items:
-            print(line)  # pragma: no cover - UI only
+    for line in hist.iter_strings(start, stop):
+        print(line)  # pragma: no cover - UI only
+    if follow:
+        _follow_journal(journal)  # type: ignore[arg-type]
+
+
+def _open_journal(settings) -> Optional[HistoryJournal]:
+    """Return an append-only journal when AUTO_SAVE runs in journal mode."""
+    if settings.auto_save and settings.csv_path and settings.auto_save_mode == "journal":
+        return HistoryJournal(
+            settings.csv_path,
+            fsync_every=settings.journal_fsync_every,
+            compact_every=settings.journal_compact_every,
+            backend=settings.history_backend,
+        )
+    return None
+
+
+def _sync_journal(hist: History, journal: Optional[HistoryJournal]) -> None:
+    """Rewrite the snapshot after non-append changes (clear/undo/redo/load)."""
+    if journal is None:
+        return
+    try:
+        journal.compact(hist)
+    except (OSError, ValueError):  # pragma: no cover
+        pass
 
 
-def _cmd_clear(hist: History, caretaker: History.Caretaker) -> None:
+def _cmd_clear(
+    hist: History, caretaker: History.Caretaker, journal: Optional[HistoryJournal] = None
+) -> None:
     hist.clear()
     caretaker.record(hist)
+    _sync_journal(hist, journal)
     print("History cleared.")  # pragma: no cover - UI only
 
 
-def _cmd_undo_redo(hist: History, caretaker: History.Caretaker, undo: bool) -> None:
+def _cmd_undo_redo(
+    hist: History,
+    caretaker: History.Caretaker,
+    undo: bool,
+    journal: Optional[HistoryJournal] = None,
+) -> None:
     ok = caretaker.undo(hist) if undo else caretaker.redo(hist)
     if ok:
+        _sync_journal(hist, journal)
         print("Undone." if undo else "Redone.")  # pragma: no cover - UI only
     else:
         print("Nothing to undo." if undo else "Nothing to redo.")  # pragma: no cover - UI only
 
 
+def _cmd_cache() -> None:
+    cache = CalculationFactory.cache()
+    if cache is None:
+        print("Result cache disabled (set RESULT_CACHE_SIZE to enable).")
+        return
+    st = cache.stats()
+    print(
+        f"Result cache: {st.size}/{st.maxsize} entries, hits={st.hits}, "
+        f"misses={st.misses}, evictions={st.evictions}, hit rate={st.hit_rate:.1%}"
+    )
+
+
+def _cmd_metrics(arg: str) -> None:
+    if arg == "reset":
+        instrumentation.reset()
+        print("Metrics reset.")
+    elif arg == "profile" or arg.startswith("profile "):
+        try:
+            print(instrumentation.dump_profile(arg[len("profile"):].strip() or None))
+        except (OSError, ValueError) as exc:
+            print(f"Error: {exc}")
+    elif arg:
+        print("❌ Usage: metrics [reset | profile [path]]")
+    elif not instrumentation.is_enabled() and not instrumentation.timers:
+        print("Instrumentation disabled (set INSTRUMENTATION=1 to enable it).")
+    else:
+        print("\n".join(instrumentation.report()) or "(no metrics yet)")
+
+
 def _cmd_save(hist: History, path: str) -> None:
     try:
-        hist.save_csv(path)
+        hist.save(path)
         print(f"Saved to {path}")  # pragma: no cover - UI only
     except (OSError, ValueError) as exc:  # pragma: no cover
         print(f"Error saving: {exc}")
 
 
-def _cmd_load(path: str) -> Tuple[Optional[History], Optional[str]]:
+def _cmd_load(
+    path: str, backend: str = "list", verify: bool = False
+) -> Tuple[Optional[History], Optional[str]]:
     try:
-        loaded = History.load_csv(path)
+        loaded = History.load(path, backend=backend, verify=verify)
         return loaded, f"Loaded from {path}"  # pragma: no cover - UI only
     except (OSError, ValueError) as exc:  # pragma: no cover
         return None, f"Error loading: {exc}"
 
 
-def _cmd_calculation(cmd: str, hist: History, caretaker: History.Caretaker, settings) -> bool:
+def _cmd_calculation(
+    cmd: str,
+    hist: History,
+    caretaker: History.Caretaker,
+    settings,
+    journal: Optional[HistoryJournal] = None,
+) -> bool:
     a = get_number("Enter first number: ")
     if a is None:
         _goodbye()
@@ -100,22 +327,62 @@ def _cmd_calculation(cmd: str, hist: History, caretaker: History.Caretaker, sett
         return False
     try:
         calc = CalculationFactory.from_symbol(cmd, a, b)
-        result = calc.execute()
-        hist.add(calc)
-        caretaker.record(hist)
-        if settings.auto_save and settings.csv_path:
-            try:
-                hist.save_csv(settings.csv_path)
-            except (OSError, ValueError):  # pragma: no cover
-                pass
+        result = CalculationFactory.execute(calc)
+        _record(hist, caretaker, [History.Entry(calc, result)], settings, journal)
         print(f"{a} {cmd} {b} = {result}")  # pragma: no cover - UI only
     except ValueError as exc:  # e.g., divide by zero
         print(f"Error: {exc}")
     return True
 
 
-def _process_command(
-    cmd: str, hist: History, caretaker: History.Caretaker, settings
+def _record(
+    hist: History,
+    caretaker: History.Caretaker,
+    entries: Sequence[History.Entry],
+    settings,
+    journal: Optional[HistoryJournal] = None,
+) -> None:
+    """Add entries as one undo step, then journal or auto-save them."""
+    for entry in entries:
+        hist.add(entry.calc, entry.result)
+    caretaker.record(hist)
+    if journal is not None:
+        try:
+            for entry in entries:
+                journal.record(hist, entry.calc, entry.result)
+        except (OSError, ValueError):  # pragma: no cover
+            pass
+    elif settings.auto_save and settings.csv_path:
+        try:
+            hist.save(settings.csv_path)
+        except (OSError, ValueError):  # pragma: no cover
+            pass
+
+
+def _cmd_eval(
+    expr: str,
+    hist: History,
+    caretaker: History.Caretaker,
+    settings,
+    journal: Optional[HistoryJournal] = None,
+) -> None:
+    """Evaluate a formula; each binary step becomes one history row."""
+    steps = History()
+    try:
+        value = compile_expression(expr).evaluate(history=steps)
+    except (ValueError, ZeroDivisionError, OverflowError) as exc:
+        print(f"Error: {exc}")
+        return
+    _record(hist, caretaker, steps.entries(), settings, journal)
+    print(f"{expr} = {value}")  # pragma: no cover - UI only
+
+
+def _process_command(  # pylint: disable=too-many-branches
+    cmd: str,
+    hist: History,
+    caretaker: History.Caretaker,
+    settings,
+    journal: Optional[HistoryJournal] = None,
 ) -> Tuple[History, bool]:
     keep_running = True
     if cmd in {"exit", "quit", "q"}:
@@ -123,14 +390,24 @@ def _process_command(
         keep_running = False
     elif cmd == "help":
         print_help()
-    elif cmd == "history":
-        _cmd_history(hist)
+    elif cmd == "history" or cmd.startswith("history "):
+        _cmd_history(hist, cmd[len("history"):].strip(), journal)
     elif cmd == "clear":
-        _cmd_clear(hist, caretaker)
+        _cmd_clear(hist, caretaker, journal)
     elif cmd == "undo":
-        _cmd_undo_redo(hist, caretaker, undo=True)
+        _cmd_undo_redo(hist, caretaker, undo=True, journal=journal)
     elif cmd == "redo":
-        _cmd_undo_redo(hist, caretaker, undo=False)
+        _cmd_undo_redo(hist, caretaker, undo=False, journal=journal)
+    elif cmd == "cache":
+        _cmd_cache()
+    elif cmd == "stats":
+        _cmd_stats(hist)
+    elif cmd == "metrics" or cmd.startswith("metrics "):
+        _cmd_metrics(cmd[len("metrics"):].strip())
+    elif cmd == "find" or cmd.startswith("find "):
+        _cmd_find(hist, cmd[len("find"):])
+    elif cmd.startswith("eval "):
+        _cmd_eval(cmd[5:].strip(), hist, caretaker, settings, journal)
     elif cmd.startswith("save"):
         parts = cmd.split(maxsplit=1)
         path = parts[1] if len(parts) == 2 else (settings.csv_path or "history.csv")
@@ -138,50 +415,298 @@ def _process_command(
     elif cmd.startswith("load"):
         parts = cmd.split(maxsplit=1)
         path = parts[1] if len(parts) == 2 else (settings.csv_path or "history.csv")
-        loaded, msg = _cmd_load(path)
+        loaded, msg = _cmd_load(path, settings.history_backend, settings.verify_on_load)
         if msg:
             print(msg)
         if loaded is not None:
             hist = loaded
+            _sync_journal(hist, journal)
     elif cmd in CalculationFactory.supported():
-        keep_running = _cmd_calculation(cmd, hist, caretaker, settings)
+        keep_running = _cmd_calculation(cmd, hist, caretaker, settings, journal)
     else:
         print("❌ Unknown command/operation. Type 'help' for options.")
     return hist, keep_running
 
 
-def main() -> None:  # pylint: disable=too-many-branches,too-many-statements
-    """Run the OOP calculator REPL with History and CalculationFactory."""
-    hist = History()
-    caretaker = History.Caretaker()
+# --- Batch / streaming mode ---
+REPL_COMMANDS = frozenset(
+    {"exit", "quit", "q", "help", "history", "clear", "undo", "redo", "cache", "stats",
+     "metrics", "find", "eval", "save", "load"}
+)
+
+
+@dataclass
+class StreamStats:
+    ok: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+
+    @property
+    def calculations(self) -> int:
+        return self.ok + self.errors
+
+
+def _parse_calculation(line: str) -> Optional[Tuple[str, float, float]]:
+    """Parse ``<op> <a> <b>``; return None for non-calculation commands.
+
+    Raises ValueError for a calculation line with missing or invalid operands.
+    """
+    parts = line.split()
+    if not parts or parts[0] not in CalculationFactory.supported():
+        return None
+    if len(parts) != 3:
+        raise ValueError(f"Expected '<op> <a> <b>', got: {line}")
+    try:
+        return parts[0], parse_number(parts[1]), parse_number(parts[2])
+    except ValueError as exc:
+        raise ValueError(f"Invalid number in: {line}") from exc
+
+
+def _stream_results(  # pylint: disable=too-many-locals
+    lines: Iterable[str], settings, record: bool = False, notes: Optional[TextIO] = None
+) -> Iterator[Tuple[int, str, bool]]:
+    """Lazily evaluate lines, yielding (line number, text, ok) per calculation.
+
+    ``REPL_COMMANDS`` lines (save, history, ...) are delegated to
+    ``_process_command`` with their output sent to ``notes`` (stderr by
+    default), so the results stream only holds results; other lines are
+    errors. Calculations are only kept in History when ``record`` is set, so
+    memory stays constant otherwise.
+    """
+    hist = History(settings.history_backend)
+    caretaker = History.Caretaker(settings.undo_max_depth)
+    for lineno, raw in enumerate(lines, 1):
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            parsed = _parse_calculation(line)
+            if parsed is None:
+                if line.split()[0].lower() not in REPL_COMMANDS:
+                    raise ValueError(f"Unknown command/operation: {line}")
+                with contextlib.redirect_stdout(notes or sys.stderr):
+                    hist, keep_running = _process_command(line.lower(), hist, caretaker, settings)
+                if not keep_running:
+                    return
+                continue
+            symbol, a, b = parsed
+            calc = CalculationFactory.from_symbol(symbol, a, b)
+            result = CalculationFactory.execute(calc)
+        except (ValueError, ZeroDivisionError, OverflowError) as exc:
+            yield lineno, f"Error: {exc}", False
+            continue
+        if record:
+            hist.add(calc, result)
+            caretaker.record(hist)
+        yield lineno, f"{a} {symbol} {b} = {result}", True
+
+
+def run_stream(
+    source: Iterable[str],
+    out: TextIO,
+    err: TextIO,
+    settings,
+    record: bool = False,
+) -> StreamStats:
+    """Evaluate a stream of calculation lines, writing results to ``out``.
+
+    Errors (including unknown commands) are reported per line on ``err``
+    without stopping the stream, next to the output of REPL commands; a
+    throughput summary is written to ``err`` at the end.
+    """
+    stats = StreamStats()
+    start = time.perf_counter()
+    for lineno, text, ok in _stream_results(source, settings, record, err):
+        if ok:
+            stats.ok += 1
+            out.write(text + "\n")
+        else:
+            stats.errors += 1
+            err.write(f"line {lineno}: {text}\n")
+    stats.seconds = time.perf_counter() - start
+    rate = stats.calculations / max(stats.seconds, 1e-9)
+    err.write(
+        f"Processed {stats.calculations} calculations ({stats.errors} errors) "
+        f"in {stats.seconds:.3f}s ({rate:,.0f} calc/s)\n"
+    )
+    return stats
+
+
+def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.main", description="OOP calculator")
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="print import/initialization times to stderr before the first prompt",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="evaluate calculations from FILE ('-' for stdin) instead of the REPL",
+    )
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="in batch mode, keep results in History (enables save/history lines)",
+    )
+    return parser.parse_args(list(argv))
+
+
+def _configure(settings) -> None:
+    """Apply process-wide settings (cache, pool, numbers, metrics) before evaluating anything."""
+    CalculationFactory.configure_cache(settings.result_cache_size, settings.result_cache_ops)
+    parallel.configure(settings.parallel_workers, settings.parallel_chunk_size)
+    numeric.configure(settings.numeric_backend, settings.decimal_precision)
+    instrumentation.configure(settings.instrumentation)
+
+
+def _run_batch(path: str, record: bool) -> None:
     settings = load_settings()
-    if settings.csv_path:
+    _configure(settings)
+    if path == "-":
+        ctx = contextlib.nullcontext(sys.stdin)
+    else:
+        ctx = open(path, encoding="utf-8")  # pylint: disable=consider-using-with
+    with ctx as source:
+        run_stream(source, sys.stdout, sys.stderr, settings, record=record)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Run the calculator: the REPL by default, or batch mode with ``--batch``."""
+    args = _parse_args(argv or [])
+    if args.batch:
+        _run_batch(args.batch, args.record)
+    else:
+        _run_repl(args.startup_profile)
+
+
+# --- REPL startup ---
+# Commands answered without waiting for the startup history load
+NO_HISTORY_COMMANDS = frozenset({"help", "exit", "quit", "q"})
+
+
+class DeferredHistory:  # pylint: disable=too-few-public-methods
+    """Run a history load on a worker thread; ``get`` waits for the result."""
+
+    def __init__(self, load: Callable[[], History]) -> None:
+        self._load = load
+        self._result: Optional[History] = None
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="history-load", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            self._result = self._load()
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            self._error = exc  # re-raised in the REPL thread by get()
+
+    def get(self) -> History:
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._result  # type: ignore[return-value]
+
+
+def _load_startup_history(settings, journal: Optional[HistoryJournal]) -> History:
+    """The history a session starts from: journal snapshot + replay, or the CSV."""
+    if journal is not None:
         try:
-            # Attempt to load history on start
-            hist = History.load_csv(settings.csv_path)
-        except (FileNotFoundError, ValueError):  # pragma: no cover - optional behavior
-            hist = History()
+            # Snapshot plus any rows journaled since the last compaction
+            return journal.load()
+        except (OSError, ValueError):  # the journal keeps the snapshot from being overwritten
+            return History(settings.history_backend)
+    try:
+        return History.load(
+            settings.csv_path, backend=settings.history_backend, verify=settings.verify_on_load
+        )
+    except (FileNotFoundError, ValueError):  # pragma: no cover - optional behavior
+        return History(settings.history_backend)
+
+
+def _journal_warnings(journal: Optional[HistoryJournal]) -> None:
+    """Tell the user about journal rows or a snapshot the startup load could not read."""
+    if journal is None:
+        return
+    if journal.snapshot_error is not None:
+        print(
+            f"⚠️ Could not load {journal.snapshot_path} ({journal.snapshot_error}); "
+            "it will not be overwritten, new calculations go to the journal only"
+        )
+    if journal.skipped:
+        print(f"⚠️ Skipped {journal.skipped} unreadable journal row(s)")
+
+
+def _startup_report(marks: Sequence[Tuple[str, float]], pandas_loaded: bool) -> None:
+    """Print the time spent in each startup phase (``--startup-profile``).
+
+    ``pandas_loaded`` tells whether the REPL thread imported pandas before the
+    prompt (the deferred history load may import it on its worker thread).
+    """
+    lines = ["Startup profile (ms):"]
+    previous = IMPORT_STARTED
+    for name, stamp in marks:
+        lines.append(f"  {name:<13}{(stamp - previous) * 1e3:8.1f}")
+        previous = stamp
+    lines.append(f"  {'first prompt':<13}{(previous - IMPORT_STARTED) * 1e3:8.1f}")
+    lines.append(f"  pandas loaded: {'yes' if pandas_loaded else 'no'}")
+    print("\n".join(lines), file=sys.stderr)
+
+
+def _run_repl(  # pylint: disable=too-many-branches,too-many-statements
+    startup_profile: bool = False,
+) -> None:
+    """Run the OOP calculator REPL with History and CalculationFactory."""
+    marks: List[Tuple[str, float]] = [("imports", time.perf_counter())]
+    settings = load_settings()
+    marks.append(("settings", time.perf_counter()))
+    _configure(settings)
+    if settings.profile_path:
+        instrumentation.start_profile(settings.profile_path)
+    marks.append(("configure", time.perf_counter()))
+    hist = History(settings.history_backend)
+    caretaker = History.Caretaker(settings.undo_max_depth)
+    journal = _open_journal(settings)
+    pending: Optional[DeferredHistory] = None
+    pandas_loaded = "pandas" in sys.modules
+    if journal is not None or settings.csv_path:
+        pending = DeferredHistory(lambda: _load_startup_history(settings, journal))
+    marks.append(("history", time.perf_counter()))
     print("🧮 OOP Calculator (type 'help' for options, 'exit' to quit)")
+    if startup_profile:
+        _startup_report(marks, pandas_loaded)
 
     try:
         while True:
             try:
                 prompt = (
-                    "Enter command or operation (+, -, *, /, ^, root, "
-                    "help, history, clear, undo, redo, save, load, exit): "
+                    "Enter command or operation (+, -, *, /, ^, root, help, history, "
+                    "find, stats, clear, undo, redo, cache, metrics, eval, save, load, exit): "
                 )
                 cmd = input(prompt).strip().lower()
             except (KeyboardInterrupt, EOFError):
                 _goodbye()
                 break
 
-            hist, keep_running = _process_command(cmd, hist, caretaker, settings)
+            if pending is not None and cmd not in NO_HISTORY_COMMANDS:
+                hist, pending = pending.get(), None
+                _journal_warnings(journal)
+            hist, keep_running = _process_command(cmd, hist, caretaker, settings, journal)
             if not keep_running:
                 break
 
     except (KeyboardInterrupt, EOFError):
         _goodbye()  # pragma: no cover
+    finally:
+        if pending is not None and journal is not None:
+            pending.get()  # the load compacts the journal; let it finish first
+        hist.flush()  # let background observers deliver queued events
+        if journal is not None:
+            journal.close()
+        profile = instrumentation.stop_profile()
+        if profile is not None:
+            print(f"Profile written to {profile}")
 
 
 if __name__ == "__main__":
-    main()  # pragma: no cover
+    main(sys.argv[1:])  # pragma: no cover
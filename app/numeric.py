@@ -0,0 +1,304 @@
+"""Numeric backends: float (default), ``decimal.Decimal`` or ``fractions.Fraction``.
+
+The backend decides how operands are parsed (``parse_number``); arithmetic
+then follows the operand types, so ``+ - * /`` work unchanged and
+``PowerOperation``/``RootOperation`` switch to ``power``/``root`` below for
+Decimal and Fraction operands instead of falling back to float:
+
+- integer powers are exact (Fraction) or correctly rounded (Decimal)
+- nth roots use Newton's iteration: in Decimal at the context precision plus
+  guard digits, and on integers for Fractions (exact for perfect powers,
+  otherwise truncated to ``precision`` decimal places). Irrational Fraction
+  roots of high degree are truncated from a Decimal root instead, so their
+  cost follows ``precision`` rather than the degree
+- a rational exponent or degree ``p/q`` becomes a root of an integer power
+
+Decimal results use the context precision set by ``configure``; Decimal
+signals (overflow, invalid operation, ...) of any operation are raised as
+ValueError by ``Calculation.execute`` and compiled expressions. Only the
+list history backend keeps exact values; columnar/binary storage, NumPy
+batches and ``evaluate_parallel`` work in float64, and summaries and indexes
+compare ``to_float`` values (exact values beyond the float range are +-inf).
+"""
+
+import decimal
+import math
+from decimal import Decimal
+from fractions import Fraction
+from typing import Callable, Dict, Optional, Tuple, Union
+
+Number = Union[float, Decimal, Fraction]
+
+BACKENDS = ("float", "decimal", "fraction")
+DEFAULT_PRECISION = 28
+MAX_EXACT_DEGREE = 10_000  # bound for p and q of exact exponents/degrees p/q
+MAX_EXACT_BITS = 1 << 22  # refuse Fraction powers with larger numerators/denominators
+MAX_ROOT_BITS = 1 << 16  # larger integer Newton roots go through Decimal instead
+POWER_RESIDUE_PRIMES = 16  # primes tried before computing an exact integer root
+
+_state: Dict[str, object] = {"backend": "float", "precision": DEFAULT_PRECISION}
+
+
+def configure(backend: str = "float", precision: int = DEFAULT_PRECISION) -> None:
+    """Select the process-wide backend and the Decimal/Fraction root precision."""
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown numeric backend: {backend} (expected one of {', '.join(BACKENDS)})"
+        )
+    if precision < 1:
+        raise ValueError("precision must be >= 1")
+    _state["backend"] = backend
+    _state["precision"] = precision
+    # The default context seeds new threads; getcontext() is the current one
+    decimal.DefaultContext.prec = precision
+    decimal.getcontext().prec = precision
+
+
+def current_backend() -> str:
+    return str(_state["backend"])
+
+
+def current_precision() -> int:
+    return int(_state["precision"])  # type: ignore[call-overload]
+
+
+def _parse_fraction(raw: str) -> Fraction:
+    if "e" in raw.lower() and "/" not in raw:
+        # Fraction("1e999999999") would build a billion-digit integer
+        exponent = Decimal(raw).adjusted()
+        if abs(exponent) > MAX_EXACT_DEGREE:
+            raise ValueError(f"Exponent too large for exact arithmetic: {raw!r}")
+    return Fraction(raw)
+
+
+_PARSERS: Dict[str, Callable[[str], Number]] = {
+    "float": float,
+    "decimal": Decimal,
+    "fraction": _parse_fraction,
+}
+
+
+def parse_number(raw: str) -> Number:
+    """Parse ``raw`` with the active backend; raises ValueError if invalid.
+
+    The Fraction backend also accepts ratios such as ``1/3``.
+    """
+    try:
+        return _PARSERS[current_backend()](raw.strip())
+    except (decimal.InvalidOperation, ZeroDivisionError) as exc:
+        raise ValueError(f"could not convert string to number: {raw!r}") from exc
+
+
+def parse_stored(raw: str) -> Number:
+    """Parse a persisted operand/result; empty or ``nan`` is a failed (NaN) result."""
+    return parse_number(raw) if raw.strip().lower() not in ("", "nan") else math.nan
+
+
+def decimal_error(exc: decimal.DecimalException) -> ValueError:
+    """The ValueError that reports a Decimal signal (overflow, invalid operation, ...)."""
+    return ValueError(f"Decimal arithmetic error: {type(exc).__name__}")
+
+
+def to_float(value: Number) -> float:
+    """``float(value)``; exact values beyond the float range become +-inf."""
+    try:
+        return float(value)
+    except OverflowError:  # e.g. Fraction(10**400)
+        return math.inf if value > 0 else -math.inf
+
+
+def is_exact(*values: object) -> bool:
+    """True if any value is a Decimal or a Fraction."""
+    return any(isinstance(v, (Decimal, Fraction)) for v in values)
+
+
+# --- integer and Fraction roots ---
+def iroot(n: int, k: int) -> int:
+    """Floor of the ``k``-th root of a non-negative integer (Newton's method)."""
+    if n < 2:
+        return n
+    x = 1 << -(-n.bit_length() // k)  # a power of two above the root
+    # A float estimate just above the root lets Newton converge quadratically
+    # instead of creeping down from x for about k steps
+    estimate = math.log2(n) / k
+    shift = max(0, int(estimate) - 48)
+    guess = (int(2 ** (estimate - shift) * (1 + 1e-6)) + 1) << shift
+    if guess < x and guess**k >= n:
+        x = guess
+    while True:
+        y = ((k - 1) * x + n // x ** (k - 1)) // k
+        if y >= x:
+            return x
+        x = y
+
+
+def _fraction_root(x: Fraction, k: int) -> Fraction:
+    """``k``-th root of ``x >= 0``: exact for perfect powers, else truncated.
+
+    Irrational roots keep ``current_precision()`` decimal places. The integer
+    Newton root below works on numbers of about ``k * precision`` digits, so
+    high degrees (``x ** 0.3333`` is a 10000th root) use a Decimal root instead.
+    """
+    n, d = x.numerator, x.denominator
+    rn = _exact_root(n, k)
+    rd = _exact_root(d, k) if rn is not None else None
+    if rn is not None and rd is not None:
+        return Fraction(rn, rd)
+    precision = current_precision()
+    if n.bit_length() + (k - 1) * d.bit_length() + 4 * k * precision > MAX_ROOT_BITS:
+        return _truncated_root(n, d, k, precision)
+    scale = 10**precision
+    # root(n / d) == root(n * d**(k - 1)) / d
+    return Fraction(iroot(n * d ** (k - 1) * scale**k, k), d * scale)
+
+
+def _exact_root(n: int, k: int) -> Optional[int]:
+    """The ``k``-th root of ``n`` if it is an integer, else None."""
+    if not _is_power_residue(n, k):
+        return None
+    candidate = iroot(n, k)
+    return candidate if candidate**k == n else None
+
+
+def _is_power_residue(n: int, k: int) -> bool:
+    """False if ``n`` is certainly not a ``k``-th power, checked modulo small primes.
+
+    Modulo a prime ``p = 1 (mod k)`` only one residue in ``k`` is a ``k``-th
+    power, so this rejects almost every non-power without an integer root.
+    """
+    checked, p = 0, k + 1
+    while checked < POWER_RESIDUE_PRIMES:
+        if _is_prime(p):
+            residue = n % p
+            if residue and pow(residue, (p - 1) // k, p) != 1:
+                return False
+            checked += 1
+        p += k
+    return True
+
+
+def _is_prime(p: int) -> bool:
+    return all(p % f for f in range(2, math.isqrt(p) + 1))
+
+
+def _truncated_root(n: int, d: int, k: int, places: int) -> Fraction:
+    """``k``-th root of ``n / d`` truncated to ``places`` decimal places, via Decimal."""
+    digits = max(0, (n.bit_length() - d.bit_length()) // (3 * k)) + 1  # of the integer part
+    with decimal.localcontext() as ctx:
+        ctx.prec = places + digits + 10
+        ctx.Emax, ctx.Emin = decimal.MAX_EMAX, decimal.MIN_EMIN
+        result = _decimal_root(_decimal_of(n) / _decimal_of(d), k)
+        return Fraction(result.quantize(Decimal(1).scaleb(-places), decimal.ROUND_DOWN))
+
+
+def _decimal_of(n: int) -> Decimal:
+    """``n`` rounded to the context precision without converting all of its digits."""
+    extra = n.bit_length() - 4 * decimal.getcontext().prec
+    if extra <= 0:
+        return Decimal(n)
+    return Decimal(n >> extra) * Decimal(2) ** extra
+
+
+# --- Decimal roots ---
+def _decimal_root(x: Decimal, k: int) -> Decimal:
+    """``k``-th root of ``x >= 0`` by Newton's iteration, rounded to the context."""
+    if x == 0:
+        return Decimal(0)
+    with decimal.localcontext() as ctx:
+        ctx.prec += 10
+        # A float estimate at any magnitude: 10 ** (log10(x) / k)
+        adjusted = x.adjusted()
+        log10 = (adjusted + math.log10(float(x.scaleb(-adjusted)))) / k
+        whole = math.floor(log10)
+        y = Decimal(10 ** (log10 - whole)).scaleb(whole)
+        for step in range(100):
+            nxt = ((k - 1) * y + x / y ** (k - 1)) / k
+            # After the first step Newton only decreases; stop at rounding noise
+            if nxt == y or (step and nxt > y):
+                break
+            y = nxt
+    y = +y  # round to the caller's precision
+    exact = y.normalize()
+    return exact if exact**k == x else y
+
+
+def _as_fraction(value: Number) -> Fraction:
+    return value if isinstance(value, Fraction) else Fraction(value)
+
+
+def _rational_power(a: Number, p: int, q: int) -> Number:
+    """``a ** (p / q)`` for ``a >= 0``, ``q >= 1``, computed as a root of ``a ** p``."""
+    if isinstance(a, Decimal):
+        base = a ** abs(p)
+        result: Number = base if q == 1 else _decimal_root(base, q)
+    else:
+        a = _as_fraction(a)
+        if max(a.numerator.bit_length(), a.denominator.bit_length()) * abs(p) > MAX_EXACT_BITS:
+            raise ValueError("Result too large for exact arithmetic")
+        base = a ** abs(p)
+        result = base if q == 1 else _fraction_root(base, q)
+    if p < 0:
+        if result == 0:
+            raise ValueError("Cannot raise 0 to a negative power")
+        result = 1 / result
+    return result
+
+
+def _to_decimal(value: Number) -> Decimal:
+    if isinstance(value, Fraction):
+        return Decimal(value.numerator) / Decimal(value.denominator)
+    return Decimal(value)
+
+
+def _promote(a: Number, b: Number):
+    """Bring both operands to one exact type (Decimal wins over Fraction)."""
+    if isinstance(a, Decimal) or isinstance(b, Decimal):
+        return _to_decimal(a), _to_decimal(b)
+    return _as_fraction(a), _as_fraction(b)
+
+
+def _ratio(x: Number) -> Optional[Tuple[int, int]]:
+    """``(p, q)`` with ``x == p / q`` if both stay within ``MAX_EXACT_DEGREE``, else None."""
+    if isinstance(x, Decimal) and (x.is_nan() or x.is_infinite() or abs(x.adjusted()) > 4):
+        return None  # avoid materializing huge integers for exponents like 1e999999
+    ratio = _as_fraction(x)
+    if abs(ratio.numerator) > MAX_EXACT_DEGREE or ratio.denominator > MAX_EXACT_DEGREE:
+        return None
+    return ratio.numerator, ratio.denominator
+
+
+def power(a: Number, b: Number) -> Number:
+    """``a ** b`` for Decimal/Fraction operands without going through float."""
+    a, b = _promote(a, b)
+    if a == 0 and b < 0:
+        raise ValueError("Cannot raise 0 to a negative power")
+    ratio = _ratio(b)
+    if ratio is None:
+        if isinstance(a, Decimal):
+            return a**b  # Decimal's own correctly rounded power
+        raise ValueError("Exponent too large for exact arithmetic")
+    p, q = ratio
+    if a < 0:
+        if q != 1:
+            raise ValueError("Fractional power of a negative number is not real")
+        result = _rational_power(-a, p, 1)
+        return -result if p % 2 else result
+    return _rational_power(a, p, q)
+
+
+def root(a: Number, b: Number) -> Number:
+    """The ``a``-th root of ``b`` (``RootOperation`` semantics) for exact operands."""
+    a, b = _promote(a, b)
+    if a == 0:
+        raise ValueError("Root degree cannot be zero")
+    ratio = _ratio(a)
+    if ratio is None:
+        raise ValueError("Root degree too large or too precise for exact arithmetic")
+    p, q = ratio  # a root of degree p/q is b ** (q/p)
+    if b < 0:
+        if q != 1:
+            raise ValueError("Fractional root of a negative number is not real")
+        if p % 2 == 0:
+            raise ValueError("Even root of a negative number is not real")
+        return -_rational_power(-b, 1 if p > 0 else -1, abs(p))
+    return _rational_power(b, q if p > 0 else -q, abs(p))
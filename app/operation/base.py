@@ -2,7 +2,12 @@ from typing import Protocol
 
 
 class Operation(Protocol):  # pylint: disable=too-few-public-methods
-    """Protocol for arithmetic operations."""
+    """Protocol for arithmetic operations.
+
+    Built-in operations also provide ``apply_many(a, b)`` for NumPy arrays
+    (see ``app.operation.batch``); the factory falls back to ``apply`` per
+    element for operations that do not.
+    """
 
     def apply(self, a: float, b: float) -> float:
         """Apply the operation to two numbers and return the result."""
@@ -0,0 +1,50 @@
+"""Helpers shared by the array-level ``apply_many`` implementations.
+
+``apply_many(a, b)`` mirrors ``apply`` over NumPy arrays and returns a pair
+``(values, errors)``: ``values`` is a float64 array (NaN where a row failed)
+and ``errors`` is an object array holding the scalar path's ``ValueError``
+message for failing rows and ``None`` elsewhere. NumPy is imported lazily.
+Where the scalar path raises OverflowError (``**`` beyond the float range),
+both paths report ``OVERFLOW`` instead of an infinite result.
+"""
+
+import importlib
+from typing import Any, Sequence, Tuple
+
+OVERFLOW = "Result too large for a float"
+
+
+def numpy() -> Any:
+    """Return the numpy module (raises ImportError if missing)."""
+    return importlib.import_module("numpy")
+
+
+def as_arrays(a: Any, b: Any) -> Tuple[Any, Any]:
+    """Convert operands to float64 arrays broadcast to a common shape."""
+    np = numpy()
+    a_arr, b_arr = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    return a_arr, b_arr
+
+
+def with_errors(values: Any, checks: Sequence[Tuple[Any, str]]) -> Tuple[Any, Any]:
+    """Attach per-element errors to ``values``.
+
+    ``checks`` are ``(mask, message)`` pairs in the same order the scalar
+    ``apply`` tests them; a row reports the first check it fails.
+    """
+    np = numpy()
+    errors = np.full(values.shape, None, dtype=object)
+    failed = np.zeros(values.shape, dtype=bool)
+    for mask, message in checks:
+        hit = mask & ~failed
+        errors[hit] = message
+        failed |= hit
+    if failed.any():
+        values = np.where(failed, np.nan, values)
+    return values, errors
+
+
+def overflowed(values: Any, a: Any, b: Any) -> Any:
+    """Mask of rows whose result overflowed to +-inf from finite operands."""
+    np = numpy()
+    return np.isinf(values) & np.isfinite(a) & np.isfinite(b)
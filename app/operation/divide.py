@@ -1,4 +1,7 @@
 # pylint: disable=too-few-public-methods
+from .batch import as_arrays, numpy, with_errors
+
+
 class DivideOperation:
     """Division operation."""
 
@@ -6,3 +9,11 @@ class DivideOperation:
         if b == 0:
             raise ValueError("Cannot divide by zero")
         return a / b
+
+    def apply_many(self, a, b):
+        """Vectorized ``apply`` over arrays; returns ``(values, errors)``."""
+        a, b = as_arrays(a, b)
+        np = numpy()
+        with np.errstate(all="ignore"):
+            values = a / b
+        return with_errors(values, [(b == 0, "Cannot divide by zero")])
@@ -1,6 +1,15 @@
 # pylint: disable=too-few-public-methods
+from .batch import as_arrays, numpy, with_errors
+
+
 class MultiplyOperation:
     """Multiplication operation."""
 
     def apply(self, a: float, b: float) -> float:
         return a * b
+
+    def apply_many(self, a, b):
+        """Vectorized ``apply`` over arrays; returns ``(values, errors)``."""
+        a, b = as_arrays(a, b)
+        with numpy().errstate(over="ignore"):  # inf, like the scalar path
+            return with_errors(a * b, ())
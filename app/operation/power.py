@@ -1,12 +1,45 @@
 # pylint: disable=too-few-public-methods
+from app import numeric
+from .batch import OVERFLOW, as_arrays, numpy, overflowed, with_errors
+
+
 class PowerOperation:
     """Exponentiation operation: returns a ** b.
 
     Edge cases:
     - 0 ** negative is undefined (would raise ZeroDivisionError); raise ValueError for clarity.
+    - A negative base with a fractional exponent has no real result (Python
+      would return a complex number); raise ValueError like RootOperation.
+    - A result beyond the float range raises ValueError instead of OverflowError.
+
+    Decimal/Fraction operands stay exact or high-precision (``numeric.power``).
     """
 
     def apply(self, a: float, b: float) -> float:  # pragma: no cover - covered via tests
+        if numeric.is_exact(a, b):
+            return numeric.power(a, b)
         if a == 0 and b < 0:
             raise ValueError("Cannot raise 0 to a negative power")
-        return a ** b
+        try:
+            result = a ** b
+        except OverflowError as exc:
+            raise ValueError(OVERFLOW) from exc
+        if isinstance(result, complex):
+            raise ValueError("Fractional power of a negative number is not real")
+        return result
+
+    def apply_many(self, a, b):
+        """Vectorized ``apply`` over arrays; returns ``(values, errors)``."""
+        a, b = as_arrays(a, b)
+        np = numpy()
+        with np.errstate(all="ignore"):
+            values = np.power(a, b)
+        fractional = np.isfinite(a) & np.isfinite(b) & (b != np.floor(b))
+        return with_errors(
+            values,
+            [
+                ((a == 0) & (b < 0), "Cannot raise 0 to a negative power"),
+                ((a < 0) & fractional, "Fractional power of a negative number is not real"),
+                (overflowed(values, a, b), OVERFLOW),
+            ],
+        )
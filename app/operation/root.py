@@ -1,5 +1,7 @@
 # pylint: disable=too-few-public-methods
 import math
+from app import numeric
+from .batch import OVERFLOW, as_arrays, numpy, overflowed, with_errors
 
 
 class RootOperation:
@@ -14,12 +16,23 @@ class RootOperation:
     - Negative radicand with non-integer degree is invalid.
     - Negative radicand with even integer degree is invalid (no real root).
     - Negative radicand with odd integer degree is allowed (real negative root).
+    - A result beyond the float range (e.g. degree 0.001) raises ValueError.
+
+    Decimal/Fraction operands use Newton's iteration (``numeric.root``).
     """
 
     def apply(self, a: float, b: float) -> float:  # pragma: no cover - covered via tests
+        if numeric.is_exact(a, b):
+            return numeric.root(a, b)
         if a == 0:
             raise ValueError("Root degree cannot be zero")
+        try:
+            return self._real_root(a, b)
+        except OverflowError as exc:
+            raise ValueError(OVERFLOW) from exc
 
+    @staticmethod
+    def _real_root(a: float, b: float) -> float:
         # If b is negative, degree must be an integer and odd to have a real root
         if b < 0:
             # Check if a is an integer within tolerance
@@ -32,3 +45,27 @@ class RootOperation:
             return -((-b) ** (1.0 / a_int))
 
         return b ** (1.0 / a)
+
+    def apply_many(self, a, b):
+        """Vectorized ``apply`` over arrays; returns ``(values, errors)``."""
+        a, b = as_arrays(a, b)
+        np = numpy()
+        rounded = np.round(a)
+        integral = np.isclose(a, rounded, rtol=1e-9, atol=0.0)
+        negative = b < 0
+        with np.errstate(all="ignore"):
+            positive_root = b ** (1.0 / a)
+            odd_negative_root = -((-b) ** (1.0 / rounded))
+            even = np.fmod(rounded, 2) == 0
+        values = np.where(negative, odd_negative_root, positive_root)
+        return with_errors(
+            values,
+            [
+                (a == 0, "Root degree cannot be zero"),
+                (negative & ~integral, "Fractional root of a negative number is not real"),
+                (negative & integral & even, "Even root of a negative number is not real"),
+                # scalar path raises ZeroDivisionError from 0.0 ** negative
+                ((b == 0) & (a < 0), "0.0 cannot be raised to a negative power"),
+                (overflowed(values, a, b), OVERFLOW),
+            ],
+        )
@@ -0,0 +1,357 @@
+"""Local asyncio calculation server: ``python -m app.server``.
+
+Clients connect over TCP (localhost by default) and send one JSON object per
+line, e.g. ``{"id": 7, "op": "root", "a": 3, "b": 27}``. Each request gets one
+JSON line back, ``{"id": 7, "result": 3.0}`` or ``{"id": 7, "error": "..."}``;
+``id`` is optional and echoed when present. Operands may be JSON numbers or
+strings (parsed with the active numeric backend, so ``"0.1"`` stays exact
+under the Decimal backend); NaN, infinities and integers too large for a
+float (under the float backend) are rejected.
+
+- Pipelining: a client may send any number of requests without waiting;
+  responses come back in request order on each connection.
+- Micro-batching: requests from all connections that arrive in the same
+  event-loop tick are evaluated together (at most ``max_batch`` at a time).
+  Batches of ``vectorize_min`` or more float requests go through
+  ``CalculationFactory.evaluate_many`` and are recorded with one
+  ``History.add_many``; smaller or exact batches use the scalar path and the
+  result cache. Both paths give the same responses: requests are evaluated
+  in isolation, whatever one of them raises becomes its own ``error``
+  response, and a non-finite result (e.g. ``1e308 * 10``) is answered with
+  an error and not recorded, so responses never carry NaN or Infinity.
+- Backpressure: a connection stops reading once ``max_pending`` of its
+  responses are unsent, and responses are only written as fast as the
+  client reads them (``drain``), so a slow client cannot grow server memory.
+
+Successful calculations are recorded in one shared ``ConcurrentHistory``
+(``--history PATH`` loads it at start and saves it on shutdown). See
+``app.loadgen`` for a load generator.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import signal
+import sys
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from app import numeric
+from app.calculation import CalculationFactory, ConcurrentHistory
+from app.config import load_settings
+from app.main import _configure
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BATCH = 1024
+MAX_PENDING = 256
+VECTORIZE_MIN = 64
+MAX_LINE = 64 * 1024
+INTERNAL_ERROR = "Internal server error"
+NON_FINITE = "Result is not a finite number"
+
+Response = Dict[str, Any]
+Request = Tuple[str, numeric.Number, numeric.Number]
+
+
+def _operand(value: Any, name: str) -> numeric.Number:
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"'{name}' must be a number")
+    try:
+        if isinstance(value, str):
+            number = numeric.parse_number(value)
+        elif numeric.current_backend() == "float":
+            number = float(value)
+        else:
+            number = numeric.parse_number(repr(value))
+    except OverflowError as exc:  # float() of a huge JSON integer
+        raise ValueError(f"'{name}' is too large") from exc
+    if not _finite(number):
+        raise ValueError(f"'{name}' must be a finite number")
+    return number
+
+
+def _finite(value: numeric.Number) -> bool:
+    if isinstance(value, Decimal):
+        return value.is_finite()
+    return not isinstance(value, float) or math.isfinite(value)
+
+
+def parse_request(line: bytes) -> Tuple[Any, Request]:
+    """Decode one request line into ``(id, (symbol, a, b))``; raises ValueError."""
+    try:
+        message = json.loads(line)
+    except ValueError as exc:
+        raise ValueError("Invalid JSON") from exc
+    if not isinstance(message, dict):
+        raise ValueError("Request must be a JSON object")
+    missing = [key for key in ("op", "a", "b") if key not in message]
+    if missing:
+        raise ValueError(f"Missing field(s): {', '.join(missing)}")
+    symbol = message["op"]
+    if symbol not in CalculationFactory.supported():
+        raise ValueError(f"Unknown operation: {symbol}")
+    return message.get("id"), (symbol, _operand(message["a"], "a"), _operand(message["b"], "b"))
+
+
+def _encode(request_id: Any, response: Response) -> bytes:
+    if request_id is not None:
+        response = {"id": request_id, **response}
+    return json.dumps(response).encode() + b"\n"
+
+
+def _result(value: Any) -> Response:
+    return {"result": str(value) if numeric.is_exact(value) else value}
+
+
+class Batcher:
+    """Collects requests submitted in one event-loop tick and evaluates them together."""
+
+    def __init__(
+        self,
+        history: ConcurrentHistory,
+        max_batch: int = MAX_BATCH,
+        vectorize_min: int = VECTORIZE_MIN,
+    ) -> None:
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        self.history = history
+        self.max_batch = max_batch
+        self.vectorize_min = vectorize_min
+        self.requests = 0
+        self.batches = 0
+        self._pending: List[Tuple[Request, asyncio.Future]] = []
+        self._scheduled = False
+
+    def submit(self, request: Request) -> "asyncio.Future[Response]":
+        """Queue a request; the future resolves to its response after the batch runs."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((request, future))
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif not self._scheduled:
+            self._scheduled = True
+            loop.call_soon(self.flush)
+        return future
+
+    def flush(self) -> None:
+        """Evaluate everything queued so far and resolve every future."""
+        self._scheduled = False
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.requests += len(batch)
+        self.batches += 1
+        requests = [request for request, _ in batch]
+        responses = None
+        try:
+            if len(batch) >= self.vectorize_min and numeric.current_backend() == "float":
+                responses = self._evaluate_vectorized(requests)
+            if responses is None:
+                responses = [self._evaluate(*request) for request in requests]
+        finally:
+            # Even if the batch failed unexpectedly, no connection may wait forever
+            if responses is None:
+                responses = [{"error": INTERNAL_ERROR}] * len(batch)
+            for (_, future), response in zip(batch, responses):
+                if not future.done():  # the connection may have gone away
+                    future.set_result(response)
+
+    def _evaluate(self, symbol: str, a: numeric.Number, b: numeric.Number) -> Response:
+        """Evaluate and record one request; any failure becomes its error response."""
+        try:
+            calc = CalculationFactory.from_symbol(symbol, a, b)
+            result = CalculationFactory.execute(calc)
+            if not _finite(result):
+                return {"error": NON_FINITE}
+            self.history.add(calc, result)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            return {"error": str(exc) or type(exc).__name__}
+        return _result(result)
+
+    def _evaluate_vectorized(self, requests: List[Request]) -> Optional[List[Response]]:
+        """NumPy path for a float batch; None if NumPy is unavailable."""
+        symbols, a, b = zip(*requests)
+        try:
+            batch = CalculationFactory.evaluate_many(list(symbols), a, b)
+        except ImportError:
+            return None
+        values, errors = batch.values.tolist(), batch.errors.tolist()
+        errors = [
+            NON_FINITE if error is None and not math.isfinite(value) else error
+            for value, error in zip(values, errors)
+        ]
+        ok = [i for i, error in enumerate(errors) if error is None]
+        self._record([requests[i] for i in ok], [values[i] for i in ok])
+        return [
+            {"result": value} if error is None else {"error": error}
+            for value, error in zip(values, errors)
+        ]
+
+    def _record(self, requests: List[Request], results: List[float]) -> None:
+        """Append successfully evaluated rows with a single ``History.add_many``."""
+        code_of: Dict[str, int] = {}
+        codes = [code_of.setdefault(symbol, len(code_of)) for symbol, _, _ in requests]
+        ops = [CalculationFactory.operation(symbol) for symbol in code_of]
+        a = [request[1] for request in requests]
+        b = [request[2] for request in requests]
+        self.history.add_many(ops, codes, a, b, results)
+
+
+class CalculationServer:
+    """Serves JSON-lines calculation requests into a shared History."""
+
+    def __init__(
+        self,
+        history: Optional[ConcurrentHistory] = None,
+        max_batch: int = MAX_BATCH,
+        max_pending: int = MAX_PENDING,
+        vectorize_min: int = VECTORIZE_MIN,
+    ) -> None:
+        if max_pending < 1:
+            raise ValueError("max_pending must be >= 1")
+        self.history = history if history is not None else ConcurrentHistory()
+        self.batcher = Batcher(self.history, max_batch, vectorize_min)
+        self.max_pending = max_pending
+        self._writers: Set[asyncio.StreamWriter] = set()
+
+    async def start(
+        self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT
+    ) -> asyncio.AbstractServer:
+        """Listen on ``host:port`` (port 0 picks a free one)."""
+        return await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one connection: read, batch and answer requests in order."""
+        self._writers.add(writer)
+        # Responses in request order; bounded so a slow client stops our reads
+        queue: "asyncio.Queue[Optional[Tuple[Any, asyncio.Future]]]" = asyncio.Queue(
+            self.max_pending
+        )
+        sender = asyncio.create_task(self._send(queue, writer))
+        try:
+            await self._receive(reader, queue)
+        finally:
+            await queue.put(None)
+            await sender
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _receive(self, reader: asyncio.StreamReader, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                line = await reader.readline()
+            except ConnectionError:
+                return
+            except ValueError:  # line longer than the stream limit
+                future = loop.create_future()
+                future.set_result({"error": f"Request line longer than {MAX_LINE} bytes"})
+                await queue.put((None, future))
+                return
+            if not line:
+                return
+            if not line.strip():
+                continue
+            try:
+                request_id, request = parse_request(line)
+            except ValueError as exc:
+                future = loop.create_future()
+                future.set_result({"error": str(exc)})
+                await queue.put((None, future))
+                continue
+            await queue.put((request_id, self.batcher.submit(request)))
+
+    @staticmethod
+    async def _send(queue: asyncio.Queue, writer: asyncio.StreamWriter) -> None:
+        connected = True
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            request_id, future = item
+            response = await future
+            if not connected:
+                continue  # keep consuming so the reader never blocks on a dead client
+            writer.write(_encode(request_id, response))
+            try:
+                await writer.drain()  # waits only while the client is not reading
+            except ConnectionError:
+                connected = False
+
+    def close_connections(self) -> None:
+        for writer in list(self._writers):
+            writer.close()
+
+
+async def serve(
+    server: CalculationServer,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    stop: Optional[asyncio.Event] = None,
+) -> None:
+    """Run ``server`` until ``stop`` is set (or SIGINT/SIGTERM in the main thread)."""
+    if stop is None:
+        stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except (ValueError, RuntimeError, NotImplementedError):  # pragma: no cover
+            pass  # not the main thread, or no signal support
+    listener = await server.start(host, port)
+    address = listener.sockets[0].getsockname()
+    print(f"Listening on {address[0]}:{address[1]}", flush=True)
+    try:
+        await stop.wait()
+    finally:
+        listener.close()
+        server.close_connections()
+        await listener.wait_closed()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(signum)
+
+
+def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.server", description="JSON-lines calculation server"
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="0 picks a free port")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument(
+        "--max-pending", type=int, default=MAX_PENDING, help="unsent responses per connection"
+    )
+    parser.add_argument("--vectorize-min", type=int, default=VECTORIZE_MIN)
+    parser.add_argument("--history", metavar="PATH", help="load at start, save on shutdown")
+    return parser.parse_args(list(argv))
+
+
+def _open_history(path: Optional[str], backend: str) -> ConcurrentHistory:
+    if path and os.path.exists(path):
+        return ConcurrentHistory.load(path, backend=backend)
+    return ConcurrentHistory(backend)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Serve until interrupted, then save the history if ``--history`` is given."""
+    args = _parse_args(argv or [])
+    settings = load_settings()
+    _configure(settings)
+    history = _open_history(args.history, settings.history_backend)
+    server = CalculationServer(history, args.max_batch, args.max_pending, args.vectorize_min)
+    asyncio.run(serve(server, args.host, args.port))
+    batcher = server.batcher
+    print(
+        f"Served {batcher.requests} requests in {batcher.batches} batches",
+        file=sys.stderr,
+    )
+    if args.history:
+        history.save(args.history)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])  # pragma: no cover
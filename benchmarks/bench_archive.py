@@ -0,0 +1,99 @@
+"""Benchmark the compressed archive format against CSV.
+
+Usage:
+    python -m benchmarks.bench_archive [--rows 200000] [--block-rows 65536]
+
+Two histories are encoded with both formats: ``repetitive`` (ops in short
+runs, integer operands from narrow ranges, as in typical archived sessions)
+and ``random`` (uniform random operands, the worst case for the float
+encodings). For each one the script reports bytes per row, the compression
+ratio (CSV size / archive size) and encode/decode throughput in rows/s.
+Only the format is timed: encoding reads the store, decoding produces the
+``add_many`` chunks without building a History.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from app.calculation import CalculationFactory, History
+from app.calculation.archive import read_archive, write_archive
+from app.calculation.csvio import read_csv, write_csv
+
+SYMBOLS = ("+", "-", "*", "/", "^", "root")
+
+
+def repetitive(rows: int) -> History:
+    rng = random.Random(1)
+    hist = History()
+    symbol = "+"
+    for i in range(rows):
+        if i % 8 == 0:
+            symbol = rng.choice(SYMBOLS)
+        a, b = float(rng.randint(1, 100)), float(rng.randint(1, 5))
+        hist.add(CalculationFactory.from_symbol(symbol, a, b))
+    return hist
+
+
+def uniform(rows: int) -> History:
+    rng = random.Random(2)
+    hist = History()
+    for _ in range(rows):
+        calc = CalculationFactory.from_symbol(rng.choice(SYMBOLS[:4]), rng.random(), rng.random())
+        hist.add(calc)
+    return hist
+
+
+def _timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _drain(chunks) -> None:
+    for _ in chunks:
+        pass
+
+
+def run(hist: History, workdir: str, block_rows: int) -> dict:
+    store, size = hist.create_memento().store, len(hist)
+    csv_path = os.path.join(workdir, "history.csv")
+    archive_path = os.path.join(workdir, "history.calz")
+    timings = {
+        "csv_encode": _timed(lambda: write_csv(csv_path, store, size)),
+        "csv_decode": _timed(lambda: _drain(read_csv(csv_path))),
+        "archive_encode": _timed(lambda: write_archive(archive_path, store, size, block_rows)),
+        "archive_decode": _timed(lambda: _drain(read_archive(archive_path))),
+    }
+    csv_bytes, archive_bytes = os.path.getsize(csv_path), os.path.getsize(archive_path)
+    result = {
+        "csv_bytes_per_row": csv_bytes / size,
+        "archive_bytes_per_row": archive_bytes / size,
+        "ratio": csv_bytes / archive_bytes,
+    }
+    result.update({f"{name}_rows_per_s": size / seconds for name, seconds in timings.items()})
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--block-rows", type=int, default=65_536)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory(prefix="bench-archive-") as workdir:
+        for name, build in (("repetitive", repetitive), ("random", uniform)):
+            r = run(build(args.rows), workdir, args.block_rows)
+            print(
+                f"{name:>10}: csv={r['csv_bytes_per_row']:.1f}B/row "
+                f"archive={r['archive_bytes_per_row']:.2f}B/row ratio={r['ratio']:.1f}x  "
+                f"encode csv={r['csv_encode_rows_per_s']:,.0f} "
+                f"archive={r['archive_encode_rows_per_s']:,.0f} rows/s  "
+                f"decode csv={r['csv_decode_rows_per_s']:,.0f} "
+                f"archive={r['archive_decode_rows_per_s']:,.0f} rows/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark History.Caretaker memory and latency at large step counts.
+
+Usage:
+    python -m benchmarks.bench_caretaker [--steps 100000 1000000] [--max-depth N]
+
+For each step count, records one calculation + one Caretaker.record per step,
+then undoes and redoes a batch of steps, then runs undo -> add -> record
+cycles (each add after an undo branches the history). Reports per-step
+latency and the memory retained by the history plus its undo stack
+(tracemalloc), also per undo/add cycle.
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from app.calculation import CalculationFactory, History
+
+
+def run(steps: int, max_depth=None, undo_steps: int = 1000, cycles: int = 1000) -> dict:
+    tracemalloc.start()
+    hist = History()
+    caretaker = History.Caretaker(max_depth)
+    caretaker.record(hist)
+    calc = CalculationFactory.from_symbol("+", 1.0, 2.0)
+    base = tracemalloc.get_traced_memory()[0]
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        hist.add(calc, 3.0)
+        caretaker.record(hist)
+    record_s = time.perf_counter() - start
+    retained = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    n = min(undo_steps, steps)
+    start = time.perf_counter()
+    for _ in range(n):
+        caretaker.undo(hist)
+    for _ in range(n):
+        caretaker.redo(hist)
+    undo_redo_s = time.perf_counter() - start
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    for _ in range(cycles):
+        caretaker.undo(hist)
+        hist.add(calc, 3.0)
+        caretaker.record(hist)
+    cycle_s = time.perf_counter() - start
+    cycle_retained = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    return {
+        "steps": steps,
+        "record_us_per_step": record_s / steps * 1e6,
+        "undo_redo_us_per_step": undo_redo_s / (2 * n) * 1e6 if n else 0.0,
+        "retained_bytes_per_step": retained / steps,
+        "undo_add_us_per_cycle": cycle_s / cycles * 1e6 if cycles else 0.0,
+        "retained_bytes_per_cycle": cycle_retained / cycles if cycles else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--max-depth", type=int, default=None)
+    args = parser.parse_args()
+    for steps in args.steps:
+        r = run(steps, args.max_depth)
+        print(
+            f"steps={r['steps']:>9}  record={r['record_us_per_step']:.2f}us/step  "
+            f"undo/redo={r['undo_redo_us_per_step']:.2f}us/step  "
+            f"memory={r['retained_bytes_per_step']:.1f}B/step  "
+            f"undo+add={r['undo_add_us_per_cycle']:.2f}us/cycle  "
+            f"memory={r['retained_bytes_per_cycle']:.1f}B/cycle"
+        )
+
+
+if __name__ == "__main__":
+    main()
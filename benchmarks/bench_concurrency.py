@@ -0,0 +1,96 @@
+"""Benchmark ConcurrentHistory under contention: N producers plus readers.
+
+Usage:
+    python -m benchmarks.bench_concurrency [--rows 200000] [--producers 1 2 4 8] [--readers 2]
+
+For each producer count, ``--rows`` calculations are split between the
+producer threads (each ``add`` executes its calculation) while ``--readers``
+threads alternate ``to_strings()`` and ``all()`` snapshots until the
+producers finish. Reports producer throughput, the number of snapshots read
+and their mean latency, next to a single-threaded plain ``History`` baseline.
+On CPython the GIL serializes the Python work, so this measures locking
+overhead and fairness rather than parallel speedup.
+"""
+
+import argparse
+import threading
+import time
+
+from app.calculation import CalculationFactory, ConcurrentHistory, History
+
+
+def _calcs(rows: int) -> list:
+    return [CalculationFactory.from_symbol("+", float(i), 1.0) for i in range(rows)]
+
+
+def baseline(rows: int) -> dict:
+    hist = History()
+    calcs = _calcs(rows)
+    start = time.perf_counter()
+    for calc in calcs:
+        hist.add(calc)
+    seconds = time.perf_counter() - start
+    return {"adds_per_s": rows / seconds}
+
+
+def run(rows: int, producers: int, readers: int, backend: str = "list") -> dict:
+    hist = ConcurrentHistory(backend)
+    calcs = _calcs(rows)
+    done = threading.Event()
+    reads = []  # (seconds, rows) per snapshot
+
+    def produce(part: list) -> None:
+        for calc in part:
+            hist.add(calc)
+
+    def read() -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            size = len(hist.to_strings()) if len(reads) % 2 else len(hist.all())
+            reads.append((time.perf_counter() - start, size))
+
+    reader_threads = [threading.Thread(target=read) for _ in range(readers)]
+    producer_threads = [
+        threading.Thread(target=produce, args=(calcs[i::producers],)) for i in range(producers)
+    ]
+    for thread in reader_threads:
+        thread.start()
+    start = time.perf_counter()
+    for thread in producer_threads:
+        thread.start()
+    for thread in producer_threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    done.set()
+    for thread in reader_threads:
+        thread.join()
+
+    assert len(hist) == rows
+    return {
+        "producers": producers,
+        "adds_per_s": rows / seconds,
+        "reads": len(reads),
+        "read_ms": sum(s for s, _ in reads) / len(reads) * 1e3 if reads else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--producers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--backend", choices=["list", "columnar"], default="list")
+    args = parser.parse_args()
+    adds_per_s = baseline(args.rows)["adds_per_s"]
+    print(f"baseline History (1 thread, no readers): {adds_per_s:,.0f} adds/s")
+    for producers in args.producers:
+        r = run(args.rows, producers, args.readers, args.backend)
+        print(
+            f"producers={r['producers']:>2}  readers={args.readers}  "
+            f"{r['adds_per_s']:,.0f} adds/s  snapshots={r['reads']}  "
+            f"mean read={r['read_ms']:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Compare per-entry memory of the History record layout against the old one.
+
+Usage:
+    python -m benchmarks.bench_memory [--rows 1000000]
+
+The "legacy" layout mirrors the original code: a new operation instance per
+calculation and non-slotted frozen dataclasses. The "current" layout uses the
+factory's shared operation instances and slotted Calculation/History.Entry.
+"""
+
+import argparse
+import tracemalloc
+from dataclasses import dataclass
+
+from app.calculation import Calculation, CalculationFactory, History
+from app.operation import AddOperation, Operation
+
+
+@dataclass(frozen=True)
+class LegacyCalculation:
+    op: Operation
+    a: float
+    b: float
+
+
+@dataclass(frozen=True)
+class LegacyEntry:
+    calc: LegacyCalculation
+    result: float
+
+
+def _measure(build, rows: int) -> float:
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    items = build(rows)
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del items
+    return used / rows
+
+
+def build_legacy(rows: int) -> list:
+    return [
+        LegacyEntry(LegacyCalculation(AddOperation(), float(i), 1.0), float(i) + 1.0)
+        for i in range(rows)
+    ]
+
+
+def build_current(rows: int) -> list:
+    op = CalculationFactory.operation("+")
+    return [History.Entry(Calculation(op, float(i), 1.0), float(i) + 1.0) for i in range(rows)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    legacy = _measure(build_legacy, args.rows)
+    current = _measure(build_current, args.rows)
+    print(f"rows={args.rows}")
+    print(f"legacy : {legacy:.1f} B/entry")
+    print(f"current: {current:.1f} B/entry ({current / legacy:.0%} of legacy)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Cost per operation of the float, Decimal and Fraction numeric backends.
+
+Usage:
+    python -m benchmarks.bench_numeric [--rows 20000] [--precision 28]
+
+Each backend parses the same random operands with ``numeric.parse_number``
+and runs every operation through ``Calculation.execute``; the table shows
+the best of three runs in microseconds per call.
+"""
+
+import argparse
+import random
+import time
+
+from app import numeric
+from app.calculation import CalculationFactory
+
+CASES = (("+", "any"), ("/", "any"), ("^", "power"), ("root", "root"))
+
+
+def make_operands(rows: int, seed: int = 0):
+    rng = random.Random(seed)
+
+    def pairs(make_a, make_b):
+        return [(make_a(), make_b()) for _ in range(rows)]
+
+    return {
+        "any": pairs(lambda: f"{rng.uniform(1, 1000):.6f}", lambda: f"{rng.uniform(1, 1000):.6f}"),
+        "power": pairs(lambda: f"{rng.uniform(1, 10):.3f}", lambda: str(rng.randint(0, 8))),
+        "root": pairs(lambda: str(rng.randint(2, 5)), lambda: f"{rng.uniform(1, 100):.3f}"),
+    }
+
+
+def time_case(symbol: str, operands) -> float:
+    calcs = [CalculationFactory.from_symbol(symbol, x, y) for x, y in operands]
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for calc in calcs:
+            calc.execute()
+        best = min(best, time.perf_counter() - start)
+    return best / len(calcs) * 1e6
+
+
+def run(rows: int, precision: int) -> None:
+    raw = make_operands(rows)
+    print(f"{'backend':<10}" + "".join(f"{symbol:>10}" for symbol, _ in CASES) + "  (µs/op)")
+    try:
+        for backend in numeric.BACKENDS:
+            numeric.configure(backend, precision)
+            parsed = {
+                kind: [(numeric.parse_number(x), numeric.parse_number(y)) for x, y in pairs]
+                for kind, pairs in raw.items()
+            }
+            timings = [time_case(symbol, parsed[kind]) for symbol, kind in CASES]
+            print(f"{backend:<10}" + "".join(f"{t:>10.2f}" for t in timings))
+    finally:
+        numeric.configure()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--precision", type=int, default=numeric.DEFAULT_PRECISION)
+    args = parser.parse_args()
+    run(args.rows, args.precision)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Scaling of ``evaluate_parallel`` across 1..N worker processes.
+
+Usage:
+    python -m benchmarks.bench_parallel [--rows 2000000] [--chunk-size 50000] [--max-workers N]
+
+Every run evaluates the same mixed batch (all six operations, some failing
+rows) and checks that the values match the single-process run.
+"""
+
+import argparse
+import math
+import os
+import random
+import time
+
+from app.calculation import evaluate_parallel
+
+SYMBOLS = ("+", "-", "*", "/", "^", "root")
+
+
+def make_batch(rows: int, seed: int = 0):
+    rng = random.Random(seed)
+    symbols = [rng.choice(SYMBOLS) for _ in range(rows)]
+    a = [rng.uniform(-10, 10) for _ in range(rows)]
+    b = [float(rng.randint(0, 4)) for _ in range(rows)]
+    return symbols, a, b
+
+
+def run(rows: int, chunk_size: int, max_workers: int) -> None:
+    symbols, a, b = make_batch(rows)
+    baseline = None
+    base_s = 0.0
+    for workers in range(1, max_workers + 1):
+        start = time.perf_counter()
+        result = evaluate_parallel(symbols, a, b, workers=workers, chunk_size=chunk_size)
+        seconds = time.perf_counter() - start
+        if baseline is None:
+            baseline, base_s = result, seconds
+        else:
+            assert all(
+                x == y or (math.isnan(x) and math.isnan(y))
+                for x, y in zip(result.values, baseline.values)
+            ), "results differ from the single-process run"
+        print(
+            f"workers={workers:>2}  {seconds:.2f}s  {rows / seconds / 1e6:.2f}M rows/s  "
+            f"speedup={base_s / seconds:.2f}x  errors={result.error_count}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    run(args.rows, args.chunk_size, args.max_workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import math
+import random
+import statistics
+import tracemalloc
+
+import pytest
+
+from app import main as app_main
+from app.calculation import Calculation, CalculationFactory, History
+from app.calculation import aggregates
+from app.calculation.aggregates import Checkpoint, QuantileSketch, RunningStats
+from app.operation import DivideOperation
+from .utils import run_session
+
+
+def _fill(hist, rows):
+    for symbol, a, b in rows:
+        hist.add(CalculationFactory.from_symbol(symbol, float(a), float(b)))
+
+
+def test_running_stats_match_exact_values():
+    rng = random.Random(7)
+    values = [rng.uniform(-50, 150) for _ in range(5000)]
+    st = RunningStats()
+    for v in values:
+        st.add("+", v)
+    st.add("/", math.nan)
+    assert (st.count, st.errors, st.ok) == (5001, 1, 5000)
+    assert st.per_op == {"+": [5000, 0], "/": [1, 1]}
+    assert st.mean == pytest.approx(statistics.mean(values))
+    assert st.variance == pytest.approx(statistics.variance(values))
+    assert st.stdev == pytest.approx(statistics.stdev(values))
+    assert (st.minimum, st.maximum) == (min(values), max(values))
+    assert st.total == pytest.approx(sum(values))
+    assert st.error_rate == pytest.approx(1 / 5001)
+    ordered = sorted(values)
+    for q, estimate in st.quantiles().items():
+        assert estimate == pytest.approx(ordered[int(q * (len(ordered) - 1))], rel=0.03)
+
+
+def test_empty_stats():
+    st = RunningStats()
+    assert st.variance == 0.0 and st.error_rate == 0.0
+    assert math.isnan(st.quantiles()[0.5])
+
+
+def test_quantile_sketch_signs_zero_and_limits():
+    sketch = QuantileSketch(relative_accuracy=0.01, max_buckets=4)
+    for x in (-8.0, -1.0, 0.0, 0.0, 1.0, 10.0, 100.0, 1000.0, 10_000.0, math.inf):
+        sketch.add(x)
+    assert sketch.count == 10
+    assert sketch.quantile(0) == pytest.approx(-8, rel=0.01)
+    assert sketch.quantile(0.15) == pytest.approx(-1, rel=0.01)
+    assert sketch.quantile(0.3) == 0.0
+    assert sketch.quantile(0.9) == pytest.approx(10_000, rel=0.01)
+    assert sketch.quantile(1) == math.inf
+    with pytest.raises(ValueError):
+        sketch.quantile(1.5)
+    copied = sketch.copy()
+    sketch.add(5.0)
+    assert copied.count == 10
+
+
+def test_checkpoints_pack_the_sketch():
+    # pylint: disable=protected-access
+    stats = RunningStats()
+    for i in range(1, 3000):
+        stats.add("*", 1.05**i)
+        stats.add("/", -(1.07**i) if i % 2 else 0.0)
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    checkpoint = Checkpoint(stats)
+    packed = tracemalloc.get_traced_memory()[0] - base
+    copied = stats.copy()
+    copied_size = tracemalloc.get_traced_memory()[0] - base - packed
+    tracemalloc.stop()
+    buckets = len(stats.sketch._pos) + len(stats.sketch._neg)
+    assert packed < 20 * buckets + 2048 and 2 * packed < copied_size
+    restored = checkpoint.stats()
+    assert restored.quantiles() == copied.quantiles()
+    assert (restored.count, restored.sketch.zeros, restored.mean) == (5998, 1499, stats.mean)
+    restored.add("*", 1.0)
+    assert checkpoint.count == 5998 and checkpoint.stats().sketch.count == stats.sketch.count
+
+
+@pytest.mark.parametrize("backend", ["list", "columnar"])
+def test_history_stats_updated_on_add(backend):
+    hist = History(backend)
+    _fill(hist, [("+", 1, 2), ("*", 3, 4)])
+    hist.add(Calculation(DivideOperation(), 1.0, 0.0))
+    st = hist.stats()
+    assert (st.count, st.errors, st.total) == (3, 1, 15.0)
+    assert st.per_op == {"+": [1, 0], "*": [1, 0], "/": [1, 1]}
+    hist.clear()
+    assert hist.stats().count == 0
+
+
+def test_history_stats_follow_undo_redo_across_checkpoints(monkeypatch):
+    monkeypatch.setattr(aggregates, "CHECKPOINT_EVERY", 4)
+    hist = History()
+    ct = History.Caretaker()
+    ct.record(hist)
+    for i in range(10):
+        _fill(hist, [("+", i, 0)])
+        ct.record(hist)
+    assert hist.stats().total == sum(range(10))
+    for _ in range(3):
+        ct.undo(hist)
+    st = hist.stats()
+    assert (st.count, st.total, st.maximum) == (7, sum(range(7)), 6)
+    _fill(hist, [("-", 100, 0)])  # branches the store, aggregates start at the branch
+    assert (hist.stats().count, hist.stats().total) == (8, sum(range(7)) + 100)
+    ct.record(hist)
+    ct.undo(hist)
+    assert hist.stats().total == sum(range(7))
+    ct.redo(hist)
+    assert hist.stats().maximum == 100
+
+
+def test_history_stats_count_bulk_rows_lazily():
+    hist = History("columnar")
+    ops = [CalculationFactory.operation("+"), CalculationFactory.operation("/")]
+    hist.add_many(ops, [0, 1, 0], [1.0, 2.0, 3.0], [1.0, 0.0, 1.0], [2.0, math.nan, 4.0])
+    _fill(hist, [("+", 5, 5)])  # index not caught up yet: counted on the next stats()
+    st = hist.stats()
+    assert (st.count, st.errors, st.total) == (4, 1, 16.0)
+    assert hist.stats().count == 4
+
+
+def test_repl_stats(monkeypatch, capsys):
+    monkeypatch.delenv("HISTORY_CSV_PATH", raising=False)
+    run_session(["stats", "+", "1", "2", "/", "1", "0", "*", "2", "3", "stats", "exit"])
+    out = capsys.readouterr().out
+    assert "(no history yet)" in out
+    assert "Calculations: 2 (0 failed, error rate 0.0%)" in out
+    assert "sum=9 mean=4.5" in out and "min=3 max=6" in out
+    assert "Per operation: *: 1, +: 1" in out
+    assert "p50=" in out
+
+
+def test_repl_non_real_power_is_an_error(monkeypatch, capsys):
+    monkeypatch.delenv("HISTORY_CSV_PATH", raising=False)
+    run_session(["^", "-8", "0.5", "^", "-8", "3", "stats", "history", "exit"])
+    out = capsys.readouterr().out
+    assert "Error: Fractional power of a negative number is not real" in out
+    assert "Calculations: 1 (0 failed" in out
+    assert "-8.0 ^ 3.0 = -512.0" in out
+    hist = History()
+    hist.add(CalculationFactory.from_symbol("^", -8.0, 0.5))  # stored as a failed row
+    assert (len(hist), hist.stats().errors) == (1, 1)
+
+
+def test_repl_stats_only_failures(capsys):
+    hist = History()
+    hist.add(Calculation(DivideOperation(), 1.0, 0.0))
+    app_main._cmd_stats(hist)  # pylint: disable=protected-access
+    out = capsys.readouterr().out
+    assert "Calculations: 1 (1 failed, error rate 100.0%)" in out
+    assert "Percentiles" not in out
@@ -0,0 +1,176 @@
+import math
+import os
+import random
+import struct
+import tracemalloc
+
+import pytest
+
+from app.calculation import CalculationFactory, ConcurrentHistory, History, archive
+
+
+def _history(rows, backend="list", operand=float):
+    hist = History(backend)
+    for i in range(rows):
+        hist.add(CalculationFactory.from_symbol("/+*-"[i % 4], operand(i), float(i % 3)))
+    return hist
+
+
+def _bits(hist):
+    return [
+        (CalculationFactory.symbol_for(e.calc.op),) + struct.unpack("<3Q", struct.pack(
+            "<3d", e.calc.a, e.calc.b, e.result))
+        for e in hist.entries()
+    ]
+
+
+def _encodings(path):
+    """Encoding kinds of every block's (op, a, b, result) sections."""
+    kinds = []
+    with open(path, "rb") as fh:
+        fh.seek(archive.HEADER.size)
+        while True:
+            (rows,) = archive.COUNT.unpack(fh.read(archive.COUNT.size))
+            if not rows:
+                return kinds
+            block = []
+            for _ in range(4):
+                kind, length = archive.SECTION.unpack(fh.read(archive.SECTION.size))
+                fh.seek(length, os.SEEK_CUR)
+                block.append(kind)
+            kinds.append(tuple(block))
+
+
+@pytest.mark.parametrize("backend", ["list", "columnar"])
+def test_roundtrip_is_bit_exact_across_blocks(tmp_path, backend):
+    rng = random.Random(7)
+    hist = _history(10, backend)  # 0/0, 4/1, ... include failed (NaN) rows
+    for x in (-0.0, math.inf, -math.inf, 1e-308, 5e-324, 1.7976931348623157e308):
+        hist.add(CalculationFactory.from_symbol("*", x, 1.0))
+    for _ in range(50):
+        hist.add(CalculationFactory.from_symbol("+", rng.random(), rng.uniform(-1e9, 1e9)))
+    path = str(tmp_path / "h.calz")
+    hist.save_archive(path, block_rows=7)
+    chunks = list(archive.read_archive(path))
+    assert [len(codes) for _, codes, *_ in chunks] == [7] * 9 + [3]
+    loaded = History.load_archive(path, backend=backend)
+    assert loaded.backend == backend
+    assert _bits(loaded) == _bits(hist)
+
+
+def test_encodings_follow_the_data(tmp_path):
+    repetitive = History()
+    for i in range(1000):
+        symbol = "+" if i < 600 else "*"
+        repetitive.add(CalculationFactory.from_symbol(symbol, float(i % 10), float(i % 4)))
+    varied = _history(1000, operand=lambda i: random.Random(i).random())
+    kinds = []
+    for name, hist in (("rep", repetitive), ("var", varied)):
+        path = str(tmp_path / f"{name}.calz")
+        hist.save_archive(path)
+        kinds.append(_encodings(path))
+        assert History.load_archive(path).to_strings() == hist.to_strings()
+    runs, dictionary, xor = archive.OP_RUNS, archive.FLOAT_DICT, archive.FLOAT_XOR
+    assert kinds[0] == [(runs, dictionary, dictionary, dictionary)]
+    assert kinds[1] == [(archive.OP_CODES, xor, dictionary, xor)]
+
+
+def test_wide_dictionary_codes(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "_encode_xor", lambda np, bits: b"\0" * (100 * len(bits)))
+    hist = _history(300)  # 300 distinct operands need two-byte codes
+    path = str(tmp_path / "h.calz")
+    hist.save_archive(path)
+    assert History.load_archive(path).to_strings() == hist.to_strings()
+    monkeypatch.undo()
+    monkeypatch.setattr(archive, "MAX_DICT", 2)  # too many distinct values: always XOR
+    hist.save_archive(path)
+    assert set(_encodings(path)[0][1:]) == {archive.FLOAT_XOR}
+    assert History.load_archive(path).to_strings() == hist.to_strings()
+
+
+def test_repetitive_history_compresses_well(tmp_path):
+    hist = History()
+    rng = random.Random(3)
+    for i in range(5000):
+        symbol = "+-*/"[i // 10 % 4]
+        hist.add(CalculationFactory.from_symbol(symbol, float(rng.randint(1, 50)), 2.0))
+    hist.save(str(tmp_path / "h.csv"))
+    hist.save(str(tmp_path / "h.calz"))
+    ratio = os.path.getsize(tmp_path / "h.csv") / os.path.getsize(tmp_path / "h.calz")
+    assert ratio > 4
+    assert History.load(str(tmp_path / "h.calz")).to_strings() == hist.to_strings()
+
+
+def test_empty_history(tmp_path):
+    path = str(tmp_path / "empty.calz")
+    History().save(path)
+    assert not list(archive.read_archive(path))
+    assert len(ConcurrentHistory.load(path)) == 0
+
+
+def test_concurrent_history_saves_a_snapshot(tmp_path):
+    hist = ConcurrentHistory()
+    hist.add(CalculationFactory.from_symbol("^", 2.0, 10.0))
+    path = str(tmp_path / "h.calz")
+    hist.save(path)
+    assert History.load(path).to_strings() == ["2.0 ^ 10.0 = 1024.0"]
+
+
+def test_reading_streams_one_block_at_a_time(tmp_path):
+    hist = _history(40_000)
+    path = str(tmp_path / "h.calz")
+    hist.save_archive(path, block_rows=2_000)
+    tracemalloc.start()
+    try:
+        for _ in archive.read_archive(path):
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # A block's decoded columns, not the whole file's 40k rows
+    assert peak < 2_000 * 200
+
+
+def test_invalid_files(tmp_path):
+    good = str(tmp_path / "good.calz")
+    _history(20).save_archive(good, block_rows=8)
+    data = open(good, "rb").read()  # pylint: disable=consider-using-with,unspecified-encoding
+    cases = {
+        "bad.calz": (b"NOTANARC" + data[8:], "Not a history archive"),
+        "short.calz": (data[:5], "Truncated"),
+        "cut.calz": (data[:-10], "Truncated"),
+        "flip.calz": (data[:30] + bytes([data[30] ^ 0xFF]) + data[31:], "Corrupt"),
+    }
+    for name, (content, message) in cases.items():
+        path = tmp_path / name
+        path.write_bytes(content)
+        with pytest.raises(ValueError, match=message):
+            History.load_archive(str(path))
+
+
+def test_corrupt_sections(tmp_path, monkeypatch):
+    path = str(tmp_path / "h.calz")
+    no_ops = b"\x00"  # an empty op table
+    for section in ((9, no_ops), (archive.OP_CODES, no_ops), (archive.OP_CODES, no_ops * 4)):
+        monkeypatch.setattr(archive, "_encode_ops", lambda np, symbols, s=section: s)
+        _history(3).save_archive(path)
+        with pytest.raises(ValueError, match="Corrupt history archive"):
+            History.load_archive(path)
+    monkeypatch.undo()
+    monkeypatch.setattr(archive, "_encode_floats", lambda np, values: (9, b""))
+    _history(3).save_archive(path)
+    with pytest.raises(ValueError, match="unknown float encoding"):
+        History.load_archive(path)
+
+
+def test_unknown_operation_and_limits(tmp_path, monkeypatch):
+    path = str(tmp_path / "h.calz")
+    _history(3).save_archive(path)
+    monkeypatch.setattr(CalculationFactory, "supported", classmethod(lambda cls: ["+"]))
+    with pytest.raises(ValueError, match="Unknown operation"):
+        History.load_archive(path)
+    monkeypatch.undo()
+    with pytest.raises(ValueError, match="block_rows"):
+        History().save_archive(path, block_rows=0)
+    with pytest.raises(ValueError, match="255 operation types"):
+        archive._encode_ops(archive._numpy(), [str(i) for i in range(256)])  # pylint: disable=protected-access
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from app import bench
+from .utils import has_pandas
+
+
+def test_run_suite_reports_every_case_and_size():
+    report = bench.run_suite(sizes=[5, 20], repeat=1)
+    assert report["version"] == bench.REPORT_VERSION and report["repeat"] == 1
+    measured = {(r["case"], r["rows"]) for r in report["results"]}
+    expected_cases = set(bench.cases()) - set(report["skipped"])
+    assert measured == {(name, rows) for name in expected_cases for rows in (5, 20)}
+    assert "operation.apply[root]" in expected_cases
+    if has_pandas():
+        assert not report["skipped"]
+    for result in report["results"]:
+        assert result["seconds"] >= 0 and result["rows_per_s"] > 0
+
+
+def test_run_suite_filters_and_validates():
+    report = bench.run_suite(sizes=[3], repeat=2, only=["caretaker"])
+    assert [r["case"] for r in report["results"]] == ["caretaker.record", "caretaker.undo_redo"]
+    with pytest.raises(ValueError, match="No benchmark"):
+        bench.run_suite(sizes=[3], only=["nope"])
+    with pytest.raises(ValueError):
+        bench.run_suite(sizes=[0])
+    with pytest.raises(ValueError):
+        bench.run_suite(sizes=[3], repeat=0)
+
+
+def _report(**seconds):
+    return {"results": [{"case": name, "rows": 10, "seconds": s} for name, s in seconds.items()]}
+
+
+def test_compare_classifies_changes():
+    baseline = _report(slow=1.0, fast=1.0, same=1.0, zero=0.0)
+    current = _report(slow=1.5, fast=0.5, same=1.1, zero=0.1, new=1.0)
+    status = {row["case"]: row["status"] for row in bench.compare(current, baseline, 0.2)}
+    assert status == {
+        "slow": "regression", "fast": "improvement", "same": "ok", "zero": "regression"
+    }
+
+
+def test_main_lists_cases(capsys):
+    assert bench.main(["--list"]) == 0
+    assert capsys.readouterr().out.split() == bench.cases()
+
+
+def test_main_writes_report_and_detects_regressions(tmp_path, capsys):
+    out = tmp_path / "report.json"
+    args = ["--sizes", "10", "--repeat", "1", "-k", "history.add"]
+    assert bench.main(args + ["--output", str(out)]) == 0
+    report = json.loads(out.read_text(encoding="utf-8"))
+    assert {r["case"] for r in report["results"]} == {"history.add", "history.add+observers"}
+
+    assert bench.main(args + ["--baseline", str(out), "--threshold", "1000"]) == 0
+    printed = json.loads(capsys.readouterr().out)
+    assert {row["status"] for row in printed["comparison"]} <= {"ok", "improvement"}
+
+    for result in report["results"]:
+        result["seconds"] = 1e-12
+    out.write_text(json.dumps(report), encoding="utf-8")
+    assert bench.main(args + ["--baseline", str(out)]) == 1
+    assert "regression: history.add rows=10" in capsys.readouterr().err
+
+
+def test_pandas_cases_are_skipped_without_pandas(monkeypatch):
+    monkeypatch.setattr(bench, "_has_pandas", lambda: False)
+    report = bench.run_suite(sizes=[3], repeat=1, only=["history.to_"])
+    assert report["skipped"] == ["history.to_dataframe"]
+    assert [r["case"] for r in report["results"]] == ["history.to_strings"]
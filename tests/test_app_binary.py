@@ -0,0 +1,126 @@
+import os
+
+import pytest
+
+from app.calculation import CalculationFactory, History, HistoryJournal
+from app.calculation.binary import RECORD, write_binary
+from .utils import run_session, has_pandas
+
+
+def _sample(backend="list"):
+    hist = History(backend)
+    for symbol, a, b in [("+", 1.0, 2.0), ("root", 2.0, 9.0), ("/", 7.0, 2.0)]:
+        hist.add(CalculationFactory.from_symbol(symbol, a, b))
+    return hist
+
+
+@pytest.mark.parametrize("backend", ["list", "columnar"])
+def test_binary_roundtrip(tmp_path, backend):
+    path = str(tmp_path / "h.bin")
+    hist = _sample(backend)
+    hist.save(path)
+    loaded = History.load(path)
+    assert loaded.backend == "mapped"
+    assert len(loaded) == 3
+    assert loaded.to_strings() == hist.to_strings()
+    assert loaded.last().execute() == 3.5
+    assert list(loaded.column("op")) == ["+", "root", "/"]
+    assert os.path.getsize(path) > 3 * RECORD.size
+
+
+def test_binary_append_undo_and_clear(tmp_path):
+    path = str(tmp_path / "h.bin")
+    _sample().save_binary(path)
+    hist = History.load_binary(path)
+    ct = History.Caretaker()
+    ct.record(hist)
+    hist.add(CalculationFactory.from_symbol("*", 2.0, 3.0))
+    ct.record(hist)
+    assert list(hist.column("result")) == [3.0, 3.0, 3.5, 6.0]
+    assert ct.undo(hist) is True
+    ct.undo(hist)
+    hist.restore_memento(History.Memento(hist.create_memento().store, 1))
+    hist.add(CalculationFactory.from_symbol("-", 5.0, 1.0))  # forks the mapped store
+    assert hist.to_strings() == ["1.0 + 2.0 = 3.0", "5.0 - 1.0 = 4.0"]
+    hist.clear()
+    assert hist.backend == "list"
+
+
+def test_binary_add_many_goes_to_tail(tmp_path):
+    path = str(tmp_path / "h.bin")
+    _sample().save(path)
+    hist = History.load(path)
+    hist.add_many([CalculationFactory.operation("^")], [0], [2.0], [8.0], [256.0])
+    assert hist.to_strings()[-1] == "2.0 ^ 8.0 = 256.0"
+
+
+def test_binary_save_over_mapped_file(tmp_path):
+    path = str(tmp_path / "h.bin")
+    _sample().save(path)
+    hist = History.load(path)
+    hist.add(CalculationFactory.from_symbol("+", 10.0, 10.0))
+    hist.save(path)  # rewritten via rename; the live mapping stays valid
+    assert len(hist.to_strings()) == 4
+    assert History.load(path).to_strings() == hist.to_strings()
+
+
+def test_binary_rejects_bad_files(tmp_path):
+    short = tmp_path / "short.bin"
+    short.write_bytes(b"xx")
+    bad = tmp_path / "bad.bin"
+    bad.write_bytes(b"NOTAHIST" + bytes(20))
+    truncated = str(tmp_path / "trunc.bin")
+    _sample().save(truncated)
+    with open(truncated, "r+b") as fh:
+        fh.truncate(os.path.getsize(truncated) - 1)
+    for path in (short, bad, truncated):
+        with pytest.raises(ValueError):
+            History.load_binary(str(path))
+
+
+def test_binary_write_limits(tmp_path):
+    ops = [str(i) for i in range(256)]
+    with pytest.raises(ValueError):
+        write_binary(str(tmp_path / "x.bin"), [0.0] * 256, ops, [0.0] * 256, [0.0] * 256)
+
+
+def test_binary_large_write_is_chunked(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.calculation.binary._CHUNK_ROWS", 2)
+    path = str(tmp_path / "h.bin")
+    _sample().save(path)
+    assert len(History.load(path)) == 3
+
+
+@pytest.mark.skipif(not has_pandas(), reason="pandas not installed")
+def test_journal_with_binary_snapshot(tmp_path):
+    path = str(tmp_path / "h.bin")
+    journal = HistoryJournal(path, compact_every=2)
+    hist = journal.load()
+    for i in range(3):
+        calc = CalculationFactory.from_symbol("+", float(i), 1.0)
+        hist.add(calc, calc.execute())
+        journal.record(hist, calc, calc.execute())
+    journal.close()
+    assert len(History.load(path)) == 2
+    assert len(HistoryJournal(path).load()) == 3
+
+
+def test_repl_save_load_binary(tmp_path, capsys):
+    path = tmp_path / "h.bin"
+    run_session(["+", "1", "2", f"save {path}", "clear", f"load {path}", "history", "exit"])
+    out = capsys.readouterr().out
+    assert "Saved to" in out
+    assert "Loaded from" in out
+    assert out.count("1.0 + 2.0 = 3.0") == 2
+
+
+def test_repl_loads_csv_after_binary(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("HISTORY_BACKEND", "columnar")
+    monkeypatch.delenv("HISTORY_CSV_PATH", raising=False)
+    binary, csv = tmp_path / "h.bin", tmp_path / "h.csv"
+    run_session(["+", "1", "2", f"save {binary}", f"save {csv}", f"load {binary}",
+                 f"load {csv}", "history", "exit"])
+    out = capsys.readouterr().out
+    assert "Unknown history backend" not in out
+    assert out.count("Loaded from") == 2
+    assert out.endswith(f"Loaded from {csv}\n1.0 + 2.0 = 3.0\n👋 Goodbye!\n")
@@ -0,0 +1,94 @@
+import pytest
+
+from app.calculation import CalculationFactory, ResultCache
+from app.config import load_settings
+from app.operation import PowerOperation
+from .utils import run_session
+
+
+@pytest.fixture(name="factory_cache")
+def fixture_factory_cache():
+    CalculationFactory.configure_cache(2)
+    yield CalculationFactory.cache()
+    CalculationFactory.configure_cache(0)
+
+
+def test_cache_lru_eviction_and_stats():
+    cache = ResultCache(maxsize=2)
+    assert cache.stats().hit_rate == 0.0
+    assert cache.get_or_compute("a", lambda: 1.0) == 1.0
+    assert cache.get_or_compute("b", lambda: 2.0) == 2.0
+    assert cache.get_or_compute("a", lambda: 99.0) == 1.0  # hit; "a" now most recent
+    assert cache.get_or_compute("c", lambda: 3.0) == 3.0  # evicts "b"
+    assert cache.get_or_compute("b", lambda: 4.0) == 4.0
+    st = cache.stats()
+    assert (st.size, st.maxsize, st.hits, st.misses, st.evictions) == (2, 2, 1, 4, 2)
+    assert st.hit_rate == pytest.approx(0.2)
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_cache_replays_errors_without_recomputing():
+    cache = ResultCache(maxsize=4)
+    calls = []
+
+    def boom():
+        calls.append(1)
+        raise ValueError("Even root of a negative number is not real")
+
+    for _ in range(3):
+        with pytest.raises(ValueError, match="Even root"):
+            cache.get_or_compute(("root", 2, -9), boom)
+    assert len(calls) == 1
+    assert cache.stats().hits == 2
+
+
+def test_cache_rejects_non_positive_size():
+    with pytest.raises(ValueError):
+        ResultCache(0)
+
+
+def test_factory_execute_uses_cache_for_selected_ops(factory_cache):
+    calc = CalculationFactory.from_symbol("^", 2.0, 10.0)
+    assert CalculationFactory.execute(calc) == 1024.0
+    assert CalculationFactory.execute(calc) == 1024.0
+    assert CalculationFactory.execute(CalculationFactory.from_symbol("+", 1, 2)) == 3
+    assert factory_cache.stats().hits == 1
+    assert factory_cache.stats().misses == 1  # "+" bypasses the cache
+    with pytest.raises(ValueError):
+        CalculationFactory.execute(CalculationFactory.from_symbol("root", 0, 9))
+
+
+def test_factory_register_invalidates_cache(factory_cache):
+    CalculationFactory.execute(CalculationFactory.from_symbol("^", 2.0, 2.0))
+    assert len(factory_cache) == 1
+    CalculationFactory.register("^", PowerOperation)
+    assert len(factory_cache) == 0
+
+
+def test_factory_execute_without_cache():
+    CalculationFactory.configure_cache(0)
+    assert CalculationFactory.cache() is None
+    assert CalculationFactory.execute(CalculationFactory.from_symbol("^", 3, 2)) == 9
+
+
+def test_load_settings_cache(monkeypatch):
+    monkeypatch.setenv("RESULT_CACHE_SIZE", "128")
+    monkeypatch.setenv("RESULT_CACHE_OPS", "^, root ,,/")
+    s = load_settings()
+    assert s.result_cache_size == 128
+    assert s.result_cache_ops == ("^", "root", "/")
+
+
+def test_repl_cache_command(monkeypatch, capsys):
+    monkeypatch.delenv("RESULT_CACHE_SIZE", raising=False)
+    run_session(["cache", "exit"])
+    assert "Result cache disabled" in capsys.readouterr().out
+
+    monkeypatch.setenv("RESULT_CACHE_SIZE", "8")
+    try:
+        run_session(["^", "2", "3", "^", "2", "3", "root", "2", "-4", "cache", "exit"])
+    finally:
+        CalculationFactory.configure_cache(0)
+    out = capsys.readouterr().out
+    assert "Result cache: 2/8 entries, hits=1, misses=2, evictions=0" in out
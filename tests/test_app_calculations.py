@@ -1,5 +1,8 @@
+import pickle
+
 import pytest
 from app.calculation import Calculation, CalculationFactory, History
+from app.operation.base import Operation
 from app.operation import (
     AddOperation,
     SubtractOperation,
@@ -8,6 +11,7 @@ from app.operation import (
     PowerOperation,
     RootOperation,
 )
+from .utils import has_numpy
 
 @pytest.mark.parametrize(
     "op,a,b,expected",
@@ -44,6 +48,23 @@ def test_factory_from_symbol(symbol, a, b, expected):
     assert calc.execute() == pytest.approx(expected)
 
 
+def test_factory_shares_operation_instances():
+    c1 = CalculationFactory.from_symbol("+", 1, 2)
+    c2 = CalculationFactory.from_symbol("+", 3, 4)
+    assert c1.op is c2.op
+    assert CalculationFactory.operation("root") is CalculationFactory.operation("root")
+
+
+def test_calculation_is_slotted_and_picklable():
+    calc = CalculationFactory.from_symbol("*", 2, 3)
+    assert not hasattr(calc, "__dict__")
+    entry = History.Entry(calc, 6.0)
+    assert not hasattr(entry, "__dict__")
+    restored = pickle.loads(pickle.dumps(entry))
+    assert (restored.calc.a, restored.calc.b, restored.result) == (2, 3, 6.0)
+    assert restored.calc.execute() == 6
+
+
 def test_factory_unknown_symbol():
     with pytest.raises(ValueError):
         CalculationFactory.from_symbol("%", 2, 2)
@@ -91,3 +112,88 @@ def test_symbol_for_unknown_operation():
             return a  # pragma: no cover (value unused)
 
     assert CalculationFactory.symbol_for(UnknownOp()) == "?"
+
+
+@pytest.mark.skipif(not has_numpy(), reason="numpy not installed")
+def test_factory_evaluate_many_single_symbol():
+    res = CalculationFactory.evaluate_many("/", [1, 4, 9], [1, 0, 3])
+    assert list(res.errors) == [None, "Cannot divide by zero", None]
+    assert list(res.ok) == [True, False, True]
+    assert res.error_count == 1
+    assert res.values[0] == 1 and res.values[2] == 3
+
+
+@pytest.mark.skipif(not has_numpy(), reason="numpy not installed")
+def test_factory_evaluate_many_mixed_symbols():
+    res = CalculationFactory.evaluate_many(
+        ["+", "root", "root", "%", "^"], [1, 2, 2, 1, 0], [2, 9, -9, 1, -1]
+    )
+    assert res.values[0] == 3
+    assert res.values[1] == pytest.approx(3)
+    assert list(res.errors[2:]) == [
+        "Even root of a negative number is not real",
+        "Unknown operation: %",
+        "Cannot raise 0 to a negative power",
+    ]
+    assert res.error_count == 3
+
+
+@pytest.mark.skipif(not has_numpy(), reason="numpy not installed")
+def test_factory_evaluate_many_unknown_symbol_raises():
+    with pytest.raises(ValueError):
+        CalculationFactory.evaluate_many("%", [1], [2])
+
+
+@pytest.mark.skipif(not has_numpy(), reason="numpy not installed")
+def test_factory_evaluate_many_scalar_fallback():
+    class ModOperation:  # scalar-only operation without apply_many
+        # pylint: disable=too-few-public-methods
+        def apply(self, a: float, b: float) -> float:
+            if b == 0:
+                raise ValueError("Modulo by zero")
+            return a % b
+
+    op: Operation = ModOperation()
+    CalculationFactory.register("%", type(op))
+    try:
+        res = CalculationFactory.evaluate_many(["%", "%", "+"], [7, 1, 1], [4, 0, 1])
+    finally:
+        CalculationFactory.unregister("%")
+    assert list(res.values[[0, 2]]) == [3, 2]
+    assert list(res.errors) == [None, "Modulo by zero", None]
+
+
+def test_factory_register_and_unregister():
+    class ModOperation:
+        # pylint: disable=too-few-public-methods
+        def apply(self, a: float, b: float) -> float:
+            return a % b
+
+    CalculationFactory.register("%", ModOperation)
+    try:
+        assert "%" in CalculationFactory.supported()
+        calc = CalculationFactory.from_symbol("%", 7, 4)
+        assert calc.execute() == 3
+        assert CalculationFactory.symbol_for(calc.op) == "%"
+    finally:
+        CalculationFactory.unregister("%")
+    assert "%" not in CalculationFactory.supported()
+    assert CalculationFactory.symbol_for(ModOperation()) == "?"
+    CalculationFactory.unregister("%")  # unknown symbol: no-op
+
+
+def test_factory_register_replaces_symbol():
+    class FancyAdd(AddOperation):  # pylint: disable=too-few-public-methods
+        pass
+
+    # subclasses of registered operations resolve through their MRO
+    assert CalculationFactory.symbol_for(FancyAdd()) == "+"
+    CalculationFactory.register("+", FancyAdd)
+    try:
+        assert isinstance(CalculationFactory.from_symbol("+", 1, 2).op, FancyAdd)
+        assert CalculationFactory.symbol_for(FancyAdd()) == "+"
+        assert CalculationFactory.symbol_for(AddOperation()) == "?"
+    finally:
+        CalculationFactory.register("+", AddOperation)
+    assert CalculationFactory.symbol_for(AddOperation()) == "+"
+    assert CalculationFactory.supported()[0] == "+"  # position preserved
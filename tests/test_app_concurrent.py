@@ -0,0 +1,157 @@
+import threading
+
+import pytest
+
+from app.calculation import Calculation, CalculationFactory, ConcurrentHistory, History
+from app.operation import AddOperation
+from .utils import has_pandas
+
+PRODUCERS = 4
+PER_PRODUCER = 2000
+
+
+def _calc(a, b=1.0):
+    return Calculation(AddOperation(), float(a), float(b))
+
+
+def _run_threads(targets):
+    threads = [threading.Thread(target=target) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    assert not any(thread.is_alive() for thread in threads)
+
+
+def _producer(hist, tag):
+    def produce():
+        for i in range(PER_PRODUCER):
+            hist.add(_calc(i, tag))  # b identifies the producer
+
+    return produce
+
+
+@pytest.mark.parametrize("backend", ["list", "columnar"])
+def test_concurrent_producers_lose_no_rows(backend):
+    hist = ConcurrentHistory(backend)
+    seen = []
+    hist.register_observer(lambda calc, result: seen.append(result))
+    _run_threads([_producer(hist, tag) for tag in range(PRODUCERS)])
+    assert len(hist) == PRODUCERS * PER_PRODUCER
+    assert len(seen) == len(hist)
+    assert hist.stats().count == len(hist)
+    by_producer = {}
+    for calc in hist.all():
+        by_producer.setdefault(calc.b, []).append(calc.a)
+    # Each producer's rows are all there, in the order it added them
+    assert all(rows == [float(i) for i in range(PER_PRODUCER)] for rows in by_producer.values())
+
+
+def test_readers_see_consistent_snapshots_while_producers_write():
+    hist = ConcurrentHistory()
+    done = threading.Event()
+    errors = []
+
+    def read():
+        last = 0
+        while not done.is_set():
+            rows = hist.entries() if last % 2 else hist.to_strings()
+            calcs = hist.all()
+            # Snapshots only grow and each producer's rows form a prefix 0..k
+            if len(rows) < last or len(calcs) < len(rows):
+                errors.append((last, len(rows), len(calcs)))
+            last = len(rows)
+            counts = {}
+            for calc in calcs:
+                expected = counts.get(calc.b, 0)
+                if calc.a != expected:
+                    errors.append((calc.b, calc.a, expected))
+                counts[calc.b] = expected + 1
+
+    readers = [threading.Thread(target=read) for _ in range(2)]
+    for reader in readers:
+        reader.start()
+    _run_threads([_producer(hist, tag) for tag in range(PRODUCERS)])
+    done.set()
+    for reader in readers:
+        reader.join(30)
+    assert not errors
+    assert len(hist.to_strings()) == PRODUCERS * PER_PRODUCER
+
+
+def test_snapshot_is_pinned_across_undo_and_fork():
+    hist = ConcurrentHistory()
+    caretaker = ConcurrentHistory.Caretaker()
+    caretaker.record(hist)
+    for i in range(3):
+        hist.add(_calc(i))
+        caretaker.record(hist)
+    before = hist.snapshot()
+    assert caretaker.undo(hist) and caretaker.undo(hist)
+    hist.add(_calc(10))  # forks the shared store
+    assert [c.a for c in before.all()] == [0.0, 1.0, 2.0]
+    assert [c.a for c in hist.all()] == [0.0, 10.0]
+    assert hist.last().a == 10.0
+    assert list(hist.iter_strings(-1)) == ["10.0 + 1.0 = 11.0"]
+
+
+def test_caretaker_undo_redo_are_atomic_with_producers():
+    hist = ConcurrentHistory()
+    caretaker = ConcurrentHistory.Caretaker()
+    caretaker.record(hist)
+    sizes = []
+
+    def produce_and_record():
+        for i in range(500):
+            with hist.lock:  # group the add with its snapshot
+                hist.add(_calc(i))
+                caretaker.record(hist)
+                sizes.append(len(hist))
+
+    def undo_redo():
+        for _ in range(500):
+            with hist.lock:  # a record in between would clear the redo stack
+                if caretaker.undo(hist):
+                    assert caretaker.redo(hist)
+
+    _run_threads([produce_and_record, produce_and_record, undo_redo])
+    assert sorted(sizes) == list(range(1, 1001))
+    # Every undo step goes back exactly one recorded add
+    undone = []
+    while caretaker.undo(hist):
+        undone.append(len(hist))
+    assert undone == list(range(999, -1, -1))
+    assert caretaker.redo(hist) and len(hist) == 1
+
+
+def test_caretaker_accepts_plain_history():
+    hist = History()
+    caretaker = ConcurrentHistory.Caretaker(max_depth=1)
+    caretaker.record(hist)
+    hist.add(_calc(1))
+    caretaker.record(hist)
+    assert caretaker.undo(hist) and len(hist) == 0
+    assert caretaker.redo(hist) and len(hist) == 1
+
+
+def test_bulk_clear_and_queries(tmp_path):
+    hist = ConcurrentHistory("columnar")
+    ops = [CalculationFactory.operation("+"), CalculationFactory.operation("*")]
+    hist.add_many(ops, [0, 1, 1], [1.0, 2.0, 3.0], [1.0, 2.0, 3.0], [2.0, 4.0, 9.0])
+    assert list(hist.column("result")) == [2.0, 4.0, 9.0]
+    assert [e.result for e in hist.filter(op="*", result_range=(5, None))] == [9.0]
+    csv_path, bin_path = str(tmp_path / "h.csv"), str(tmp_path / "h.bin")
+    hist.save(csv_path)
+    hist.save(bin_path)
+    for loaded in (ConcurrentHistory.load(csv_path), ConcurrentHistory.load(bin_path)):
+        assert isinstance(loaded, ConcurrentHistory)
+        assert loaded.to_strings() == hist.to_strings()
+    hist.clear()
+    assert len(hist) == 0 and hist.last() is None
+
+
+@pytest.mark.skipif(not has_pandas(), reason="pandas not installed")
+def test_to_dataframe_reads_a_snapshot():
+    hist = ConcurrentHistory()
+    hist.add(_calc(1))
+    assert hist.to_dataframe()["result"].tolist() == [2.0]
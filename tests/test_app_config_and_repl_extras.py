@@ -11,6 +11,19 @@ def test_load_settings_env(monkeypatch):
     assert s.csv_path == "test_hist.csv"
 
 
+def test_load_settings_verify_on_load(monkeypatch):
+    monkeypatch.setenv("HISTORY_VERIFY_ON_LOAD", "yes")
+    assert load_settings().verify_on_load is True
+
+
+def test_load_settings_undo_depth(monkeypatch):
+    monkeypatch.setenv("UNDO_MAX_DEPTH", "5")
+    assert load_settings().undo_max_depth == 5
+    monkeypatch.setenv("UNDO_MAX_DEPTH", " ")
+    assert load_settings().undo_max_depth is None
+    monkeypatch.delenv("UNDO_MAX_DEPTH")
+    assert load_settings().undo_max_depth is None
+
 
 
 def test_repl_new_commands(capsys, tmp_path, monkeypatch):
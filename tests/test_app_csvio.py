@@ -0,0 +1,169 @@
+import math
+import tracemalloc
+from decimal import Decimal
+
+import pytest
+
+from app import numeric
+from app.calculation import CalculationFactory, History, csvio
+from .utils import has_pandas, run_session
+
+PANDAS = [False, pytest.param(True, marks=pytest.mark.skipif(not has_pandas(), reason="pandas"))]
+
+
+def _history(rows, backend="list"):
+    hist = History(backend)
+    for i in range(rows):
+        hist.add(CalculationFactory.from_symbol("/+*-"[i % 4], float(i), float(i % 3)))
+    return hist
+
+
+@pytest.mark.parametrize("use_pandas", PANDAS)
+@pytest.mark.parametrize("backend", ["list", "columnar"])
+def test_chunked_roundtrip(tmp_path, use_pandas, backend):
+    hist = _history(9, backend)  # 0/0 and 4/1 ... include failed (NaN) rows
+    path = str(tmp_path / "h.csv")
+    csvio.write_csv(path, hist._store, len(hist), chunk_size=2, use_pandas=use_pandas)  # pylint: disable=protected-access
+    loaded = History(backend)
+    chunks = list(csvio.read_csv(path, chunk_size=4, use_pandas=use_pandas))
+    assert [len(codes) for _, codes, *_ in chunks] == [4, 4, 1]
+    for chunk in chunks:
+        loaded.add_many(*chunk)
+    assert loaded.to_strings() == hist.to_strings()
+    assert math.isnan(loaded.entries()[0].result)
+
+
+def test_pandas_and_stdlib_write_identical_files(tmp_path):
+    if not has_pandas():
+        pytest.skip("pandas not installed")
+    hist = _history(7)
+    store = hist._store  # pylint: disable=protected-access
+    csvio.write_csv(str(tmp_path / "pd.csv"), store, 7, chunk_size=3, use_pandas=True)
+    csvio.write_csv(str(tmp_path / "std.csv"), store, 7, chunk_size=3, use_pandas=False)
+    text = (tmp_path / "pd.csv").read_text(encoding="utf-8")
+    assert text == (tmp_path / "std.csv").read_text(encoding="utf-8")
+    assert text.splitlines()[:2] == ["a,op,b,result", "0.0,/,0.0,"]
+
+
+@pytest.mark.parametrize("use_pandas", PANDAS)
+def test_empty_history(tmp_path, use_pandas):
+    path = str(tmp_path / "empty.csv")
+    csvio.write_csv(path, History()._store, 0, use_pandas=use_pandas)  # pylint: disable=protected-access
+    assert (tmp_path / "empty.csv").read_text(encoding="utf-8") == "a,op,b,result\n"
+    assert not list(csvio.read_csv(path, use_pandas=use_pandas))
+
+
+@pytest.mark.parametrize("use_pandas", PANDAS)
+def test_read_errors(tmp_path, use_pandas):
+    path = tmp_path / "bad.csv"
+    path.write_text("a,op,b,result\n1,+,2,3\n1,%,2,1\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="Unknown operation.*%"):
+        list(csvio.read_csv(str(path), chunk_size=1, use_pandas=use_pandas))
+    path.write_text("a,op,b,result\n1,+,2,3\n1,+,2,3\n1,+,2,3\n1,+,2,4\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="first at row 3"):
+        list(csvio.read_csv(str(path), chunk_size=2, verify=True, use_pandas=use_pandas))
+    with pytest.raises(ValueError, match="chunk_size"):
+        csvio.read_csv(str(path), chunk_size=0)
+    with pytest.raises(ValueError, match="chunk_size"):
+        csvio.write_csv(str(path), History()._store, 0, chunk_size=0)  # pylint: disable=protected-access
+
+
+def test_stdlib_reader_checks_columns_and_order(tmp_path):
+    path = tmp_path / "h.csv"
+    path.write_text("op,result,a,b\n*,6,2,3\n", encoding="utf-8")
+    hist = History()
+    for chunk in csvio.read_csv(str(path), verify=True, use_pandas=False):
+        hist.add_many(*chunk)
+    assert hist.to_strings() == ["2.0 * 3.0 = 6.0"]
+    path.write_text("a,op,b\n1,+,2\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="Missing column.*result"):
+        list(csvio.read_csv(str(path), use_pandas=False))
+
+
+def test_stdlib_reader_skips_blank_lines_and_rejects_ragged_rows(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "h.csv"
+    path.write_text("a,op,b,result\n\n1,+,2,3\n\n4,*,2,8\n", encoding="utf-8")
+    chunks = list(csvio.read_csv(str(path), chunk_size=1, verify=True, use_pandas=False))
+    assert [list(chunk[2]) for chunk in chunks] == [[1.0], [4.0]]
+    for row, count in (("1,+,2", 3), ("1,+,2,3,4", 5)):
+        path.write_text(f"a,op,b,result\n1,+,2,3\n{row}\n", encoding="utf-8")
+        with pytest.raises(ValueError, match=f"Line 3 of .* has {count} field"):
+            list(csvio.read_csv(str(path), use_pandas=False))
+    monkeypatch.setattr(csvio, "_pandas", lambda use_pandas: None)
+    monkeypatch.setenv("HISTORY_CSV_PATH", str(path))
+    run_session(["load " + str(path), "history", "exit"])  # startup and load report it
+    out = capsys.readouterr().out
+    assert "Error loading: Line 3" in out and "(no history yet)" in out
+
+
+def test_stdlib_path_keeps_exact_values(tmp_path):
+    numeric.configure("decimal")
+    try:
+        hist = History()
+        x = Decimal("0.1")
+        hist.add(CalculationFactory.from_symbol("+", x, x))
+        hist.add(CalculationFactory.from_symbol("/", x, Decimal(0)))
+        path = str(tmp_path / "h.csv")
+        csvio.write_csv(path, hist._store, 2, use_pandas=False)  # pylint: disable=protected-access
+        chunks = list(csvio.read_csv(path, verify=True, use_pandas=False))
+    finally:
+        numeric.configure()
+    (_, _, a, _, results), = chunks
+    assert a == [x, x] and results[0] == Decimal("0.2") and math.isnan(results[1])
+
+
+def test_use_pandas_requires_pandas(monkeypatch):
+    def missing(name):
+        raise ModuleNotFoundError(name)
+
+    monkeypatch.setattr(csvio.importlib, "import_module", missing)
+    assert csvio._pandas(None) is None  # pylint: disable=protected-access
+    with pytest.raises(ModuleNotFoundError):
+        csvio._pandas(True)  # pylint: disable=protected-access
+
+
+def _save_peak(hist, path, use_pandas):
+    tracemalloc.start()
+    try:
+        csvio.write_csv(path, hist._store, len(hist), 500, use_pandas)  # pylint: disable=protected-access
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _read_peak(path, use_pandas, chunk_size):
+    tracemalloc.start()
+    try:
+        for _ in csvio.read_csv(path, chunk_size, use_pandas=use_pandas):
+            pass  # History.add_many keeps the rows; the reader itself must not
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_save_peak_memory_is_bounded_by_chunk_size(tmp_path):
+    small, large = _history(2_000, "columnar"), _history(16_000, "columnar")
+    for use_pandas in (False, True) if has_pandas() else (False,):
+        path = str(tmp_path / "h.csv")
+        _save_peak(small, path, use_pandas)  # warm-up: imports and caches
+        small_peak = _save_peak(small, path, use_pandas)
+        large_peak = _save_peak(large, path, use_pandas)
+        assert large_peak < 1.5 * small_peak, (use_pandas, small_peak, large_peak)
+
+
+# pandas' C parser buffers about 1 MB of text whatever the chunk size, so its
+# plateau only shows on larger files
+@pytest.mark.parametrize(
+    "use_pandas, rows, chunk_size",
+    [(False, 3_000, 250), pytest.param(True, 64_000, 5_000, marks=PANDAS[1].marks)],
+)
+def test_read_peak_memory_is_bounded_by_chunk_size(tmp_path, use_pandas, rows, chunk_size):
+    peaks = []
+    for count in (rows, 4 * rows):
+        path = tmp_path / f"{count}.csv"
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write("a,op,b,result\n")
+            fh.writelines(f"{i}.5,+,2.25,{i + 2.75}\n" for i in range(count))
+        _read_peak(str(path), use_pandas, chunk_size)  # warm-up
+        peaks.append(_read_peak(str(path), use_pandas, chunk_size))
+    assert peaks[1] < 1.5 * peaks[0], peaks
@@ -0,0 +1,150 @@
+import pytest
+
+from app.calculation import CalculationFactory, History
+from app.expression import BinaryOp, Negate, Number, Variable, compile_expression, parse
+from app.expression.parser import MAX_DEPTH
+from app.operation import Operation
+from .utils import run_session
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    [
+        ("1 + 2 * 3", 7),
+        ("(1 + 2) * 3", 9),
+        ("1 - 2 - 3", -4),
+        ("8 / 4 / 2", 1),
+        ("2 ^ 3 ^ 2", 512),
+        ("-2 ^ 2", -4),
+        ("2 ^ -1", 0.5),
+        ("2 * -3", -6),
+        ("--3", 3),
+        ("3 root 27 + 1", 4),
+        ("2 ^ 10 / (3 root 27) - 4", 1024 / 3 - 4),
+        ("1.5e1 + .5", 15.5),
+        ("1+.5", 1.5),
+        ("1*.5", 0.5),
+        ("2^-.5", 2**-0.5),
+    ],
+)
+def test_precedence_and_associativity(source, expected):
+    assert compile_expression(source)() == pytest.approx(expected)
+
+
+def test_parse_tree():
+    assert parse("x * -(1 + 2)") == BinaryOp(
+        "*", Variable("x"), Negate(BinaryOp("+", Number(1.0), Number(2.0)))
+    )
+
+
+def test_variables_and_bindings():
+    f = compile_expression("x ^ 2 + y * x")
+    assert f.variables == ("x", "y")
+    assert f(x=3, y=1) == 12
+    assert f.evaluate({"x": 2, "y": 0}) == 4
+    assert list(f.evaluate_many({"x": x, "y": 1} for x in range(3))) == [0, 2, 6]
+    assert repr(f) == "CompiledExpression('x ^ 2 + y * x')"
+    with pytest.raises(ValueError, match="Undefined variable: y"):
+        f(x=1)
+
+
+@pytest.mark.parametrize(
+    "source, message",
+    [
+        ("1 $ 2", "Unknown operator"),
+        ("1 + 2)", "Unexpected token"),
+        ("(1 + 2", "Expected"),
+        ("1 +", "end of input"),
+        ("1 2", "Unexpected token"),
+        ("1 + 'a'", "Unknown operator: '"),
+        ("2 + é", "Unexpected character 'é' at position 4"),
+        ("2²", "Unexpected character '²' at position 1"),
+        ("1 . 2", "Unknown operator: \\."),
+        ("+".join(["1"] * 1000), "Expression too deep"),
+        ("(" * 1000 + "1" + ")" * 1000, "Expression too deep"),
+        ("-" * 1000 + "1", "Expression too deep"),
+        ("^".join(["2"] * 1000), "Expression too deep"),
+    ],
+)
+def test_parse_errors(source, message):
+    with pytest.raises(ValueError, match=message):
+        parse(source)
+
+
+def test_formulas_up_to_max_depth_evaluate():
+    f = compile_expression("+".join(["x"] * MAX_DEPTH))
+    hist = History()
+    assert f(x=1) == MAX_DEPTH and f.evaluate({"x": 1}, history=hist) == MAX_DEPTH
+    assert len(hist) == MAX_DEPTH - 1
+
+
+def test_constant_errors_are_deferred_to_evaluation():
+    f = compile_expression("x + 1 / 0")
+    with pytest.raises(ValueError, match="divide by zero"):
+        f(x=1)
+    with pytest.raises(ValueError):
+        compile_expression("2 root -4")()
+
+
+def test_constant_folding_skips_operation_calls():
+    calls = []
+
+    class CountingAdd(Operation):  # pylint: disable=too-few-public-methods
+        def apply(self, a: float, b: float) -> float:
+            calls.append((a, b))
+            return a + b
+
+    CalculationFactory.register("plus", CountingAdd)
+    try:
+        f = compile_expression("x plus (1 plus 2)")
+        assert calls == [(1, 2)]
+        assert [f(x=x) for x in range(3)] == [3, 4, 5]
+        assert len(calls) == 4
+        # custom operations default to multiplicative precedence
+        assert compile_expression("1 + 2 plus 3 * 2")() == 11
+    finally:
+        CalculationFactory.unregister("plus")
+
+
+def test_evaluate_records_history():
+    hist = History()
+    f = compile_expression("-(a + 1) * 2 ^ b")
+    assert f.evaluate({"a": 2.0, "b": 3.0}, history=hist) == -24
+    assert hist.to_strings() == [
+        "2.0 + 1.0 = 3.0",
+        "2.0 ^ 3.0 = 8.0",
+        "-3.0 * 8.0 = -24.0",
+    ]
+
+
+def test_repl_eval(monkeypatch, capsys):
+    monkeypatch.delenv("HISTORY_CSV_PATH", raising=False)
+    monkeypatch.delenv("AUTO_SAVE", raising=False)
+    run_session(["+", "5", "5", "eval (1 + 2) * 3", "history", "undo", "history", "exit"])
+    out = capsys.readouterr().out
+    assert "(1 + 2) * 3 = 9.0" in out
+    assert out.count("1.0 + 2.0 = 3.0") == 1 and out.count("3.0 * 3.0 = 9.0") == 1
+    assert out.count("5.0 + 5.0 = 10.0") == 3  # both steps were one undo step
+
+
+def test_repl_eval_error(monkeypatch, capsys):
+    monkeypatch.delenv("HISTORY_CSV_PATH", raising=False)
+    chain = "+".join(["1"] * 1000)
+    run_session(["eval 1 / (2 - 2)", "eval x + 1", "eval 2²", "eval " + chain, "history", "exit"])
+    out = capsys.readouterr().out
+    assert "Error: Expression too deep" in out
+    assert "Error: " in out
+    assert "Undefined variable: x" in out
+    assert "Error: Unexpected character '²'" in out
+    assert "(no history yet)" in out
+
+
+def test_repl_eval_journal(monkeypatch, tmp_path, capsys):
+    path = str(tmp_path / "h.csv")
+    monkeypatch.setenv("HISTORY_CSV_PATH", path)
+    monkeypatch.setenv("AUTO_SAVE", "1")
+    monkeypatch.setenv("AUTO_SAVE_MODE", "journal")
+    run_session(["eval 2 * 3 + 1", "exit"])
+    run_session(["history", "exit"])
+    out = capsys.readouterr().out
+    assert "2.0 * 3.0 = 6.0" in out and "6.0 + 1.0 = 7.0" in out
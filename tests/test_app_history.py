@@ -1,10 +1,22 @@
 import importlib
+import math
 import os
 
 import pytest
 
 from app.calculation import Calculation, CalculationFactory, History
-from app.operation import AddOperation
+from app.operation import AddOperation, DivideOperation
+
+
+class CountingAdd(AddOperation):  # pylint: disable=too-few-public-methods
+    """AddOperation that counts how often it is executed."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def apply(self, a: float, b: float) -> float:
+        self.calls += 1
+        return super().apply(a, b)
 
 
 def test_history_observer_called():
@@ -21,6 +33,38 @@ def test_history_observer_called():
     hist.unregister_observer(obs)
 
 
+def test_history_add_uses_precomputed_result():
+    hist = History()
+    seen = []
+    hist.register_observer(lambda calc, result: seen.append(result))
+    op = CountingAdd()
+    hist.add(Calculation(op, 1, 2), 3.0)
+    assert op.calls == 0
+    assert seen == [3.0]
+    assert hist.to_strings() == ["1 + 2 = 3.0"]
+    assert hist.entries() == [History.Entry(Calculation(op, 1, 2), 3.0)]
+    assert op.calls == 0
+
+
+def test_history_add_computes_result_once():
+    hist = History()
+    op = CountingAdd()
+    hist.add(Calculation(op, 2, 2))
+    hist.to_strings()
+    hist.all()
+    assert op.calls == 1
+    assert hist.entries()[0].result == 4
+
+
+def test_history_add_failed_calculation_not_notified():
+    hist = History()
+    seen = []
+    hist.register_observer(lambda calc, result: seen.append(result))
+    hist.add(Calculation(DivideOperation(), 1, 0))
+    assert not seen
+    assert math.isnan(hist.entries()[0].result)
+
+
 def test_history_memento_undo_redo():
     hist = History()
     ct = History.Caretaker()
@@ -48,6 +92,67 @@ def test_history_memento_undo_redo():
     assert ct.redo(hist) is False
 
 
+def test_history_undo_then_add_keeps_redo_snapshots_intact():
+    hist = History()
+    ct = History.Caretaker()
+    ct.record(hist)
+    for i in range(3):
+        hist.add(Calculation(AddOperation(), i, i))
+        ct.record(hist)
+    full = hist.create_memento()
+    assert ct.undo(hist) is True
+    hist.add(Calculation(AddOperation(), 9, 9))
+    ct.record(hist)
+    assert [c.a for c in hist.all()] == [0, 1, 9]
+    assert ct.redo(hist) is False  # new branch discards redo
+    hist.restore_memento(full)
+    assert [c.a for c in hist.all()] == [0, 1, 2]
+    assert hist.last().a == 2
+    assert len(hist) == 3
+
+
+def test_history_clear_undo_restores_entries():
+    hist = History()
+    ct = History.Caretaker()
+    hist.add(Calculation(AddOperation(), 1, 1))
+    ct.record(hist)
+    hist.clear()
+    ct.record(hist)
+    assert not hist.all()
+    assert ct.undo(hist) is True
+    assert hist.to_strings() == ["1 + 1 = 2"]
+
+
+def test_history_memento_shares_storage():
+    hist = History()
+    hist.add(Calculation(AddOperation(), 1, 1))
+    m1 = hist.create_memento()
+    hist.add(Calculation(AddOperation(), 2, 2))
+    m2 = hist.create_memento()
+    assert m1.store is m2.store
+    assert (m1.size, m2.size) == (1, 2)
+
+
+def test_caretaker_max_depth():
+    hist = History()
+    ct = History.Caretaker(max_depth=2)
+    ct.record(hist)
+    for i in range(5):
+        hist.add(Calculation(AddOperation(), i, i))
+        ct.record(hist)
+    assert ct.undo(hist) is True
+    assert ct.undo(hist) is True
+    assert ct.undo(hist) is False
+    assert len(hist) == 3
+    assert ct.redo(hist) is True
+    assert len(hist) == 4
+
+
+def test_caretaker_rejects_negative_depth():
+    with pytest.raises(ValueError):
+        History.Caretaker(max_depth=-1)
+
+
 # pylint: disable=duplicate-code
 def _has_pandas():
     try:
@@ -71,3 +176,88 @@ def test_history_pandas_save_load_roundtrip(tmp_path):
     strings = loaded.to_strings()
     assert len(strings) == 2
     assert strings[0].startswith("1.0 + 2.0 = 3.0")
+
+
+@pytest.mark.skipif(not _has_pandas(), reason="pandas not installed")
+def test_history_dataframe_and_load_use_stored_results(tmp_path):
+    hist = History()
+    op = CountingAdd()
+    hist.add(Calculation(op, 1, 2), 3.0)
+    df = hist.to_dataframe()
+    assert list(df["result"]) == [3.0]
+    assert op.calls == 0
+
+    csv_path = os.path.join(tmp_path, "hist.csv")
+    df.assign(result=[42.0]).to_csv(csv_path, index=False)
+    loaded = History.load_csv(csv_path)
+    # the stored result column is trusted rather than recomputed
+    assert loaded.entries()[0].result == 42.0
+
+
+@pytest.mark.parametrize("backend", ["list", "columnar"])
+def test_history_add_many_notifies_once(backend):
+    hist = History(backend)
+    ct = History.Caretaker()
+    ct.record(hist)
+    hist.add(CalculationFactory.from_symbol("+", 9.0, 9.0))
+    ct.record(hist)
+    ct.undo(hist)  # next bulk insert must fork the store
+    per_row, bulk = [], []
+    hist.register_observer(lambda calc, result: per_row.append(result))
+    hist.register_bulk_observer(lambda h, count: bulk.append((h, count)))
+    ops = [CalculationFactory.operation("+"), CalculationFactory.operation("*")]
+    hist.add_many(ops, [0, 1, 0], [1.0, 2.0, 3.0], [1.0, 5.0, 3.0], [2.0, 10.0, 6.0])
+    hist.add_many(ops, [], [], [], [])
+    assert not per_row
+    assert bulk == [(hist, 3)]
+    assert hist.to_strings() == ["1.0 + 1.0 = 2.0", "2.0 * 5.0 = 10.0", "3.0 + 3.0 = 6.0"]
+    ct.redo(hist)
+    assert hist.to_strings() == ["9.0 + 9.0 = 18.0"]
+
+
+@pytest.mark.skipif(not _has_pandas(), reason="pandas not installed")
+def test_history_load_csv_rejects_unknown_ops(tmp_path):
+    path = tmp_path / "bad.csv"
+    path.write_text("a,op,b,result\n1,+,2,3\n1,%,2,1\n1,?,1,1\n")
+    with pytest.raises(ValueError, match="%, \\?"):
+        History.load_csv(str(path))
+
+
+@pytest.mark.skipif(not _has_pandas(), reason="pandas not installed")
+def test_history_load_csv_verify(tmp_path):
+    path = tmp_path / "h.csv"
+    path.write_text("a,op,b,result\n1,+,2,3\n1,/,0,nan\n2,root,9,3\n")
+    assert len(History.load_csv(str(path), verify=True)) == 3
+    path.write_text("a,op,b,result\n1,+,2,3\n1,+,2,4\n")
+    assert History.load_csv(str(path)).entries()[1].result == 4  # trusted
+    with pytest.raises(ValueError, match="1 row\\(s\\).*row 1"):
+        History.load_csv(str(path), verify=True)
+
+
+def test_history_iter_strings_slices_lazily():
+    hist = History()
+    for i in range(5):
+        hist.add(Calculation(AddOperation(), i, 1))
+    lines = hist.iter_strings(1, 3)
+    assert not isinstance(lines, list)
+    assert list(lines) == ["1 + 1 = 2", "2 + 1 = 3"]
+    assert list(hist.iter_strings(-2)) == ["3 + 1 = 4", "4 + 1 = 5"]
+    assert not list(hist.iter_strings(4, 2))
+    assert len(list(hist.iter_strings(0, 100))) == 5
+
+
+def test_history_iter_strings_reads_only_selected_rows(monkeypatch):
+    hist = History("columnar")
+    for i in range(1000):
+        hist.add(Calculation(AddOperation(), i, 1))
+    store_cls = type(hist._store)  # pylint: disable=protected-access
+    original = store_cls.entry
+    read = []
+
+    def counting_entry(self, index):
+        read.append(index)
+        return original(self, index)
+
+    monkeypatch.setattr(store_cls, "entry", counting_entry)
+    assert list(hist.iter_strings(-2)) == ["998.0 + 1.0 = 999.0", "999.0 + 1.0 = 1000.0"]
+    assert read == [998, 999]
@@ -0,0 +1,135 @@
+import os
+
+import pytest
+
+from app import instrumentation
+from app.calculation import Calculation, CalculationFactory, History
+from .utils import run_session, has_pandas
+
+
+@pytest.fixture(name="metrics")
+def fixture_metrics():
+    """Instrumentation enabled for one test, then disabled and cleared."""
+    instrumentation.reset()
+    instrumentation.enable()
+    yield instrumentation
+    instrumentation.disable()
+    instrumentation.reset()
+    instrumentation.stop_profile()
+
+
+def test_disabled_runs_the_original_methods():
+    original = Calculation.__dict__["execute"]
+    instrumentation.configure(True)
+    instrumentation.configure(True)  # idempotent
+    assert instrumentation.is_enabled()
+    assert Calculation.__dict__["execute"] is not original
+    instrumentation.configure(False)
+    assert not instrumentation.is_enabled()
+    assert Calculation.__dict__["execute"] is original
+    assert isinstance(History.__dict__["load"], classmethod)
+
+
+def test_execute_latency_per_operation(metrics):
+    CalculationFactory.from_symbol("+", 1.0, 2.0).execute()
+    CalculationFactory.from_symbol("+", 3.0, 4.0).execute()
+    with pytest.raises(ValueError):
+        CalculationFactory.from_symbol("/", 1.0, 0.0).execute()
+    plus, div = metrics.timers["execute[+]"], metrics.timers["execute[/]"]
+    assert (plus.count, div.count) == (2, 1)
+    assert 0 < plus.maximum <= plus.total and plus.mean == plus.total / 2
+    assert all(v > 0 for v in plus.percentiles().values())
+
+
+def test_observer_dispatch_and_caretaker(metrics):
+    hist = History()
+    caretaker = History.Caretaker()
+    caretaker.record(hist)
+    hist.add(CalculationFactory.from_symbol("*", 2.0, 3.0))
+    assert "history.observers" not in metrics.timers  # nothing to dispatch
+    seen = []
+    hist.register_observer(lambda calc, result: seen.append(result))
+    hist.add(CalculationFactory.from_symbol("*", 2.0, 4.0))
+    caretaker.record(hist)
+    assert caretaker.undo(hist) and caretaker.redo(hist)
+    assert seen == [8.0]
+    counts = {name: timer.count for name, timer in metrics.timers.items()}
+    assert counts["history.observers"] == 1
+    assert (counts["caretaker.record"], counts["caretaker.undo"], counts["caretaker.redo"]) == (
+        2, 1, 1
+    )
+
+
+@pytest.mark.skipif(not has_pandas(), reason="pandas not installed")
+def test_save_and_load_record_duration_and_bytes(metrics, tmp_path):
+    class MyHistory(History):
+        pass
+
+    hist = History()
+    hist.add(CalculationFactory.from_symbol("+", 1.0, 2.0))
+    path = str(tmp_path / "h.csv")
+    hist.save(path)
+    loaded = MyHistory.load(path)
+    assert isinstance(loaded, MyHistory) and len(loaded) == 1
+    size = os.path.getsize(path)
+    assert metrics.counters == {"history.save.bytes": size, "history.load.bytes": size}
+    assert metrics.timers["history.save"].count == metrics.timers["history.load"].count == 1
+    with pytest.raises(OSError):
+        History.load(str(tmp_path / "missing.csv"))
+    assert metrics.counters["history.load.bytes"] == size
+    assert metrics.timers["history.load"].count == 2
+
+
+def test_report_lines(metrics):
+    assert not metrics.report()
+    CalculationFactory.from_symbol("-", 1.0, 2.0).execute()
+    metrics.counters["history.save.bytes"] = 10
+    lines = metrics.report()
+    assert lines[0].startswith("execute[-]: n=1 total=") and "p99=" in lines[0]
+    assert lines[1] == "history.save.bytes: 10 bytes"
+
+
+def test_profile_dump_and_stop(tmp_path):
+    with pytest.raises(ValueError, match="not active"):
+        instrumentation.dump_profile()
+    assert instrumentation.stop_profile() is None
+    path = str(tmp_path / "session.pstats")
+    instrumentation.start_profile(path)
+    try:
+        assert instrumentation.profiling()
+        CalculationFactory.from_symbol("root", 2.0, 9.0).execute()
+        early = str(tmp_path / "early.pstats")
+        summary = instrumentation.dump_profile(early)
+        assert summary.startswith(f"Profile written to {early}") and os.path.exists(early)
+        assert instrumentation.profiling()
+    finally:
+        assert instrumentation.stop_profile() == path
+    assert os.path.exists(path) and not instrumentation.profiling()
+
+
+def test_repl_metrics_command(monkeypatch, capsys, tmp_path):
+    monkeypatch.delenv("HISTORY_CSV_PATH", raising=False)
+    run_session(["metrics", "exit"])
+    assert "Instrumentation disabled" in capsys.readouterr().out
+
+    profile = str(tmp_path / "repl.pstats")
+    monkeypatch.setenv("INSTRUMENTATION", "1")
+    monkeypatch.setenv("PROFILE_PATH", profile)
+    try:
+        run_session(
+            ["metrics", "+", "1", "2", "metrics", "metrics bogus", "metrics profile",
+             "metrics reset", "exit"]
+        )
+    finally:
+        instrumentation.disable()
+        instrumentation.reset()
+    out = capsys.readouterr().out
+    assert "(no metrics yet)" in out
+    assert "execute[+]: n=1" in out and "caretaker.record: n=1" in out
+    assert "Usage: metrics" in out and "Metrics reset." in out
+    assert out.count(f"Profile written to {profile}") == 2
+    assert os.path.exists(profile)
+
+    monkeypatch.delenv("PROFILE_PATH")
+    run_session(["metrics profile", "exit"])
+    assert "Error: Profiling is not active" in capsys.readouterr().out
@@ -0,0 +1,207 @@
+import pytest
+
+from app.calculation import CalculationFactory, History, HistoryJournal
+from app.calculation import journal as journal_module
+from app.calculation.history import format_entry
+from app.config import load_settings
+from .utils import run_session, has_pandas
+
+pytestmark = pytest.mark.skipif(not has_pandas(), reason="pandas not installed")
+
+
+def _add(hist, journal, symbol, a, b):
+    calc = CalculationFactory.from_symbol(symbol, a, b)
+    result = calc.execute()
+    hist.add(calc, result)
+    journal.record(hist, calc, result)
+
+
+def test_journal_appends_rows_without_rewriting_snapshot(tmp_path):
+    snap = tmp_path / "h.csv"
+    journal = HistoryJournal(str(snap), compact_every=0)
+    hist = journal.load()
+    _add(hist, journal, "+", 1, 2)
+    _add(hist, journal, "*", 3, 4)
+    journal.close()
+
+    assert snap.read_text().strip() == "a,op,b,result"  # snapshot untouched
+    lines = (tmp_path / "h.csv.journal").read_text().splitlines()
+    assert lines == ["#base,0", "1,+,2,3", "3,*,4,12"]
+
+    reloaded = HistoryJournal(str(snap)).load()
+    assert reloaded.to_strings() == ["1.0 + 2.0 = 3.0", "3.0 * 4.0 = 12.0"]
+
+
+def test_journal_compacts_into_snapshot(tmp_path):
+    snap = tmp_path / "h.csv"
+    journal = HistoryJournal(str(snap), fsync_every=0, compact_every=2)
+    hist = History()
+    _add(hist, journal, "+", 1, 1)
+    _add(hist, journal, "+", 2, 2)  # triggers compaction
+    _add(hist, journal, "+", 3, 3)
+    journal.close()
+
+    assert len(History.load_csv(str(snap)).all()) == 2
+    assert (tmp_path / "h.csv.journal").read_text().splitlines() == ["#base,2", "3,+,3,6"]
+    assert len(HistoryJournal(str(snap)).load().all()) == 3
+
+
+def test_journal_stale_base_and_torn_rows_are_skipped(tmp_path):
+    snap = tmp_path / "h.csv"
+    hist = History()
+    hist.add(CalculationFactory.from_symbol("+", 1, 1))
+    hist.save_csv(str(snap))
+    journal_path = tmp_path / "h.csv.journal"
+
+    # Journal from before a compaction that already reached the snapshot
+    journal_path.write_text("#base,0\n1,+,1,2\n")
+    assert HistoryJournal(str(snap)).replay(History.load_csv(str(snap))) == 0
+
+    # Header-less journal with a torn final line
+    journal_path.write_text("2,+,2,4\n3,+\n")
+    loaded = History.load_csv(str(snap))
+    assert HistoryJournal(str(snap)).replay(loaded) == 1
+    assert len(loaded.all()) == 2
+
+
+def test_journal_replay_skips_bad_rows_and_torn_tail(tmp_path):
+    snap = tmp_path / "h.csv"
+    journal_path = tmp_path / "h.csv.journal"
+    journal = HistoryJournal(str(snap))
+    journal_path.write_text("#base,0\n1,+,1,2\n4,+,5,x\n2,%,2,4\n\n2,+,2,4\n3,+,3,6")
+    hist = History()
+    assert journal.replay(hist) == 2
+    assert journal.skipped == 3
+    assert hist.to_strings() == ["1.0 + 1.0 = 2.0", "2.0 + 2.0 = 4.0"]
+
+    for torn in ("3,+,3,", "3,+,3,6"):  # cut from "3,+,3,6.5\n": never replayed as NaN/6
+        journal_path.write_text(f"#base,0\n1,+,1,2\r\n{torn}")
+        hist = History()
+        assert journal.replay(hist) == 1 and journal.skipped == 0
+
+    for header in ("#base,", "#base,0"):  # a torn header: the journal is stale
+        journal_path.write_text(header)
+        assert journal.replay(History()) == 0
+
+
+def test_unreadable_snapshot_is_never_compacted_over(tmp_path):
+    snap = tmp_path / "h.csv"
+    snap.write_text("a,op,b,result\n1,+,1,x\n")
+    journal = HistoryJournal(str(snap))
+    with pytest.raises(ValueError):
+        journal.load()
+    assert "could not convert" in journal.snapshot_error
+    hist = History()
+    _add(hist, journal, "+", 2, 2)  # appended to the journal only
+    with pytest.raises(ValueError, match="Not overwriting unreadable snapshot"):
+        journal.compact(hist)
+    journal.close()
+    assert snap.read_text() == "a,op,b,result\n1,+,1,x\n"
+    assert (tmp_path / "h.csv.journal").read_text().splitlines()[-1] == "2,+,2,4"
+
+
+def test_repl_keeps_unreadable_snapshot(tmp_path, monkeypatch, capsys):
+    snap = tmp_path / "auto.csv"
+    snap.write_text("a,op,b,result\n1,+,1,x\n")
+    monkeypatch.setenv("AUTO_SAVE", "1")
+    monkeypatch.setenv("AUTO_SAVE_MODE", "journal")
+    monkeypatch.setenv("JOURNAL_COMPACT_EVERY", "1")
+    monkeypatch.setenv("HISTORY_CSV_PATH", str(snap))
+    run_session(["+", "1", "2", "clear", "undo", "exit"])
+    out = capsys.readouterr().out
+    assert f"Could not load {snap}" in out
+    assert snap.read_text() == "a,op,b,result\n1,+,1,x\n"
+
+    snap.write_text("a,op,b,result\n")  # repaired: the journaled row is replayed
+    (tmp_path / "auto.csv.journal").write_text("1,+,2,3\n1,+,2,x\n")
+    run_session(["history", "exit"])
+    out = capsys.readouterr().out
+    assert "Skipped 1 unreadable journal row(s)" in out
+    assert "1.0 + 2.0 = 3.0" in out
+
+
+def test_journal_replay_without_file(tmp_path):
+    journal = HistoryJournal(str(tmp_path / "h.csv"), journal_path=str(tmp_path / "j"))
+    assert journal.replay(History()) == 0
+    journal.flush()  # nothing open: no-op
+
+
+def test_journal_follow_yields_rows_other_sessions_append(tmp_path, monkeypatch):
+    snap = tmp_path / "h.csv"
+    path = tmp_path / "h.csv.journal"
+    writer, hist = HistoryJournal(str(snap), compact_every=0), History()
+
+    def append_text(text):
+        with open(path, "a", encoding="utf-8") as fh:
+            fh.write(text)
+
+    steps = [
+        lambda: _add(hist, writer, "+", 1, 2),  # creates the journal, without a header
+        lambda: append_text("4,*,"),  # torn: read once the line is complete
+        lambda: append_text("5,20\nnot,a,row\n"),
+        lambda: (writer.compact(hist), _add(hist, writer, "-", 9, 4)),  # a new journal
+        # "/" is compacted into the snapshot before it is read: taken from there
+        lambda: (
+            _add(hist, writer, "/", 8, 2), writer.compact(hist), _add(hist, writer, "^", 2, 3)
+        ),
+        lambda: (writer.compact(hist), _add(hist, writer, "-", 1, 1)),  # nothing missed
+    ]
+    monkeypatch.setattr(journal_module.time, "sleep", lambda seconds: steps.pop(0)())
+    follower = HistoryJournal(str(snap)).follow(interval=0)  # before the journal exists
+    assert [format_entry(next(follower)) for _ in range(6)] == [
+        "1.0 + 2.0 = 3.0", "4.0 * 5.0 = 20.0", "9.0 - 4.0 = 5.0",
+        "8.0 / 2.0 = 4.0", "2.0 ^ 3.0 = 8.0", "1.0 - 1.0 = 0.0",
+    ]
+    assert not steps
+    writer.close()
+
+
+def test_repl_history_tail_follows_the_journal(tmp_path, monkeypatch, capsys):
+    for name in ("AUTO_SAVE", "AUTO_SAVE_MODE", "HISTORY_CSV_PATH"):
+        monkeypatch.delenv(name, raising=False)
+    run_session(["history tail -f", "exit"])
+    assert "AUTO_SAVE_MODE=journal" in capsys.readouterr().out
+
+    csv_path = tmp_path / "auto.csv"
+    monkeypatch.setenv("AUTO_SAVE", "1")
+    monkeypatch.setenv("AUTO_SAVE_MODE", "journal")
+    monkeypatch.setenv("HISTORY_CSV_PATH", str(csv_path))
+    other = HistoryJournal(str(csv_path))  # another session sharing the journal
+
+    def interrupt():
+        raise KeyboardInterrupt
+
+    steps = [lambda: other.append(CalculationFactory.from_symbol("*", 6.0, 7.0), 42.0), interrupt]
+    monkeypatch.setattr(journal_module.time, "sleep", lambda seconds: steps.pop(0)())
+    run_session(["+", "1", "2", "history tail -f", "+", "2", "2", "exit"])
+    out = capsys.readouterr().out
+    following = out.index("Following the journal")
+    assert out.index("1.0 + 2.0 = 3.0") < following < out.index("6.0 * 7.0 = 42.0")
+    assert "2.0 + 2.0 = 4.0" in out and not steps  # back at the prompt after Ctrl+C
+    other.close()
+
+
+def test_load_settings_journal(monkeypatch):
+    monkeypatch.setenv("AUTO_SAVE_MODE", "Journal")
+    monkeypatch.setenv("JOURNAL_FSYNC_EVERY", "10")
+    monkeypatch.setenv("JOURNAL_COMPACT_EVERY", "")
+    s = load_settings()
+    assert s.auto_save_mode == "journal"
+    assert s.journal_fsync_every == 10
+    assert s.journal_compact_every == 1000
+
+
+def test_repl_journal_mode_persists_across_sessions(tmp_path, monkeypatch, capsys):
+    csv_path = tmp_path / "auto.csv"
+    monkeypatch.setenv("AUTO_SAVE", "1")
+    monkeypatch.setenv("AUTO_SAVE_MODE", "journal")
+    monkeypatch.setenv("HISTORY_CSV_PATH", str(csv_path))
+
+    run_session(["+", "1", "2", "*", "2", "5", "undo", "redo", "undo", "exit"])
+    run_session(["history", f"load {csv_path}", "history", "clear", "exit"])
+    out = capsys.readouterr().out
+    assert out.count("1.0 + 2.0 = 3.0") == 3
+    assert "2.0 * 5.0" not in out.split("Goodbye")[1]
+
+    run_session(["history", "exit"])
+    assert "(no history yet)" in capsys.readouterr().out
@@ -1,4 +1,7 @@
+import io
+
 from app import main as app_main
+from app.config import Settings
 from .utils import run_session
 
 
@@ -66,3 +69,64 @@ def test_outer_keyboardinterrupt(capsys):
         app_main.print_help = original
     out = capsys.readouterr().out
     assert "Goodbye" in out
+
+
+def test_run_stream_reports_errors_per_line():
+    src = io.StringIO("+ 3 4\n\n# comment\n/ 1 0\n+ x 1\n+ 1\nroot 2 9\n")
+    out, err = io.StringIO(), io.StringIO()
+    stats = app_main.run_stream(src, out, err, Settings())
+    assert out.getvalue().splitlines() == ["3.0 + 4.0 = 7.0", "2.0 root 9.0 = 3.0"]
+    errors = err.getvalue().splitlines()
+    assert errors[0] == "line 4: Error: Cannot divide by zero"
+    assert errors[1].startswith("line 5: Error: Invalid number")
+    assert errors[2].startswith("line 6: Error: Expected")
+    assert errors[3].startswith("Processed 5 calculations (3 errors)")
+    assert (stats.ok, stats.errors, stats.calculations) == (2, 3, 5)
+
+
+def test_run_stream_delegates_commands(capsys):
+    src = ["+ 1 2", "history", "foo 1 2", "exit", "+ 5 5"]
+    out, err = io.StringIO(), io.StringIO()
+    stats = app_main.run_stream(src, out, err, Settings(), record=True)
+    assert not capsys.readouterr().out
+    assert out.getvalue() == "1.0 + 2.0 = 3.0\n"  # stream stopped at exit
+    notes = err.getvalue()
+    assert notes.startswith("1.0 + 2.0 = 3.0\n") and "Goodbye" in notes  # history, exit
+    assert "line 3: Error: Unknown command/operation: foo 1 2" in notes
+    assert (stats.ok, stats.errors) == (1, 1)
+
+
+def test_main_batch_from_file_and_stdin(tmp_path, capsys, monkeypatch):
+    path = tmp_path / "calcs.txt"
+    path.write_text("* 2 3\n")
+    app_main.main(["--batch", str(path)])
+    captured = capsys.readouterr()
+    assert captured.out == "2.0 * 3.0 = 6.0\n"
+    assert "Processed 1 calculations" in captured.err
+
+    monkeypatch.setattr("sys.stdin", io.StringIO("- 5 2\n"))
+    app_main.main(["--batch", "-"])
+    assert capsys.readouterr().out == "5.0 - 2.0 = 3.0\n"
+
+
+def _history_lines(out):
+    return [line for line in out.splitlines() if " + " in line and "=" in line]
+
+
+def test_history_last_n_range_and_tail(monkeypatch, capsys):
+    monkeypatch.delenv("HISTORY_CSV_PATH", raising=False)
+    inputs = []
+    for i in range(12):
+        inputs += ["+", str(i), "0"]
+    run_session(inputs + ["history 2", "history 3:5", "history -2:", "history tail", "exit"])
+    lines = _history_lines(capsys.readouterr().out)[12:]
+    assert lines[:2] == ["10.0 + 0.0 = 10.0", "11.0 + 0.0 = 11.0"]
+    assert lines[2:4] == ["3.0 + 0.0 = 3.0", "4.0 + 0.0 = 4.0"]
+    assert lines[4:6] == lines[:2]
+    assert lines[6:] == [f"{i}.0 + 0.0 = {i}.0" for i in range(2, 12)]
+
+
+def test_history_usage_errors(capsys):
+    run_session(["history x", "history -3", "history 1:y", "history tail -x",
+                 "history tail -f -x", "exit"])
+    assert capsys.readouterr().out.count("Usage: history") == 5
@@ -0,0 +1,286 @@
+import io
+import math
+import os
+import threading
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from app import numeric
+from app.calculation import CalculationFactory, History, HistoryJournal
+from app.config import load_settings
+from app.expression import compile_expression
+from app.main import main
+from .utils import run_session, has_pandas
+
+
+@pytest.fixture(name="backend")
+def fixture_backend():
+    """Switch the numeric backend for one test, then restore float."""
+
+    def use(name, precision=28):
+        numeric.configure(name, precision)
+
+    yield use
+    numeric.configure()
+
+
+def _run(symbol, a, b):
+    return CalculationFactory.from_symbol(symbol, a, b).execute()
+
+
+def test_parse_number_per_backend(backend):
+    assert numeric.parse_number(" 0.1 ") == 0.1
+    backend("decimal")
+    assert numeric.parse_number("0.1") == Decimal("0.1")
+    backend("fraction")
+    assert numeric.parse_number("1/3") == Fraction(1, 3)
+    assert numeric.parse_number("2.5e2") == 250
+    with pytest.raises(ValueError):
+        numeric.parse_number("1e999999999")
+    with pytest.raises(ValueError):
+        numeric.parse_number("1/0")
+    assert math.isnan(numeric.parse_stored("")) and math.isnan(numeric.parse_stored("nan"))
+    backend("decimal")
+    with pytest.raises(ValueError):
+        numeric.parse_number("abc")
+
+
+def test_configure_validation():
+    with pytest.raises(ValueError):
+        numeric.configure("bigfloat")
+    with pytest.raises(ValueError):
+        numeric.configure("decimal", 0)
+
+
+def test_decimal_basic_operations_are_exact(backend):
+    backend("decimal")
+    a, b = Decimal("0.1"), Decimal("0.2")
+    assert _run("+", a, b) == Decimal("0.3")
+    assert _run("-", a, b) == Decimal("-0.1")
+    assert _run("*", a, b) == Decimal("0.02")
+    assert _run("/", Decimal(1), Decimal(8)) == Decimal("0.125")
+    with pytest.raises(ValueError):
+        _run("/", a, Decimal(0))
+
+
+@pytest.mark.parametrize(
+    "symbol, a, b, expected",
+    [
+        ("root", "2", "2", "1.41421356237309504880168872420969807857"),
+        ("root", "3", "27", "3"),
+        ("root", "2", "2.25", "1.5"),
+        ("root", "3", "-8", "-2"),
+        ("root", "0.5", "3", "9"),
+        ("root", "-2", "4", "0.5"),
+        ("root", "2", "1e400", "1E+200"),
+        ("^", "2", "10", "1024"),
+        ("^", "-2", "3", "-8"),
+        ("^", "2", "-2", "0.25"),
+        ("^", "4", "0.5", "2"),
+        ("^", "2", "0.5", "1.41421356237309504880168872420969807857"),
+    ],
+)
+def test_decimal_power_and_root(backend, symbol, a, b, expected):
+    backend("decimal", 40)
+    result = _run(symbol, Decimal(a), Decimal(b))
+    assert isinstance(result, Decimal)
+    assert abs(result - Decimal(expected)) <= abs(Decimal(expected)) * Decimal("1e-35")
+    assert str(result) == expected or len(str(result)) > 30
+
+
+@pytest.mark.parametrize(
+    "symbol, a, b, expected",
+    [
+        ("root", 3, Fraction(27, 8), Fraction(3, 2)),
+        ("root", 2, Fraction(1, 4), Fraction(1, 2)),
+        ("root", -3, -8, Fraction(-1, 2)),
+        ("^", Fraction(2, 3), 3, Fraction(8, 27)),
+        ("^", 8, Fraction(-2, 3), Fraction(1, 4)),
+        ("^", -2, 3, -8),
+        ("/", 1, 3, Fraction(1, 3)),
+    ],
+)
+def test_fraction_results_are_exact(backend, symbol, a, b, expected):
+    backend("fraction")
+    assert _run(symbol, Fraction(a), Fraction(b)) == expected
+
+
+def test_fraction_irrational_root_uses_precision(backend):
+    backend("fraction", 30)
+    result = _run("root", Fraction(2), Fraction(2))
+    assert result.denominator == 10**30
+    assert result**2 < 2 < (result + Fraction(1, 10**30)) ** 2
+
+
+def test_fraction_roots_of_high_degree_finish_quickly(backend):
+    backend("fraction")
+    cases = [(2, "0.3333"), (2**70000 + 1, "1/2"), (3**50000, "1/2")]
+    results = []
+    worker = threading.Thread(
+        target=lambda: results.extend(_run("^", Fraction(a), Fraction(b)) for a, b in cases),
+        daemon=True,
+    )
+    worker.start()
+    worker.join(timeout=10)
+    assert not worker.is_alive(), "x ** 0.3333 must not build a 10000th-power integer"
+    cube_ish, big_root, exact = results  # pylint: disable=unbalanced-tuple-unpacking
+    assert 10**28 % cube_ish.denominator == 0
+    assert float(cube_ish) == pytest.approx(2**0.3333, rel=1e-15)
+    assert big_root**2 <= 2**70000 + 1 < (big_root + Fraction(1, 10**28)) ** 2
+    assert exact == 3**25000
+
+
+@pytest.mark.parametrize(
+    "symbol, a, b, message",
+    [
+        ("root", 2, -4, "Even root"),
+        ("root", Fraction(1, 2), -4, "Fractional root"),
+        ("root", 0, 1, "cannot be zero"),
+        ("root", 10**6, 2, "too large"),
+        ("^", 0, -1, "negative power"),
+        ("^", -8, Fraction(1, 3), "not real"),
+        ("^", 2, 10**6, "too large"),
+        ("^", 2**1000, 5000, "too large"),
+    ],
+)
+def test_exact_errors(backend, symbol, a, b, message):
+    backend("fraction")
+    with pytest.raises(ValueError, match=message):
+        _run(symbol, Fraction(a), Fraction(b))
+
+
+def test_decimal_errors_become_value_errors(backend):
+    backend("decimal")
+    with pytest.raises(ValueError, match="Overflow"):
+        _run("^", Decimal(10), Decimal("1e999999999"))
+    with pytest.raises(ValueError, match="negative power"):
+        _run("root", Decimal(-1), Decimal(0))
+    assert _run("root", Decimal(2), Decimal(0)) == 0
+    assert _run("root", Decimal(3), Decimal("1e-400")) > 0
+    x, y = Decimal("1.0001"), Decimal("123.456789")
+    assert _run("^", x, y) == x**y  # exponent too precise for a root: Decimal's power
+    assert _run("^", Decimal(2), Fraction(1, 2)) == _run("^", Decimal(2), Decimal("0.5"))
+
+
+DECIMAL_SIGNALS = [
+    ("+", "9e999999", "9e999999", "Overflow"),
+    ("-", "-9e999999", "9e999999", "Overflow"),
+    ("*", "1e600000", "1e600000", "Overflow"),
+    ("/", "9e999999", "1e-999999", "Overflow"),
+    ("+", "inf", "-inf", "InvalidOperation"),
+    ("-", "inf", "inf", "InvalidOperation"),
+    ("*", "0", "inf", "InvalidOperation"),
+    ("/", "inf", "inf", "InvalidOperation"),
+]
+
+
+@pytest.mark.parametrize("symbol, a, b, signal", DECIMAL_SIGNALS)
+def test_decimal_signals_of_every_operation(backend, symbol, a, b, signal):
+    backend("decimal")
+    with pytest.raises(ValueError, match=f"Decimal arithmetic error: {signal}"):
+        _run(symbol, Decimal(a), Decimal(b))
+    with pytest.raises(ValueError, match=signal):
+        compile_expression(f"x {symbol} y")(x=Decimal(a), y=Decimal(b))
+    with pytest.raises(ValueError, match=signal):
+        compile_expression(f"x {symbol} y").evaluate({"x": Decimal(a), "y": Decimal(b)}, History())
+
+
+def test_decimal_signals_in_repl_and_batch(monkeypatch, capsys):
+    monkeypatch.setenv("NUMERIC_BACKEND", "decimal")
+    monkeypatch.delenv("HISTORY_CSV_PATH", raising=False)
+    inputs = [value for symbol, a, b, _ in DECIMAL_SIGNALS for value in (symbol, a, b)]
+    try:
+        run_session(inputs + ["eval 1e600000 * 1e600000", "+", "1", "2", "exit"])
+        out = capsys.readouterr().out
+        errors = [line for line in out.splitlines() if "Decimal arithmetic error" in line]
+        assert len(errors) == len(DECIMAL_SIGNALS) + 1
+        assert "1 + 2 = 3" in out
+        lines = [f"{symbol} {a} {b}\n" for symbol, a, b, _ in DECIMAL_SIGNALS] + ["* 2 3\n"]
+        monkeypatch.setattr("sys.stdin", io.StringIO("".join(lines)))
+        main(["--batch", "-"])
+        captured = capsys.readouterr()
+        assert captured.out == "2 * 3 = 6\n"
+        assert f"({len(DECIMAL_SIGNALS)} errors)" in captured.err
+        assert "line 8: Error: Decimal arithmetic error: InvalidOperation" in captured.err
+    finally:
+        numeric.configure()
+
+
+def test_iroot():
+    assert [numeric.iroot(n, 3) for n in (0, 1, 7, 8, 26, 27, 10**30)] == [0, 1, 1, 2, 2, 3, 10**10]
+
+
+def test_expression_and_history_keep_exact_values(backend):
+    backend("fraction")
+    hist = History()
+    assert compile_expression("1/3 + 1/6").evaluate(history=hist) == Fraction(1, 2)
+    assert hist.to_strings()[-1] == "1/3 + 1/6 = 1/2"
+    assert hist.stats().total == pytest.approx(1 / 3 + 1 / 2 + 1 / 6)
+
+
+@pytest.mark.skipif(not has_pandas(), reason="pandas not installed")
+@pytest.mark.parametrize("name, value", [("decimal", "0.1"), ("fraction", "1/3")])
+def test_csv_roundtrip_keeps_exact_strings(backend, tmp_path, name, value):
+    backend(name)
+    x = numeric.parse_number(value)
+    hist = History()
+    hist.add(CalculationFactory.from_symbol("+", x, x))
+    hist.add(CalculationFactory.from_symbol("/", x, numeric.parse_number("0")))
+    path = os.path.join(tmp_path, "h.csv")
+    hist.save_csv(path)
+    loaded = History.load_csv(path, verify=True)
+    first, failed = loaded.entries()
+    assert first.result == x + x and type(first.result) is type(x)
+    assert math.isnan(failed.result)
+    with open(path, encoding="utf-8") as fh:
+        assert value in fh.read()
+    (tmp_path / "bad.csv").write_text("a,op,b,result\n1,%,2,3\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        History.load_csv(str(tmp_path / "bad.csv"))
+
+
+def test_journal_replays_exact_values(backend, tmp_path):
+    backend("decimal")
+    journal = HistoryJournal(str(tmp_path / "h.csv"), compact_every=0)
+    calc = CalculationFactory.from_symbol("+", Decimal("0.1"), Decimal("0.2"))
+    journal.append(calc, calc.execute())
+    journal.close()
+    hist = History()
+    assert journal.replay(hist) == 1
+    assert hist.entries()[0].result == Decimal("0.3")
+
+
+def test_settings_and_repl(monkeypatch, capsys):
+    monkeypatch.setenv("NUMERIC_BACKEND", "Decimal")
+    monkeypatch.setenv("DECIMAL_PRECISION", "50")
+    monkeypatch.delenv("HISTORY_CSV_PATH", raising=False)
+    settings = load_settings()
+    assert (settings.numeric_backend, settings.decimal_precision) == ("decimal", 50)
+    try:
+        run_session(["+", "0.1", "0.2", "root", "2", "2", "eval 0.1 * 3", "exit"])
+        out = capsys.readouterr().out
+        assert "0.1 + 0.2 = 0.3" in out
+        assert "2 root 2 = 1.4142135623730950488016887242096980785696718753769" in out
+        assert "0.1 * 3 = 0.3" in out
+    finally:
+        numeric.configure()
+
+
+@pytest.mark.parametrize("history_backend", ["list", "columnar"])
+def test_exact_results_beyond_float_range(monkeypatch, capsys, history_backend):
+    monkeypatch.setenv("NUMERIC_BACKEND", "fraction")
+    monkeypatch.setenv("HISTORY_BACKEND", history_backend)
+    monkeypatch.delenv("HISTORY_CSV_PATH", raising=False)
+    inputs = ["^", "10", "400", "*", "-1e400", "1", "find result>1e300", "stats"]
+    try:
+        run_session(inputs + ["+", "1", "2", "stats", "exit"])
+        out = capsys.readouterr().out
+        assert "1 match(es)" in out
+        assert "Calculations: 2 (0 failed" in out and "max=inf" in out and "min=-inf" in out
+        assert "1 + 2 = 3" in out and "Calculations: 3 (0 failed" in out
+    finally:
+        numeric.configure()
+    assert numeric.to_float(Fraction(10**400)) == math.inf
+    assert numeric.to_float(Fraction(-(10**400), 3)) == -math.inf
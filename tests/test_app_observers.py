@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+
+from app.calculation import BackgroundObserver, Calculation, History
+from app.operation import AddOperation
+from .utils import run_session
+
+
+def _calc(a):
+    return Calculation(AddOperation(), float(a), 1.0)
+
+
+def test_async_observer_batches_events_in_order():
+    hist = History()
+    batches = []
+    gate = threading.Event()
+
+    def slow(batch):
+        gate.wait(5)
+        batches.append([result for _, result in batch])
+
+    obs = hist.register_async_observer(slow, batch_size=4)
+    for i in range(10):
+        hist.add(_calc(i))
+    gate.set()
+    assert hist.flush(timeout=5)
+    assert [r for batch in batches for r in batch] == [float(i + 1) for i in range(10)]
+    assert max(len(batch) for batch in batches) <= 4
+    assert obs.delivered == 10 and obs.pending == 0
+
+
+def test_async_observer_does_not_delay_add():
+    hist = History()
+    hist.register_async_observer(lambda batch: time.sleep(0.2))
+    start = time.perf_counter()
+    hist.add(_calc(1))
+    assert time.perf_counter() - start < 0.1
+    assert hist.flush(timeout=5)
+
+
+def _gated(gate, started, seen=None):
+    """Callback that signals ``started`` and then holds its batch until ``gate`` opens."""
+
+    def callback(batch):
+        started.set()
+        gate.wait(5)
+        if seen is not None:
+            seen.extend(r for _, r in batch)
+
+    return callback
+
+
+def test_drop_oldest_policy():
+    gate, started = threading.Event(), threading.Event()
+    seen = []
+    obs = BackgroundObserver(
+        _gated(gate, started, seen), maxsize=2, batch_size=1, policy="drop_oldest"
+    )
+    obs(_calc(0), 0.0)
+    assert started.wait(5)  # worker took event 0 and waits on the gate
+    for i in range(1, 6):
+        obs(_calc(i), float(i))
+    assert obs.dropped == 3
+    gate.set()
+    assert obs.flush(timeout=5)
+    assert seen == [0.0, 4.0, 5.0]
+    obs.close()
+
+
+def test_block_policy_applies_backpressure():
+    gate, started = threading.Event(), threading.Event()
+    obs = BackgroundObserver(_gated(gate, started), maxsize=1, batch_size=1)
+    obs(_calc(0), 0.0)
+    assert started.wait(5)
+    obs(_calc(1), 1.0)  # queue now full
+    producer = threading.Thread(target=obs, args=(_calc(2), 2.0))
+    producer.start()
+    producer.join(0.1)
+    assert producer.is_alive()  # blocked until the worker makes room
+    gate.set()
+    producer.join(5)
+    assert obs.flush(timeout=5) and obs.delivered == 3 and obs.dropped == 0
+    obs.close()
+
+
+def test_failures_are_counted_and_close():
+    hist = History()
+
+    def broken(batch):
+        raise RuntimeError("boom")
+
+    obs = hist.register_async_observer(broken)
+    hist.add(_calc(1))
+    assert hist.flush(timeout=5)
+    assert obs.failures == 1 and obs.delivered == 0
+    hist.unregister_observer(obs)
+    hist.add(_calc(2))  # no longer observed
+    with pytest.raises(ValueError):
+        obs(_calc(3), 4.0)
+    assert hist.flush()
+
+
+def test_flush_timeout():
+    gate = threading.Event()
+    obs = BackgroundObserver(lambda batch: gate.wait(5))
+    obs(_calc(0), 0.0)
+    assert not obs.flush(timeout=0.05)
+    gate.set()
+    obs.close()
+    assert obs.pending == 0
+
+
+@pytest.mark.parametrize("kwargs", [{"policy": "drop_newest"}, {"maxsize": 0}, {"batch_size": 0}])
+def test_invalid_options(kwargs):
+    with pytest.raises(ValueError):
+        BackgroundObserver(lambda batch: None, **kwargs)
+
+
+def test_repl_flushes_history_on_exit(monkeypatch):
+    delivered = []
+    original = History.__init__
+
+    def init(self, *args, **kwargs):
+        original(self, *args, **kwargs)
+        self.register_async_observer(lambda batch: (time.sleep(0.05), delivered.extend(batch)))
+
+    monkeypatch.setattr(History, "__init__", init)
+    monkeypatch.delenv("HISTORY_CSV_PATH", raising=False)
+    run_session(["+", "1", "2", "exit"])
+    assert len(delivered) == 1
@@ -7,6 +7,7 @@ from app.operation import (
     PowerOperation,
     RootOperation,
 )
+from .utils import has_numpy
 
 @pytest.mark.parametrize(
     "op,a,b,expected",
@@ -39,3 +40,52 @@ def test_power_zero_negative():
 def test_root_invalid_cases(degree, radicand):
     with pytest.raises(ValueError):
         RootOperation().apply(degree, radicand)
+
+
+@pytest.mark.skipif(not has_numpy(), reason="numpy not installed")
+@pytest.mark.parametrize(
+    "op",
+    [
+        AddOperation(),
+        SubtractOperation(),
+        MultiplyOperation(),
+        DivideOperation(),
+        PowerOperation(),
+        RootOperation(),
+    ],
+)
+def test_apply_many_matches_scalar(op):
+    a = [2, 5, -6, 3, 0, 0.5, 3, 2, -2, 2.5, -8, 10.0, -10.0, 0.001, -1.0, 1e308, float("inf")]
+    b = [3, 2, 3, 27, -1, 4, -8, -9, 0, -8, 0.5, 400.0, 401.0, 1e10, -1e-320, 10.0, 2.0]
+    values, errors = op.apply_many(a, b)
+    for i, (x, y) in enumerate(zip(a, b)):
+        try:
+            expected = op.apply(x, y)
+        except (ValueError, ZeroDivisionError) as exc:
+            assert errors[i] == str(exc)
+            assert values[i] != values[i]  # NaN
+        else:
+            assert errors[i] is None
+            assert values[i] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize(
+    "op,a,b",
+    [
+        (PowerOperation(), 10.0, 400.0),
+        (PowerOperation(), -10.0, 401.0),
+        (RootOperation(), 0.001, 10.0),
+    ],
+)
+def test_overflow_is_a_value_error(op, a, b):
+    with pytest.raises(ValueError, match="Result too large for a float"):
+        op.apply(a, b)
+
+
+@pytest.mark.skipif(not has_numpy(), reason="numpy not installed")
+def test_apply_many_broadcasts_scalar_operand():
+    values, errors = DivideOperation().apply_many([4, 8, 1], 0)
+    assert list(errors) == ["Cannot divide by zero"] * 3
+    values, errors = DivideOperation().apply_many([4, 8], 2)
+    assert list(values) == [2, 4]
+    assert list(errors) == [None, None]
@@ -0,0 +1,75 @@
+import math
+
+import pytest
+
+from app.calculation import History, evaluate_parallel, parallel
+from app.config import load_settings
+from app.main import _configure
+from app.operation import MultiplyOperation
+
+SYMBOLS = ["+", "/", "root", "*", "/", "-", "^", "^"]
+A = [1.0, 6.0, 2.0, 3.0, 1.0, 5.0, 2.0, -8.0]
+B = [2.0, 3.0, -4.0, 4.0, 0.0, 1.0, 10.0, 0.5]
+EXPECTED = [3.0, 2.0, math.nan, 12.0, math.nan, 4.0, 1024.0, math.nan]
+
+
+def _same(values, expected):
+    return all(
+        (math.isnan(x) and math.isnan(y)) or x == pytest.approx(y)
+        for x, y in zip(values, expected)
+    ) and len(values) == len(expected)
+
+
+@pytest.mark.parametrize("workers, chunk_size", [(1, 3), (1, 100), (2, 2), (0, 3)])
+def test_results_and_errors_keep_input_order(workers, chunk_size):
+    result = evaluate_parallel(SYMBOLS, A, B, workers=workers, chunk_size=chunk_size)
+    assert _same(result.values, EXPECTED)
+    assert [row for row, _ in result.errors] == [2, 4, 7]
+    assert "divide by zero" in result.errors[1][1]
+    assert "not real" in result.errors[2][1]
+    assert result.error_count == 3
+
+
+def test_unexpected_row_errors_are_recorded(monkeypatch):
+    def broken(_self, a, b):
+        raise TypeError
+
+    monkeypatch.setattr(MultiplyOperation, "apply", broken)
+    result = evaluate_parallel(SYMBOLS, A, B, workers=1)
+    assert result.errors[1] == (3, "TypeError")
+    assert _same(result.values, EXPECTED[:3] + [math.nan] + EXPECTED[4:])
+
+
+@pytest.mark.parametrize("backend", ["list", "columnar"])
+def test_merge_into_history(backend):
+    hist = History(backend)
+    seen = []
+    hist.register_bulk_observer(lambda h, count: seen.append(count))
+    evaluate_parallel(SYMBOLS, A, B, workers=2, chunk_size=3, history=hist)
+    assert len(hist) == len(SYMBOLS) and seen == [len(SYMBOLS)]
+    assert hist.to_strings()[0] == "1.0 + 2.0 = 3.0"
+    assert list(hist.column("op")) == SYMBOLS
+    assert _same(hist.column("result"), EXPECTED)
+
+
+def test_empty_and_invalid_input():
+    assert len(evaluate_parallel([], [], []).values) == 0
+    with pytest.raises(ValueError):
+        evaluate_parallel(["+"], [1.0, 2.0], [1.0])
+    with pytest.raises(ValueError):
+        evaluate_parallel(["+", "%"], [1.0, 2.0], [1.0, 2.0])
+
+
+def test_configure_defaults(monkeypatch):
+    monkeypatch.setenv("PARALLEL_WORKERS", "1")
+    monkeypatch.setenv("PARALLEL_CHUNK_SIZE", "2")
+    settings = load_settings()
+    assert (settings.parallel_workers, settings.parallel_chunk_size) == (1, 2)
+    try:
+        _configure(settings)
+        assert parallel._defaults == {"workers": 1, "chunk_size": 2}  # pylint: disable=protected-access
+        assert _same(evaluate_parallel(SYMBOLS, A, B).values, EXPECTED)
+        with pytest.raises(ValueError):
+            parallel.configure(chunk_size=0)
+    finally:
+        parallel.configure()
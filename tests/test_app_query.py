@@ -0,0 +1,126 @@
+import math
+
+import pytest
+
+from app.calculation import Calculation, CalculationFactory, History
+from app.calculation.query import INSORT_MAX, SortedColumn, index_for
+from app.operation import DivideOperation
+from app import main as app_main
+from .utils import run_session
+
+ROWS = [("+", 1, 2), ("/", 8, 2), ("*", 3, 4), ("/", 9e6, 3), ("-", 5, 7), ("/", 1, 4)]
+
+
+def _fill(hist, rows):
+    for symbol, a, b in rows:
+        hist.add(CalculationFactory.from_symbol(symbol, float(a), float(b)))
+
+
+def _triples(entries):
+    return [(CalculationFactory.symbol_for(e.calc.op), e.calc.a, e.calc.b) for e in entries]
+
+
+@pytest.mark.parametrize("backend", ["list", "columnar"])
+def test_filter_by_op_and_ranges(backend):
+    hist = History(backend)
+    _fill(hist, ROWS)
+    assert _triples(hist.filter(op="/")) == [("/", 8, 2), ("/", 9e6, 3), ("/", 1, 4)]
+    assert _triples(hist.filter(op="/", result_range=(1e6, None))) == [("/", 9e6, 3)]
+    assert _triples(hist.filter(a_range=(None, 3))) == [("+", 1, 2), ("*", 3, 4), ("/", 1, 4)]
+    assert _triples(hist.filter(b_range=(2, 3), result_range=(4, 4))) == [("/", 8, 2)]
+    assert len(hist.filter()) == len(ROWS)
+    assert not hist.filter(op="^")
+
+
+def test_index_catches_up_incrementally():
+    hist = History()
+    _fill(hist, ROWS[:2])
+    assert len(hist.filter(op="/")) == 1
+    index = index_for(hist._store)  # pylint: disable=protected-access
+    assert index.indexed == 2
+    _fill(hist, ROWS[2:])
+    assert len(hist.filter(op="/")) == 3
+    assert index_for(hist._store) is index and index.indexed == len(ROWS)  # pylint: disable=protected-access
+
+
+def test_failed_rows_are_not_range_matched():
+    hist = History()
+    hist.add(Calculation(DivideOperation(), 1, 0))
+    assert len(hist.filter(op="/")) == 1
+    assert not hist.filter(result_range=(None, None))
+
+
+@pytest.mark.parametrize("pending", [3, INSORT_MAX + 5])
+def test_sorted_column_merges_new_rows_into_the_sorted_run(pending):
+    values = [float(v % 7) for v in range(50)]
+    column = SortedColumn()
+    for row, value in enumerate(values):
+        column.add(value, row)
+    assert column.rows(None, None, 50) == sorted(range(50), key=lambda r: (values[r], r))
+    values += [float(v * 5 % 9 - 1) for v in range(pending)] + [math.nan]
+    for row, value in enumerate(values[50:], 50):
+        column.add(value, row)
+    ordered = sorted((r for r in range(len(values)) if not math.isnan(values[r])),
+                     key=lambda r: (values[r], r))
+    assert column.rows(None, None, len(values)) == ordered
+    assert column.rows(2, 3, 52) == [r for r in ordered if 2 <= values[r] <= 3 and r < 52]
+
+
+def test_filter_follows_clear_undo_and_fork():
+    hist = History()
+    ct = History.Caretaker()
+    ct.record(hist)
+    _fill(hist, ROWS[:3])
+    ct.record(hist)
+    assert len(hist.filter(op="/")) == 1
+    _fill(hist, ROWS[3:4])
+    ct.record(hist)
+    assert len(hist.filter(op="/")) == 2
+    ct.undo(hist)  # back to 3 rows: shared store, only a prefix is visible
+    assert len(hist.filter(op="/")) == 1
+    assert not hist.filter(result_range=(1e6, None))
+    _fill(hist, [("/", 10, 5)])  # branches off the shared store
+    assert _triples(hist.filter(op="/")) == [("/", 8, 2), ("/", 10, 5)]
+    assert [e.result for e in hist.filter(result_range=(2, 4))] == [3, 4, 2]
+    forked = hist.create_memento()
+    hist.clear()
+    assert not hist.filter()
+    hist.restore_memento(forked)
+    assert len(hist.filter(op="/")) == 2
+
+
+def test_repl_find(monkeypatch, capsys):
+    monkeypatch.delenv("HISTORY_CSV_PATH", raising=False)
+    inputs = ["/", "8", "2", "/", "9e6", "3", "*", "3", "4"]
+    run_session(inputs + ["find op=/ result>1e6", "find a>=3 a<9 b<=4", "find b=4 result<12",
+                          "find", "exit"])
+    out = capsys.readouterr().out
+    assert "9000000.0 / 3.0 = 3000000.0\n1 match(es)" in out
+    assert "8.0 / 2.0 = 4.0\n3.0 * 4.0 = 12.0\n2 match(es)" in out
+    assert "0 match(es)" in out
+    assert "3 match(es)" in out
+
+
+@pytest.mark.parametrize("value, up, expected", [
+    (1.0, True, 1.0000000000000002),
+    (1.0, False, 0.9999999999999999),
+    (-1.0, True, -0.9999999999999999),
+    (-1.0, False, -1.0000000000000002),
+    (0.0, True, 5e-324),
+    (-0.0, False, -5e-324),
+    (-5e-324, True, -0.0),
+    (1.7976931348623157e308, True, math.inf),
+    (math.inf, False, 1.7976931348623157e308),
+    (-math.inf, True, -1.7976931348623157e308),
+    (math.inf, True, math.inf),
+])
+def test_next_float(value, up, expected):
+    next_float = app_main._next_float  # pylint: disable=protected-access
+    assert next_float(value, up) == expected
+    assert math.isnan(next_float(math.nan, up))
+
+
+@pytest.mark.parametrize("terms", ["op>/", "c=1", "a>x", "result"])
+def test_repl_find_usage(capsys, terms):
+    run_session([f"find {terms}", "exit"])
+    assert "Usage: find" in capsys.readouterr().out
@@ -0,0 +1,373 @@
+import asyncio
+import json
+import os
+import signal
+import socket
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+
+from app import loadgen, numeric, server
+from app.calculation import CalculationFactory, ConcurrentHistory
+from app.operation import PowerOperation
+from app.server import Batcher, CalculationServer, parse_request
+
+
+@pytest.fixture(name="decimal_backend")
+def fixture_decimal_backend():
+    numeric.configure("decimal")
+    yield
+    numeric.configure()
+
+
+def _line(**message):
+    return json.dumps(message).encode() + b"\n"
+
+
+async def _exchange(srv, lines):
+    """Send ``lines`` at once over one connection and return the decoded responses."""
+    listener = await srv.start("127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"".join(lines))
+    writer.write_eof()
+    responses = [json.loads(line) async for line in reader]
+    writer.close()
+    listener.close()
+    await listener.wait_closed()
+    return responses
+
+
+def test_parse_request_validation():
+    assert parse_request(b'{"op": "root", "a": 3, "b": "27"}') == (None, ("root", 3.0, 27.0))
+    assert parse_request(b'{"id": "x", "op": "+", "a": 1, "b": 2}')[0] == "x"
+    for line, message in [
+        (b"{oops", "Invalid JSON"),
+        (b"[1, 2]", "must be a JSON object"),
+        (b'{"op": "+", "a": 1}', "Missing field(s): b"),
+        (b'{"op": "%", "a": 1, "b": 2}', "Unknown operation: %"),
+        (b'{"op": "+", "a": true, "b": 2}', "'a' must be a number"),
+        (b'{"op": "+", "a": 1, "b": null}', "'b' must be a number"),
+        (b'{"op": "+", "a": "x", "b": 2}', "could not convert"),
+        (b'{"op": "+", "a": 1, "b": ' + b"9" * 400 + b"}", "'b' is too large"),
+        (b'{"op": "+", "a": NaN, "b": 2}', "'a' must be a finite number"),
+        (b'{"op": "+", "a": "-inf", "b": 2}', "'a' must be a finite number"),
+        (b'{"op": "+", "a": 1, "b": "1e400"}', "'b' must be a finite number"),
+    ]:
+        with pytest.raises(ValueError, match=message.replace("(", r"\(").replace(")", r"\)")):
+            parse_request(line)
+
+
+def test_pipelined_requests_answer_in_order_with_errors():
+    srv = CalculationServer()
+    lines = [
+        _line(id=1, op="root", a=3, b=27),
+        b"not json\n",
+        b"\n",
+        _line(id=2, op="/", a=1, b=0),
+        _line(op="+", a=1, b=2),
+    ]
+    responses = asyncio.run(_exchange(srv, lines))
+    assert responses == [
+        {"id": 1, "result": 3.0},
+        {"error": "Invalid JSON"},
+        {"id": 2, "error": "Cannot divide by zero"},
+        {"result": 3.0},
+    ]
+    assert srv.history.to_strings() == ["3.0 root 27.0 = 3.0", "1.0 + 2.0 = 3.0"]
+
+
+@pytest.mark.parametrize("vectorize_min", [1, 10_000])
+def test_vectorized_and_scalar_batches_agree(vectorize_min):
+    requests = [(op, a, b) for op in ("+", "-", "*", "/", "^", "root") for a, b in [(8, 2), (2, 0)]]
+    lines = [_line(id=i, op=op, a=a, b=b) for i, (op, a, b) in enumerate(requests)]
+    srv = CalculationServer(vectorize_min=vectorize_min)
+    responses = asyncio.run(_exchange(srv, lines))
+    expected = []
+    for i, (op, a, b) in enumerate(requests):
+        try:
+            expected.append({"id": i, "result": CalculationFactory.from_symbol(op, a, b).execute()})
+        except (ValueError, ZeroDivisionError) as exc:
+            expected.append({"id": i, "error": str(exc)})
+    assert responses == expected
+    assert len(srv.history) == sum("result" in r for r in expected)
+    assert srv.batcher.batches == 1 and srv.batcher.requests == len(requests)
+
+
+@pytest.mark.parametrize("vectorize_min", [1, 10_000])
+def test_non_finite_results_are_errors_on_both_paths(vectorize_min):
+    requests = [("^", 10, 400), ("*", 1e308, 10), ("-", -1e308, 1e308), ("+", 1, 2)]
+    lines = [_line(op=op, a=a, b=b) for op, a, b in requests]
+    srv = CalculationServer(vectorize_min=vectorize_min)
+    responses = asyncio.run(_exchange(srv, lines))
+    assert responses == [
+        {"error": "Result too large for a float"},
+        {"error": server.NON_FINITE},
+        {"error": server.NON_FINITE},
+        {"result": 3.0},
+    ]
+    assert srv.history.to_strings() == ["1.0 + 2.0 = 3.0"]
+
+
+def test_failing_request_does_not_stall_its_batch(monkeypatch):
+    def broken(_self, a, b):
+        raise TypeError("unsupported operand")
+
+    monkeypatch.setattr(PowerOperation, "apply", broken)
+
+    async def scenario():
+        srv = CalculationServer()
+        lines = [
+            _line(op="+", a=1, b=2), _line(id=7, op="^", a=-8, b=0.5), _line(op="*", a=2, b=3)
+        ]
+        other = [_line(op="-", a=5, b=1)]
+        # A second connection sharing the batcher is answered as usual
+        return srv, await asyncio.wait_for(
+            asyncio.gather(_exchange(srv, lines), _exchange(srv, other)), 5
+        )
+
+    srv, (responses, other) = asyncio.run(scenario())
+    error = {"id": 7, "error": "unsupported operand"}
+    assert responses == [{"result": 3.0}, error, {"result": 6.0}]
+    assert other == [{"result": 4.0}]
+    assert len(srv.history) == 3
+
+
+def test_unexpected_batch_failure_still_answers_every_request(monkeypatch):
+    def crash(*_args):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(CalculationFactory, "evaluate_many", crash)
+
+    async def scenario():
+        batcher = Batcher(ConcurrentHistory(), vectorize_min=1)
+        futures = [batcher.submit(("+", 1.0, 2.0)), batcher.submit(("*", 2.0, 2.0))]
+        with pytest.raises(RuntimeError):
+            batcher.flush()
+        return [future.result() for future in futures]
+
+    assert asyncio.run(scenario()) == [{"error": server.INTERNAL_ERROR}] * 2
+
+
+def test_vectorized_batch_falls_back_without_numpy(monkeypatch):
+    def missing(*_args):
+        raise ImportError("numpy")
+
+    monkeypatch.setattr(CalculationFactory, "evaluate_many", missing)
+    srv = CalculationServer(vectorize_min=1)
+    assert asyncio.run(_exchange(srv, [_line(op="*", a=2, b=4)])) == [{"result": 8.0}]
+
+
+@pytest.mark.usefixtures("decimal_backend")
+def test_exact_backend_returns_strings():
+    srv = CalculationServer(vectorize_min=1)
+    responses = asyncio.run(_exchange(srv, [_line(op="+", a="0.1", b=0.2)]))
+    assert responses == [{"result": "0.3"}]
+    with pytest.raises(ValueError, match="'b' must be a finite number"):
+        parse_request(b'{"op": "+", "a": 1, "b": "NaN"}')
+    huge = int("9" * 400)
+    assert parse_request(_line(op="+", a=huge, b=1))[1] == ("+", Decimal(huge), 1)
+
+
+def test_invalid_operands_keep_the_connection_answering():
+    lines = [
+        _line(id=1, op="+", a=1, b=2),
+        b'{"id": 2, "op": "+", "a": ' + b"1" * 400 + b', "b": 2}\n',
+        b'{"id": 3, "op": "*", "a": NaN, "b": 2}\n',
+        _line(id=4, op="*", a=2, b=3),
+    ]
+    responses = asyncio.run(asyncio.wait_for(_exchange(CalculationServer(), lines), 5))
+    assert responses == [
+        {"id": 1, "result": 3.0},
+        {"error": "'a' is too large"},
+        {"error": "'a' must be a finite number"},
+        {"id": 4, "result": 6.0},
+    ]
+
+
+def test_full_batches_flush_immediately():
+    async def scenario():
+        batcher = Batcher(ConcurrentHistory(), max_batch=2)
+        futures = [batcher.submit(("+", 1.0, float(i))) for i in range(3)]
+        assert futures[0].done() and futures[1].done() and not futures[2].done()
+        await asyncio.sleep(0)
+        return [f.result() for f in futures], batcher.batches
+
+    results, batches = asyncio.run(scenario())
+    assert results == [{"result": 1.0}, {"result": 2.0}, {"result": 3.0}]
+    assert batches == 2
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        Batcher(ConcurrentHistory(), max_batch=0)
+    with pytest.raises(ValueError):
+        CalculationServer(max_pending=0)
+
+
+class _BlockedWriter:
+    """Stream writer stand-in whose ``drain`` waits until ``release`` is set."""
+
+    def __init__(self, fail=False):
+        self.lines = []
+        self.release = asyncio.Event()
+        self.fail = fail
+        self.closed = False
+
+    def write(self, data):
+        self.lines.append(json.loads(data))
+
+    async def drain(self):
+        if self.fail:
+            raise ConnectionResetError
+        await self.release.wait()
+
+    def close(self):
+        self.closed = True
+
+
+def test_slow_client_stops_reads_at_max_pending():
+    async def scenario():
+        srv = CalculationServer(max_pending=4)
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"".join(_line(id=i, op="+", a=i, b=1) for i in range(100)))
+        reader.feed_eof()
+        writer = _BlockedWriter()
+        task = asyncio.create_task(srv.handle(reader, writer))
+        for _ in range(20):
+            await asyncio.sleep(0)
+        # One response is stuck in drain and max_pending more are queued
+        stalled = srv.batcher.requests
+        writer.release.set()
+        await task
+        return stalled, writer
+
+    stalled, writer = asyncio.run(scenario())
+    assert stalled <= 4 + 2
+    assert [r["id"] for r in writer.lines] == list(range(100))
+    assert writer.closed
+
+
+def test_disconnected_client_is_drained_without_writes():
+    async def scenario():
+        srv = CalculationServer(max_pending=2)
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"".join(_line(op="+", a=1, b=1) for _ in range(10)))
+        reader.feed_eof()
+        writer = _BlockedWriter(fail=True)
+        await asyncio.wait_for(srv.handle(reader, writer), 5)
+        return srv, writer
+
+    srv, writer = asyncio.run(scenario())
+    assert len(writer.lines) == 1 and srv.batcher.requests == 10
+
+
+def test_oversized_line_and_reset_close_the_connection():
+    async def scenario(reader):
+        writer = _BlockedWriter()
+        writer.release.set()
+        await asyncio.wait_for(CalculationServer().handle(reader, writer), 5)
+        return writer.lines
+
+    async def oversized():
+        reader = asyncio.StreamReader(limit=16)
+        reader.feed_data(b'{"op": "+", "a": 1, "b": 1}\n')
+        return await scenario(reader)
+
+    async def reset():
+        reader = asyncio.StreamReader()
+        reader.set_exception(ConnectionResetError())
+        return await scenario(reader)
+
+    assert asyncio.run(oversized()) == [{"error": "Request line longer than 65536 bytes"}]
+    assert not asyncio.run(reset())
+
+
+def test_serve_with_load_generator_and_open_connection():
+    async def run():
+        srv = CalculationServer()
+        listener = await srv.start("127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        listener.close()
+        await listener.wait_closed()
+        stop = asyncio.Event()
+        serving = asyncio.create_task(server.serve(srv, "127.0.0.1", port, stop))
+        await asyncio.sleep(0.05)
+        report = await loadgen.run_load("127.0.0.1", port, requests=300, connections=3)
+        idle_reader, _ = await asyncio.open_connection("127.0.0.1", port)
+        await asyncio.sleep(0.01)
+        stop.set()
+        await serving
+        return srv, report, await idle_reader.read()
+
+    srv, report, leftover = asyncio.run(run())
+    assert report["requests"] == 300 and report["errors"] == 0
+    assert report["p50_ms"] <= report["p99_ms"]
+    assert len(srv.history) == 300
+    assert srv.batcher.batches < srv.batcher.requests  # requests were batched
+    assert leftover == b""  # open connections are closed on shutdown
+
+
+def test_load_generator_helpers():
+    assert json.loads(loadgen.request_line(5)) == {"id": 5, "op": "root", "a": 6, "b": 3}
+    assert loadgen.percentile([1.0, 2.0, 3.0, 4.0], 0.5) == 3.0
+    assert loadgen.percentile([], 0.5) != loadgen.percentile([], 0.5)  # NaN
+    with pytest.raises(ValueError):
+        asyncio.run(loadgen.run_load(requests=0))
+
+
+def test_load_generator_reports_closed_connection():
+    async def run():
+        async def hang_up(reader, writer):
+            await reader.readline()  # answer nothing, then close cleanly
+            writer.close()
+
+        listener = await asyncio.start_server(hang_up, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            with pytest.raises(ConnectionError):
+                await loadgen.run_load("127.0.0.1", port, 5, connections=1, pipeline=1)
+        finally:
+            listener.close()
+
+    asyncio.run(run())
+
+
+def test_history_is_created_without_a_file(tmp_path):
+    hist = server._open_history(str(tmp_path / "missing.csv"), "columnar")  # pylint: disable=protected-access
+    assert len(hist) == 0 and hist.backend == "columnar"
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_cli_serves_until_sigterm_and_saves_history(tmp_path, capsys):
+    path = str(tmp_path / "server.csv")
+    ConcurrentHistory().save(path)  # an existing history is loaded first
+    port = _free_port()
+
+    def client():
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                time.sleep(0.02)
+        loadgen.main(["--port", str(port), "--requests", "60", "--connections", "2"])
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    thread = threading.Thread(target=client)
+    thread.start()
+    server.main(["--port", str(port), "--history", path])
+    thread.join(10)
+    out, err = capsys.readouterr()
+    assert f"Listening on 127.0.0.1:{port}" in out
+    assert json.loads(out[out.index("{"):])["requests"] == 60
+    assert "Served 60 requests" in err
+    assert len(ConcurrentHistory.load(path)) == 60
@@ -0,0 +1,96 @@
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+from app import main as app_main
+from .utils import run_session
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Import + settings + configure until the first prompt, measured in a fresh
+# interpreter; generous so slow CI machines stay green
+STARTUP_BUDGET_MS = 1500.0
+
+
+def _write_csv(path, rows):
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write("a,op,b,result\n")
+        fh.writelines(f"{i}.0,+,1.0,{i + 1}.0\n" for i in range(rows))
+
+
+def _startup(tmp_path, **env):
+    """Start a REPL in a fresh interpreter, exit immediately, return stderr."""
+    full_env = {k: v for k, v in os.environ.items() if not k.startswith(("HISTORY_", "AUTO_"))}
+    full_env.update(PYTHONPATH=ROOT, **env)
+    proc = subprocess.run(
+        [sys.executable, "-m", "app.main", "--startup-profile"],
+        input="exit\n",
+        capture_output=True,
+        text=True,
+        cwd=tmp_path,
+        env=full_env,
+        timeout=60,
+        check=True,
+    )
+    return proc.stderr
+
+
+def test_startup_budget_without_pandas_before_prompt(tmp_path):
+    csv_path = tmp_path / "history.csv"
+    _write_csv(csv_path, 50_000)
+    report = _startup(tmp_path, HISTORY_CSV_PATH=str(csv_path))
+    assert "pandas loaded: no" in report
+    first_prompt = float(re.search(r"first prompt\s+([\d.]+)", report).group(1))
+    assert first_prompt < STARTUP_BUDGET_MS, report
+
+
+def test_startup_does_not_import_heavy_modules():
+    # Only modules app.main pulls in: pytest-cov's subprocess hook may load
+    # multiprocessing before any user code runs
+    code = (
+        "import sys; before = set(sys.modules); import app.main; "
+        "print(sorted(m for m in ('pandas', 'numpy', 'multiprocessing', 'cProfile') "
+        "if m in sys.modules and m not in before))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True, text=True, cwd=ROOT, timeout=60, check=True,
+    ).stdout
+    assert out.strip() == "[]"
+
+
+def test_startup_profile_phases(monkeypatch, capsys):
+    monkeypatch.delenv("HISTORY_CSV_PATH", raising=False)
+    run_session(["exit"], argv=["--startup-profile"])
+    err = capsys.readouterr().err
+    for phase in ("imports", "settings", "configure", "history", "first prompt"):
+        assert re.search(rf"^  {phase}\s+[\d.]+$", err, re.M), err
+
+
+def test_history_loads_in_background_until_first_use(tmp_path, monkeypatch, capsys):
+    csv_path = tmp_path / "history.csv"
+    _write_csv(csv_path, 3)
+    monkeypatch.setenv("HISTORY_CSV_PATH", str(csv_path))
+    run_session(["help", "history", "exit"])
+    out = capsys.readouterr().out
+    assert "2.0 + 1.0 = 3.0" in out
+
+
+def test_journal_load_finishes_before_exit(tmp_path, monkeypatch):
+    csv_path = tmp_path / "auto.csv"
+    monkeypatch.setenv("AUTO_SAVE", "1")
+    monkeypatch.setenv("AUTO_SAVE_MODE", "journal")
+    monkeypatch.setenv("HISTORY_CSV_PATH", str(csv_path))
+    run_session(["exit"])
+    assert os.path.exists(f"{csv_path}.journal")  # written by the load's compaction
+
+
+def test_deferred_history_reraises_load_errors():
+    def fail():
+        raise ModuleNotFoundError("No module named 'pandas'")
+
+    pending = app_main.DeferredHistory(fail)
+    with pytest.raises(ModuleNotFoundError):
+        pending.get()
@@ -0,0 +1,171 @@
+import math
+import os
+from array import array
+from fractions import Fraction
+
+import pytest
+
+from app.calculation import Calculation, CalculationFactory, History
+from app.calculation.storage import BranchStore, ColumnarStore
+from app.config import load_settings
+from app.operation import AddOperation, DivideOperation
+from .utils import run_session, has_pandas
+
+BACKENDS = ["list", "columnar"]
+
+
+def _fill(hist, rows):
+    for symbol, a, b in rows:
+        hist.add(CalculationFactory.from_symbol(symbol, float(a), float(b)))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backend_add_all_last(backend):
+    hist = History(backend)
+    assert hist.backend == backend
+    assert hist.last() is None
+    _fill(hist, [("+", 1, 2), ("*", 3, 4), ("root", 2, 9)])
+    assert len(hist) == 3
+    assert [(c.a, c.b) for c in hist.all()] == [(1, 2), (3, 4), (2, 9)]
+    assert hist.last().execute() == pytest.approx(3)
+    assert hist.to_strings() == [
+        "1.0 + 2.0 = 3.0",
+        "3.0 * 4.0 = 12.0",
+        "2.0 root 9.0 = 3.0",
+    ]
+    assert [e.result for e in hist.entries()] == [3, 12, 3.0]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backend_undo_fork_and_clear(backend):
+    hist = History(backend)
+    ct = History.Caretaker()
+    ct.record(hist)
+    _fill(hist, [("+", 1, 1), ("+", 2, 2)])
+    ct.record(hist)
+    full = hist.create_memento()
+    ct.undo(hist)
+    _fill(hist, [("-", 5, 1)])
+    assert hist.to_strings() == ["5.0 - 1.0 = 4.0"]
+    hist.restore_memento(full)
+    assert len(hist.all()) == 2
+    hist.clear()
+    assert not hist.all()
+    hist.restore_memento(full)
+    assert hist.last().a == 2
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backend_undo_then_add_branches_without_copying(backend):
+    # pylint: disable=protected-access
+    hist = History(backend)
+    ct = History.Caretaker()
+    ct.record(hist)
+    for i in range(1, 5):
+        _fill(hist, [("+", i, i)])
+        ct.record(hist)
+    full, root = hist.create_memento(), hist._store
+    for i in range(50):  # every branch hangs off the original store
+        ct.undo(hist)
+        _fill(hist, [("*", i, 2)])
+        ct.record(hist)
+        assert (hist._store.parent, hist._store.base) == (root, 3)
+    assert hist.backend == backend
+    assert list(hist.column("a")) == [1, 2, 3, 49]
+    assert list(hist.column("op")) == ["+", "+", "+", "*"]
+    assert hist.stats().per_op == {"+": [3, 0], "*": [1, 0]}
+    _fill(hist, [("-", 7, 1)])
+    ct.record(hist)
+    ct.undo(hist)
+    _fill(hist, [("/", 8, 2)])  # branches off the branch: three runs
+    branched = hist._store
+    assert branched.parent.parent is root
+    assert hist.to_strings()[2:] == ["3.0 + 3.0 = 6.0", "49.0 * 2.0 = 98.0", "8.0 / 2.0 = 4.0"]
+    assert [e.calc.a for e in hist.filter(result_range=(4, 98))] == [2, 3, 49, 8]
+    assert hist.stats().count == 5 and hist.last().a == 8
+    hist.restore_memento(History.Memento(branched, 2))
+    assert hist.stats().count == 2 and hist.entries()[1].calc.a == 2
+    _fill(hist, [("+", 0, 0)])
+    assert isinstance(hist._store, BranchStore) and hist._store.parent is root
+    hist.restore_memento(full)
+    assert hist.to_strings()[-1] == "4.0 + 4.0 = 8.0"
+    hist.restore_memento(History.Memento(branched, 5))
+    hist.clear()
+    assert hist.backend == backend and not hist.column("a")
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backend_columns(backend):
+    hist = History(backend)
+    _fill(hist, [("+", 1, 2), ("/", 9, 3)])
+    hist.add(Calculation(DivideOperation(), 1, 0))  # failed: NaN result
+    assert list(hist.column("a")) == [1, 9, 1]
+    assert list(hist.column("op")) == ["+", "/", "/"]
+    assert list(hist.column("b")) == [2, 3, 0]
+    assert list(hist.column("result"))[:2] == [3, 3]
+    with pytest.raises(ValueError):
+        hist.column("nope")
+
+
+def test_columnar_columns_are_typed_arrays():
+    hist = History("columnar")
+    _fill(hist, [("+", 1, 2), ("+", 3, 4)])
+    results = hist.column("result")
+    assert isinstance(results, array)
+    assert sum(results) == 10
+
+
+def test_columnar_clamps_exact_values_beyond_float_range():
+    hist = History("columnar")
+    big = Fraction(10**400)
+    hist.add(Calculation(AddOperation(), big, 1), big + 1)
+    hist.add_many([AddOperation()], [0, 0], [1, -big], [2, 1], [3, -big + 1])
+    assert list(hist.column("result")) == [math.inf, 3.0, -math.inf]
+    assert list(hist.column("a")) == [math.inf, 1.0, -math.inf]
+    assert len(hist.column("op")) == 3
+
+
+def test_columnar_entries_use_equivalent_operations():
+    hist = History("columnar")
+    hist.add(Calculation(AddOperation(), 1, 2))
+    hist.add(Calculation(AddOperation(), 3, 4))
+    first, second = hist.all()
+    assert first.op is second.op  # one instance per operation type
+    assert isinstance(first.op, AddOperation)
+
+
+def test_columnar_op_table_limit(monkeypatch):
+    monkeypatch.setattr(ColumnarStore, "MAX_OPS", 1)
+    hist = History("columnar")
+    _fill(hist, [("+", 1, 2)])
+    with pytest.raises(ValueError):
+        _fill(hist, [("-", 1, 2)])
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        History("btree")
+
+
+def test_load_settings_backend(monkeypatch):
+    monkeypatch.setenv("HISTORY_BACKEND", "Columnar")
+    assert load_settings().history_backend == "columnar"
+
+
+@pytest.mark.skipif(not has_pandas(), reason="pandas not installed")
+def test_columnar_csv_roundtrip(tmp_path):
+    hist = History("columnar")
+    _fill(hist, [("+", 1, 2), ("^", 2, 10)])
+    path = os.path.join(tmp_path, "h.csv")
+    hist.save_csv(path)
+    loaded = History.load_csv(path, backend="columnar")
+    assert loaded.backend == "columnar"
+    assert loaded.to_strings() == ["1.0 + 2.0 = 3.0", "2.0 ^ 10.0 = 1024.0"]
+    assert History.load_csv(path).to_strings() == loaded.to_strings()
+
+
+def test_repl_columnar_backend(monkeypatch, capsys):
+    monkeypatch.setenv("HISTORY_BACKEND", "columnar")
+    monkeypatch.delenv("HISTORY_CSV_PATH", raising=False)
+    run_session(["+", "1", "2", "history", "exit"])
+    assert capsys.readouterr().out.count("1.0 + 2.0 = 3.0") == 2
@@ -4,7 +4,7 @@ import importlib
 from app import main as app_main
 
 
-def run_session(inputs):
+def run_session(inputs, argv=None):
     """Feed a sequence of inputs into the app's REPL and run a session."""
     it = iter(inputs)
 
@@ -17,7 +17,7 @@ def run_session(inputs):
     orig = builtins.input
     try:
         builtins.input = fake_input
-        app_main.main()
+        app_main.main(argv)
     finally:
         builtins.input = orig
 
@@ -29,3 +29,12 @@ def has_pandas():
         return True
     except ModuleNotFoundError:  # pragma: no cover - env dependent
         return False
+
+
+def has_numpy():
+    """Return True if numpy is importable, False otherwise."""
+    try:
+        importlib.import_module("numpy")
+        return True
+    except ModuleNotFoundError:  # pragma: no cover - env dependent
+        return False